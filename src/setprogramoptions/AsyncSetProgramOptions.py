@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+AsyncSetProgramOptions
+======================
+
+An :py:mod:`asyncio` façade for ``SetProgramOptions`` and ``SetProgramOptionsCMake``.
+
+Loading the ``.ini`` file, parsing sections and generating option lists run in an
+executor so the event loop is never blocked. Many sections can be rendered
+concurrently with bounded parallelism:
+
+.. code-block:: python
+    :linenos:
+
+    async def main():
+        async with AsyncSetProgramOptions("config.ini", max_concurrency=4) as parser:
+            await parser.aload()
+            bash = await parser.agen_option_list("SECTION_A", "bash")
+            option_lists = await parser.agen_option_lists([
+                ("SECTION_A", "cmake_fragment"),
+                ("SECTION_B", "bash"),
+            ])
+
+    asyncio.run(main())
+
+On Python 3.6, which has no ``asyncio.run``, use
+``asyncio.get_event_loop().run_until_complete(main())`` instead.
+
+Parsers are not thread-safe, so each concurrent request uses its own parser from
+a pool of at most ``max_concurrency`` parsers. Parsers are created on demand and
+reused, so a parser only loads the ``.ini`` file once.
+
+The executor can be any :py:class:`concurrent.futures.Executor`. By default a
+:py:class:`~concurrent.futures.ThreadPoolExecutor` with ``max_concurrency``
+workers is created (and shut down by :py:meth:`AsyncSetProgramOptions.close`).
+With a :py:class:`~concurrent.futures.ProcessPoolExecutor` each worker process
+keeps its own parser and rendering is not limited by the GIL.
+
+Cancellation
+------------
+Cancelling a task that awaits a request cancels the request if it has not started
+yet. A request that is already running in the executor can not be interrupted;
+it runs to completion in the background and its result is discarded. Its parser
+(and its ``max_concurrency`` slot) is only returned to the pool when it finishes,
+so cancelled requests never share a parser with new requests.
+"""
+from __future__ import print_function
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+
+
+# Python 3.6 has no `get_running_loop`, but `get_event_loop` returns the running
+# loop when it is called from a coroutine.
+try:
+    _get_running_loop = asyncio.get_running_loop
+except AttributeError:       # pragma: no cover
+    _get_running_loop = asyncio.get_event_loop
+
+
+
+# Parsers created by ``_render_in_worker`` in a worker process of a
+# ProcessPoolExecutor, keyed by the arguments that created them.
+_WORKER_PARSERS = {}
+
+
+
+def _create_parser(filename, parser_class, settings):
+    """Create a parser and apply ``settings`` (``dict`` of attribute values) to it."""
+    if isinstance(parser_class, str):
+        import setprogramoptions
+        parser_class = getattr(setprogramoptions, parser_class)
+    parser = parser_class(filename)
+    for name, value in settings.items():
+        setattr(parser, name, value)
+    return parser
+
+
+
+def _run_method(parser, method, *args, **kwargs):
+    """Call a method of ``parser``. ``method`` ``None`` only loads the ``.ini`` file."""
+    if method is None:
+        parser.configparserdata
+        return None
+    return getattr(parser, method)(*args, **kwargs)
+
+
+
+def _render_in_worker(filename, parser_class, settings, method, *args, **kwargs):
+    """Call a method of a parser that is cached in the worker process."""
+    key = (filename, parser_class, tuple(sorted(settings.items())))
+    parser = _WORKER_PARSERS.get(key)
+    if parser is None:
+        parser = _create_parser(filename, parser_class, settings)
+        _WORKER_PARSERS[key] = parser
+    return _run_method(parser, method, *args, **kwargs)
+
+
+
+class AsyncSetProgramOptions(object):
+    """
+    Asynchronous access to the parsers of an ``.ini`` file.
+
+    Args:
+        filename (str,Path): The ``.ini`` file.
+        parser_class (str,type): The parser class or its name, ``SetProgramOptionsCMake``
+            (default) or ``SetProgramOptions``. Use the name with a process pool executor.
+        executor (concurrent.futures.Executor): The executor that runs the parsers. If
+            ``None`` a thread pool executor with ``max_concurrency`` workers is created.
+        max_concurrency (int): The maximum number of requests that run at the same time.
+            Defaults to ``min(32, os.cpu_count() + 4)``.
+        settings (dict): Attribute values that are set on every parser, i.e.,
+            ``{"exception_control_silent_warnings": True}``. Values must be picklable
+            when using a process pool executor.
+
+    Raises:
+        ValueError: If ``max_concurrency`` is less than 1.
+    """
+
+    def __init__(
+        self,
+        filename,
+        parser_class="SetProgramOptionsCMake",
+        executor=None,
+        max_concurrency=None,
+        settings=None
+    ):
+        if max_concurrency is None:
+            max_concurrency = min(32, (os.cpu_count() or 1) + 4)
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        self.filename = os.fspath(filename)
+        self.parser_class = parser_class
+        self.max_concurrency = max_concurrency
+        self.settings = dict(settings or {})
+
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency)
+        self.executor = executor
+        self._use_worker_parsers = isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+
+        self._idle_parsers = []
+        self._parser_count = 0
+        self._semaphore = None
+        self._loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @property
+    def parser_count(self) -> int:
+        """The number of parsers created by this object (not including worker processes)."""
+        return self._parser_count
+
+    # -------------------------------
+    #   P U B L I C   M E T H O D S
+    # -------------------------------
+
+    async def aload(self):
+        """Load the ``.ini`` file into a parser without blocking the event loop."""
+        await self._submit(None)
+        return
+
+    async def aparse_section(self, section, initialize=True, finalize=True) -> dict:
+        """Asynchronous ``parse_section``.
+
+        Args:
+            section (str): The section to parse.
+            initialize (bool): Passed on to ``parse_section``.
+            finalize (bool): Passed on to ``parse_section``.
+
+        Returns:
+            dict: The result of ``parse_section``.
+        """
+        return await self._submit("parse_section", section, initialize=initialize, finalize=finalize)
+
+    async def agen_option_list(self, section, generator="bash") -> list:
+        """Asynchronous ``gen_option_list``.
+
+        Args:
+            section (str): The section to generate.
+            generator (str): The generator to use.
+
+        Returns:
+            list: The result of ``gen_option_list``.
+        """
+        return await self._submit("gen_option_list", section, generator=generator)
+
+    async def agen_option_lists(self, requests, return_exceptions=False) -> list:
+        """Generate many option lists concurrently.
+
+        At most ``max_concurrency`` option lists are generated at the same time.
+        Cancelling the returned coroutine cancels all requests that have not finished.
+
+        Args:
+            requests (iterable): ``(section, generator)`` tuples.
+            return_exceptions (bool): If ``True`` exceptions are returned in the results
+                instead of raised (see :py:func:`asyncio.gather`).
+
+        Returns:
+            list: The option lists in the order of ``requests``.
+        """
+        coroutines = [self.agen_option_list(section, generator) for section, generator in requests]
+        return await asyncio.gather(*coroutines, return_exceptions=return_exceptions)
+
+    def close(self, wait=True):
+        """Shut down the executor if it was created by this object and drop the parsers."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait)
+        self._idle_parsers = []
+        return
+
+    # ---------------------------------
+    #   P R I V A T E   M E T H O D S
+    # ---------------------------------
+
+    async def _submit(self, method, *args, **kwargs):
+        """Run a parser method in the executor with a parser from the pool."""
+        loop = _get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            self._idle_parsers = []
+
+        await self._semaphore.acquire()
+        parser = None
+        try:
+            if self._use_worker_parsers:
+                func = functools.partial(
+                    _render_in_worker,
+                    self.filename,
+                    self.parser_class,
+                    self.settings,
+                    method,
+                    *args,
+                    **kwargs
+                )
+            else:
+                parser = self._acquire_parser()
+                func = functools.partial(_run_method, parser, method, *args, **kwargs)
+            future = self.executor.submit(func)
+        except BaseException:
+            if parser is not None:
+                self._idle_parsers.append(parser)
+            self._semaphore.release()
+            raise
+
+        # The parser and the semaphore are released when the executor is done with
+        # the request, not when the awaiting task is done, so a request that is
+        # cancelled while it runs keeps its parser until it finishes.
+        semaphore = self._semaphore
+        future.add_done_callback(
+            lambda _: self._call_soon_threadsafe(loop, self._release_parser, semaphore, parser)
+        )
+        return await asyncio.wrap_future(future)
+
+    def _acquire_parser(self):
+        if self._idle_parsers:
+            return self._idle_parsers.pop()
+        self._parser_count += 1
+        return _create_parser(self.filename, self.parser_class, self.settings)
+
+    def _release_parser(self, semaphore, parser):
+        if semaphore is not self._semaphore:
+            return
+        if parser is not None:
+            self._idle_parsers.append(parser)
+        semaphore.release()
+        return
+
+    @staticmethod
+    def _call_soon_threadsafe(loop, callback, *args):
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # The event loop was closed before the request finished.
+            pass
+        return
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+FastParser
+==========
+
+A parser for the fixed line grammar of ``SetProgramOptions`` that is used by
+:py:meth:`~setprogramoptions.SetProgramOptions.parse_section` when
+:py:attr:`~setprogramoptions.SetProgramOptions.fast_parse` is enabled.
+
+The generic ``ConfigParserEnhanced`` parser tokenizes every option with
+:py:func:`shlex.split`, locates its handler by name and calls it through the
+``operation_handler`` decorator with a new ``HandlerParameters`` object each
+time a section is parsed. The :py:class:`FastParser` tokenizes the options of a
+section once, into ``(operation, params, value)`` steps, and parses sections by
+appending the option entries directly:
+
+- ``use`` parses the used section in place (with the same cycle detection).
+- ``opt-remove`` calls :py:meth:`~setprogramoptions.SetProgramOptions._option_handler_helper_remove`.
+- Every other supported operation (``opt-set``, ``opt-set-cmake-var``) appends an
+  entry like :py:meth:`~setprogramoptions.SetProgramOptions._option_handler_helper_add`.
+
+``handler_initialize`` and ``handler_finalize`` are called as usual, so the result
+in :py:attr:`~setprogramoptions.SetProgramOptions.options` is the same as the one
+from the generic parser. A section is parsed by the generic parser instead if
+the section or one of the sections it uses:
+
+- has an operation that is not supported (see :py:data:`GENERIC_PARSER_METHODS` and
+  the ``_fast_parse_handlers`` of the parser classes), including operations whose
+  handler is overridden by a subclass,
+- has an option that does not tokenize to an operation or a value with a ``%``
+  (``configparser`` interpolation),
+- or is missing,
+
+or if ``debug_level`` is greater than 0, :py:attr:`~setprogramoptions.SetProgramOptions.stats`
+is enabled or the ``.ini`` file has default values.
+"""
+from __future__ import print_function
+
+import re
+import shlex
+
+from configparserenhanced import ConfigParserEnhanced
+
+
+
+#: Methods of the generic parser that the :py:class:`FastParser` replaces. If a
+#: subclass overrides one of them, its sections are parsed by the generic parser.
+GENERIC_PARSER_METHODS = (
+    "_parse_section_r",
+    "_tokenize_option_key",
+    "_get_op_components_from_tokenized_option_key",
+    "_apply_transformation_to_operation",
+    "_apply_transformation_to_parameter",
+    "_locate_handler_method",
+    "_new_handler_parameters",
+    "enter_handler",
+    "exit_handler",
+    "_option_handler_helper_add",
+    "_option_handler_helper_remove",
+)
+
+# Same check as `ConfigParserEnhanced._parse_section_r` for the operation token.
+_OPERATION_RE = re.compile(r"^[\w\-]+$")
+
+# Option keys without quotes, escapes or whitespace that `shlex.split` treats
+# differently than `str.split`.
+_PLAIN_KEY_RE = re.compile(r"[^\s'\"\\]+(?:[ \t\r\n]+[^\s'\"\\]+)*")
+
+
+
+class FastParser(object):
+    """
+    Parses the sections of the ``.ini`` file loaded by a parser.
+
+    The steps of each section are cached, a new :py:class:`FastParser` is needed
+    when a different ``.ini`` file is loaded.
+
+    Args:
+        parser (SetProgramOptions): The parser whose ``configparserdata`` is parsed.
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.configparserdata = parser.configparserdata
+        self._steps = {}
+
+    def parse(self, section: str):
+        """Parse ``section`` like ``parse_section`` if all the options it uses are supported.
+
+        Returns:
+            dict: The ``data_shared`` of the parse, or ``None`` if ``section`` has to be
+            parsed by the generic parser. Nothing is changed in this case.
+        """
+        kinds = self._handler_kinds()
+        if kinds is None:
+            return None
+
+        pending = [section]
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            steps = self._section_steps(name)
+            if steps is None:
+                return None
+            for op, params, value in steps:
+                kind = kinds.get(op)
+                if kind is None:
+                    return None
+                if kind == "use":
+                    pending.append(params[0])
+
+        parser = self.parser
+        parser._reset_lazy_attr("_loginfo")
+
+        handler_parameters = parser._new_handler_parameters()
+        handler_parameters.section_root = section
+        enhanced_data = parser.configparserenhanceddata
+        enhanced_data._sections_checked.add(section)
+
+        handler_initialize_params = parser._new_handler_parameters(handler_parameters)
+        handler_initialize_params.handler_name = "handler_initialize"
+        parser.handler_initialize(section, handler_initialize_params)
+
+        self._parse_steps(section, handler_parameters, kinds, enhanced_data)
+
+        handler_finalize_params = parser._new_handler_parameters(handler_parameters)
+        handler_finalize_params.handler_name = "handler_finalize"
+        parser.handler_finalize(section, handler_finalize_params)
+        handler_parameters.data_internal['processed_sections'].remove(section)
+
+        result = handler_parameters.data_shared
+        parser.parse_section_last_result = result
+        return result
+
+    def _parse_steps(self, section_name: str, handler_parameters, kinds: dict, enhanced_data):
+        """Apply the steps of a section, parsing used sections recursively."""
+        parser = self.parser
+        data_shared = handler_parameters.data_shared
+        data_shared_key = parser._data_shared_key
+        processed_sections = handler_parameters.data_internal['processed_sections']
+
+        enhanced_data.add_section(section_name)
+        processed_sections.add(section_name)
+
+        for op, params, value in self._steps[section_name]:
+            kind = kinds[op]
+            if kind == "add":
+                entry = {'type': [op], 'value': value, 'params': list(params)}
+                data_shared[data_shared_key].append(entry)
+                if parser._event_hooks is not None:
+                    parser._fire_event("entry_added", section_name, entry=entry)
+            elif kind == "remove":
+                handler_parameters.handler_name = "_handler_" + op
+                handler_parameters.op = op
+                handler_parameters.params = list(params)
+                handler_parameters.value = value
+                parser._option_handler_helper_remove(section_name, handler_parameters)
+            elif params[0] not in processed_sections:
+                self._parse_steps(params[0], handler_parameters, kinds, enhanced_data)
+            else:
+                # Same event as `ConfigParserEnhanced._handler_use`.
+                message = f"Detected a cycle in `use` dependencies in .ini file {parser.inifilepath}.\n"
+                message += f"- cannot load [{params[0]}] from [{section_name}]."
+                parser.exception_control_event("WARNING", ValueError, message)
+
+        if section_name != handler_parameters.section_root:
+            processed_sections.remove(section_name)
+        return
+
+    def _section_steps(self, section: str):
+        """The ``(op, params, value)`` steps of a section, ``None`` if it can't be tokenized."""
+        if section in self._steps:
+            return self._steps[section]
+
+        steps = None
+        configparserdata = self.configparserdata
+        if configparserdata.has_section(section):
+            steps = []
+            for option_key, value in configparserdata.items(section, raw=True):
+                if value is not None:
+                    if "%" in value:
+                        steps = None
+                        break
+                    value = value.strip().strip('"')
+                option_key = option_key.strip()
+                if _PLAIN_KEY_RE.fullmatch(option_key) is not None:
+                    option_key_tok = option_key.split()
+                else:
+                    try:
+                        option_key_tok = shlex.split(option_key)
+                    except ValueError:
+                        steps = None
+                        break
+                if not option_key_tok or not _OPERATION_RE.match(option_key_tok[0]):
+                    steps = None
+                    break
+                op = option_key_tok[0].replace("-", "_")
+                params = tuple(option_key_tok[1 :])
+                if op == "use" and not params:
+                    steps = None
+                    break
+                steps.append((op, params, value))
+
+        self._steps[section] = steps
+        return steps
+
+    def _handler_kinds(self):
+        """The supported operations ``{op: "use"|"add"|"remove"}``, ``None`` if none are."""
+        parser = self.parser
+        if parser.debug_level > 0 or parser._stats_enabled:
+            return None
+        configparserdata = self.configparserdata
+        if configparserdata.defaults() or configparserdata.has_section(parser.default_section_name):
+            return None
+
+        cls = type(parser)
+        base = _parser_base()
+        for method_name in GENERIC_PARSER_METHODS:
+            if getattr(cls, method_name) is not getattr(base, method_name):
+                return None
+
+        kinds = {}
+        if cls._handler_use is ConfigParserEnhanced._handler_use:
+            kinds["use"] = "use"
+        for parser_cls in cls.__mro__:
+            for handler_name, kind in parser_cls.__dict__.get("_fast_parse_handlers", {}).items():
+                if _defining_class_lists(cls, handler_name):
+                    kinds.setdefault(handler_name[len("_handler_"):], kind)
+        for op in list(kinds):
+            if getattr(cls, "handler_" + op, None) is not None:
+                del kinds[op]
+        return kinds
+
+
+
+def _defining_class_lists(cls, handler_name: str) -> bool:
+    """``True`` if the class that defines ``handler_name`` lists it in its ``_fast_parse_handlers``."""
+    for parser_cls in cls.__mro__:
+        if handler_name in parser_cls.__dict__:
+            return handler_name in parser_cls.__dict__.get("_fast_parse_handlers", {})
+    return False
+
+
+
+def _parser_base():
+    from .SetProgramOptions import SetProgramOptions
+    return SetProgramOptions
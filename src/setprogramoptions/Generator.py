@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+Generator
+=========
+
+Generators turn the option entries of a section into an option list, i.e., the
+arguments of a ``bash`` command or the lines of a CMake fragment. A generator is
+a subclass of :py:class:`Generator` registered under the name that is passed to
+:py:meth:`~setprogramoptions.SetProgramOptions.gen_option_list`:
+
+.. code-block:: python
+    :linenos:
+
+    from setprogramoptions import Generator, register_generator
+
+    @register_generator("env")
+    class EnvGenerator(Generator):
+        \"\"\"Renders ``opt-set NAME : VALUE`` entries as ``NAME=VALUE`` lines.\"\"\"
+
+        def render(self, entries):
+            return [
+                "{}={}".format("".join(entry['params']), entry['value'])
+                for entry in entries if entry['value'] is not None
+            ]
+
+    parser.gen_option_list("SECTION_A", generator="env")
+
+:py:meth:`Generator.render` receives all the entries of a section in a single
+call, so a generator can process them as a whole (i.e., group or join them). The
+default implementation renders each entry with the parser's program option
+handlers, ``_program_option_handler_<operation>_<generator>()``, but looks each
+handler up once per section and operation instead of once per entry. Generator
+names without a registered class use this default, so handlers defined by
+subclasses of ``SetProgramOptions`` keep working.
+
+The ``bash`` and ``cmake_fragment`` generators implement the rendering of the
+``opt-set`` and ``opt-set-cmake-var`` entries themselves and
+:py:meth:`Generator.render` calls their methods directly. The program option
+handlers of ``SetProgramOptions`` and ``SetProgramOptionsCMake`` for these
+generators call the same methods. Handlers that a subclass of the parser
+overrides are used instead.
+
+Packages can provide generators through the ``setprogramoptions.generators``
+entry point group, i.e., in ``pyproject.toml``:
+
+.. code-block:: toml
+
+    [tool.poetry.plugins."setprogramoptions.generators"]
+    env = "my_package.generators:EnvGenerator"
+
+Entry points are loaded the first time a generator name is not found in the
+registry.
+"""
+from __future__ import print_function
+
+import sys
+import threading
+
+
+
+ENTRY_POINT_GROUP = "setprogramoptions.generators"
+
+# Registered generator classes by name.
+_REGISTRY = {}
+
+# Entry points of generators that are not loaded yet, by name.
+_ENTRY_POINTS = {}
+_ENTRY_POINTS_LOADED = False
+_REGISTRY_LOCK = threading.RLock()
+
+# The modules of the parsers that use the handlers of the built-in generators.
+_BASE_MODULES = ("setprogramoptions.SetProgramOptions", "setprogramoptions.SetProgramOptionsCMake")
+
+
+
+class Generator(object):
+    """
+    Base class of the generators.
+
+    Args:
+        parser (SetProgramOptions): The parser whose entries are rendered.
+        name (str): The generator name. Defaults to the class attribute :py:attr:`name`.
+
+    Attributes:
+        name (str): The name of the generator, used to locate program option handlers.
+        parser (SetProgramOptions): The parser.
+    """
+
+    name = None
+
+    # Program option handlers of the parser that this class implements, by handler name:
+    # the name of the method of this class and the names of the parser methods it uses
+    # in place of. The method is used if none of these are overridden by the parser.
+    _handler_methods = {}
+
+    def __init__(self, parser, name=None):
+        self.parser = parser
+        if name is not None:
+            self.name = name
+
+    def render(self, entries: list) -> list:
+        """Generate the option list of a section.
+
+        The CMake symbol table of the parser is reset before this is called.
+
+        Args:
+            entries (list): The option entries of the section, in order.
+
+        Returns:
+            list: The option list.
+        """
+        parser = self.parser
+        name = self.name
+
+        # A subclass of the parser that customizes how single entries or values are
+        # generated is rendered entry by entry.
+        if type(parser)._gen_option_entry is not _base_method("_gen_option_entry") \
+                or type(parser)._format_option_value is not _base_method("_format_option_value"):
+            return [line for line in map(self.render_entry, entries) if line is not None]
+
+        formatter = parser._prepare_var_formatter(name)
+        format_value = parser._format_option_value
+        handlers = {}
+        output = []
+        for entry in entries:
+            types = entry['type']
+            key = tuple(types)
+            handler = handlers.get(key)
+            if handler is None:
+                handler = handlers[key] = self._locate_handler(types)
+            if handler is None:
+                parser._program_option_handler_not_found(types, name)
+                continue
+
+            line = handler(list(entry['params']), format_value(entry['value'], name, formatter))
+            if line is not None:
+                output.append(line)
+        return output
+
+    def render_entry(self, option_entry: dict):
+        """Generate the line of a single option entry.
+
+        Used instead of :py:meth:`render` when the parser collects statistics or has
+        event hooks, which need to see each entry.
+
+        Returns:
+            Union[str,None]: The line, or ``None`` if the entry generates no line.
+        """
+        return self.parser._gen_option_entry(option_entry, generator=self.name)
+
+    @classmethod
+    def join(cls, option_list: list) -> str:
+        """Join an option list into the text of a file (without a final newline)."""
+        return "\n".join(option_list)
+
+    def _locate_handler(self, types: list):
+        """The callable that renders the entries of an operation.
+
+        Returns:
+            callable: The method of this class that implements the program option
+            handler of the parser, the handler, or ``None`` if there is no handler.
+        """
+        parser = self.parser
+        method_name, method_ref = parser._locate_program_option_handler(types, self.name)
+        implementation = self._handler_methods.get(method_name)
+        if implementation is not None:
+            method, parser_methods = implementation
+            if all(_is_base_method(parser, name) for name in (method_name, ) + parser_methods):
+                return getattr(self, method)
+        return method_ref
+
+
+
+class BashGenerator(Generator):
+    """Generates the arguments of a ``bash`` command."""
+
+    name = "bash"
+
+    _handler_methods = {
+        "_program_option_handler_opt_set_bash": ("opt_set", ("_generic_program_option_handler_bash", )),
+        "_program_option_handler_opt_set_cmake_var_bash": ("opt_set_cmake_var", ()),
+    }
+
+    @classmethod
+    def join(cls, option_list: list) -> str:
+        """Join the arguments into a command with one argument per line."""
+        return " \\\n   ".join(option_list)
+
+    @staticmethod
+    def option(params: list, value) -> str:
+        """Generate an option: the parameters concatenated, ``=`` and the value.
+
+        ``STRING`` values are surrounded by double quotes.
+
+        Args:
+            params (list): The parameters.
+            value (str): The formatted value, or ``None`` for an option without a value.
+
+        Returns:
+            str: The option.
+        """
+        output = "".join(params)
+        if value is not None:
+            # Make sure STRING flag values are surrounded by double quotes
+            if "STRING" in output and not value.startswith('"') and not value.endswith('"'):
+                value = f'"{value}"'
+            output += "=" + value
+        return output
+
+    def opt_set(self, params: list, value) -> str:
+        """Generate the option of an ``opt-set`` entry."""
+        return self.option(params, value)
+
+    def opt_set_cmake_var(self, params: list, value):
+        """Generate the ``-D`` option of an ``opt-set-cmake-var`` entry (``SetProgramOptionsCMake``).
+
+        Entries that can not be set on the command line are skipped with a warning, see
+        :py:meth:`~setprogramoptions.SetProgramOptionsCMake._helper_opt_set_cmake_var_bash_skip`.
+        The variable is recorded in the CMake symbol table of the parser.
+
+        Returns:
+            Union[str,None]: The option, or ``None`` if the entry is skipped.
+        """
+        parser = self.parser
+        varname = params[0]
+        param_opts = parser._helper_opt_set_cmake_var_parse_parameters(params[1 : 4], varname)
+
+        if parser._helper_opt_set_cmake_var_bash_skip(varname, value, param_opts):
+            return None
+
+        # Save variable to the cache of 'known'/'set' cmake variables
+        parser._var_formatter_cache[varname] = value
+
+        # If the type is provided then include the `:<typename>` argument.
+        # Note: CMake defaults to STRING if not provided.
+        return parser._generic_program_option_handler_bash(["-D", varname, ":" + param_opts['TYPE']], value)
+
+
+
+class CMakeFragmentGenerator(Generator):
+    """Generates the ``set()`` commands of a CMake fragment (``SetProgramOptionsCMake``)."""
+
+    name = "cmake_fragment"
+
+    _handler_methods = {
+        "_program_option_handler_opt_set_cmake_fragment": ("opt_set", ()),
+        "_program_option_handler_opt_set_cmake_var_cmake_fragment": ("opt_set_cmake_var", ()),
+    }
+
+    def opt_set(self, params: list, value):
+        """``opt-set`` entries generate nothing in a CMake fragment."""
+        return None
+
+    def opt_set_cmake_var(self, params: list, value) -> str:
+        """Generate the ``set()`` command of an ``opt-set-cmake-var`` entry.
+
+        Returns:
+            str: ``set(<variable> <value> [CACHE <type> <docstring>] [PARENT_SCOPE] [FORCE])``
+        """
+        varname = params[0]
+        param_opts = self.parser._helper_opt_set_cmake_var_parse_parameters(params[1 : 4], varname)
+
+        params = [varname, value]
+        if param_opts['TYPE'] is not None:
+            params.append("CACHE")
+            params.append(param_opts["TYPE"])
+            params.append('"from .ini configuration"')
+
+        if param_opts['PARENT_SCOPE']:
+            params.append("PARENT_SCOPE")
+
+        if param_opts['FORCE']:
+            params.append("FORCE")
+
+        return "set({})".format(" ".join(params))
+
+
+
+class CMakeInitialCacheGenerator(Generator):
+    """Generates the cache ``set()`` commands of a CMake initial cache script (``cmake -C``)."""
+
+    name = "cmake_initial_cache"
+
+
+
+def _base_method(method_name):
+    """The implementation of a method in ``SetProgramOptions``, for override checks."""
+    from .SetProgramOptions import SetProgramOptions
+    return getattr(SetProgramOptions, method_name)
+
+
+
+def _is_base_method(parser, method_name: str) -> bool:
+    """``True`` if ``parser`` uses the implementation of a class in ``_BASE_MODULES``."""
+    for cls in type(parser).__mro__:
+        if method_name in cls.__dict__:
+            return cls.__module__ in _BASE_MODULES
+    return False
+
+
+
+def register_generator(name: str, generator_class=None, replace=False):
+    """Register a generator class under a name.
+
+    Can be used as a class decorator: ``@register_generator("env")``.
+
+    Args:
+        name (str): The generator name.
+        generator_class (type): A subclass of :py:class:`Generator`.
+        replace (bool): Replace a generator that is already registered under ``name``.
+
+    Returns:
+        type: ``generator_class``, or a decorator if it is ``None``.
+
+    Raises:
+        TypeError: If ``generator_class`` is not a subclass of :py:class:`Generator`.
+        ValueError: If a generator is already registered under ``name`` and ``replace`` is ``False``.
+    """
+    if generator_class is None:
+        return lambda cls: register_generator(name, cls, replace)
+
+    if not (isinstance(generator_class, type) and issubclass(generator_class, Generator)):
+        raise TypeError(f"The generator `{name}` must be a subclass of `Generator`.")
+    with _REGISTRY_LOCK:
+        if not replace and _REGISTRY.get(name, generator_class) is not generator_class:
+            raise ValueError(f"A generator named `{name}` is already registered.")
+        _REGISTRY[name] = generator_class
+        _ENTRY_POINTS.pop(name, None)
+    return generator_class
+
+
+
+def unregister_generator(name: str):
+    """Remove a generator from the registry (no error if it is not registered)."""
+    with _REGISTRY_LOCK:
+        _REGISTRY.pop(name, None)
+        _ENTRY_POINTS.pop(name, None)
+    return
+
+
+
+def get_generator(name: str):
+    """The generator class registered under ``name``.
+
+    Loads the ``setprogramoptions.generators`` entry points the first time a name is
+    not registered.
+
+    Returns:
+        type: The generator class, or ``None`` if no generator is registered under ``name``.
+    """
+    generator_class = _REGISTRY.get(name)
+    if generator_class is not None:
+        return generator_class
+
+    with _REGISTRY_LOCK:
+        if not _ENTRY_POINTS_LOADED:
+            load_entry_points()
+        entry_point = _ENTRY_POINTS.pop(name, None)
+        if entry_point is not None:
+            register_generator(name, entry_point.load())
+        return _REGISTRY.get(name)
+
+
+
+def available_generators() -> list:
+    """The names of the registered generators, including generators from entry points."""
+    with _REGISTRY_LOCK:
+        if not _ENTRY_POINTS_LOADED:
+            load_entry_points()
+        return sorted(set(_REGISTRY) | set(_ENTRY_POINTS))
+
+
+
+def load_entry_points():
+    """Find the generators of the ``setprogramoptions.generators`` entry point group.
+
+    The entry points are loaded when their generator is first requested. Generators
+    that are already registered are not replaced. Call this again to find entry
+    points of packages that were installed after the first search.
+    """
+    global _ENTRY_POINTS_LOADED
+    with _REGISTRY_LOCK:
+        for entry_point in _iter_entry_points(ENTRY_POINT_GROUP):
+            if entry_point.name not in _REGISTRY:
+                _ENTRY_POINTS.setdefault(entry_point.name, entry_point)
+        _ENTRY_POINTS_LOADED = True
+    return
+
+
+
+def _iter_entry_points(group):
+    try:
+        from importlib import metadata
+    except ImportError:                              # pragma: no cover
+        try:
+            import importlib_metadata as metadata    # Python < 3.8
+        except ImportError:
+            return []
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, []))         # pragma: no cover
+
+
+
+register_generator("bash", BashGenerator)
+register_generator("cmake_fragment", CMakeFragmentGenerator)
+register_generator("cmake_initial_cache", CMakeInitialCacheGenerator)
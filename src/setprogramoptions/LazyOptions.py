@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+LazyOptions
+===========
+
+The mapping behind :py:attr:`SetProgramOptions.options <setprogramoptions.SetProgramOptions.options>`.
+
+Its keys are the sections of the loaded ``.ini`` file (from ``configparserdata``,
+so nothing is parsed or indexed to list them) plus the sections that were
+assigned to it, i.e., virtual sections. A section is parsed the first
+time its option entries are looked up and the entries are kept, so code that only
+touches a few sections only pays for parsing those:
+
+.. code-block:: python
+    :linenos:
+
+    parser = SetProgramOptionsCMake("config.ini")
+    "SECTION_A" in parser.options      # True, nothing is parsed
+    parser.options["SECTION_A"]        # parses SECTION_A
+    parser.options.loaded              # ['SECTION_A']
+
+If :py:attr:`~setprogramoptions.SetProgramOptions.prefetch_used_sections` is
+enabled, the sections that a section ``use``-es (recursively) are parsed along
+with it. Only this uses the
+:py:attr:`~setprogramoptions.SetProgramOptions.section_index`.
+
+Iterating over the values (i.e., ``items()`` or ``dict(parser.options)``) parses
+every section. Deleting a section removes it from the mapping until it is parsed
+again with :py:meth:`~setprogramoptions.SetProgramOptions.parse_section` or
+assigned again. :py:attr:`LazyOptions.modified` tells if sections have been
+assigned or deleted other than by parsing them, i.e., if the mapping differs from
+what parsing the ``.ini`` file produces.
+"""
+from __future__ import print_function
+
+from collections.abc import MutableMapping
+
+
+
+class LazyOptions(MutableMapping):
+    """
+    A mapping of section names to option entries that parses sections on first access.
+
+    Args:
+        parser (SetProgramOptions): The parser that parses the sections.
+    """
+
+    def __init__(self, parser):
+        self._parser = parser
+        self._entries = {}
+        self._removed = set()
+        self._assigned = set()
+        # > 0 while ``parse_section`` runs, see ``SetProgramOptions.parse_section``.
+        self._parsing = 0
+
+    @property
+    def loaded(self) -> list:
+        """The sections whose option entries have been parsed or assigned, in that order."""
+        return list(self._entries)
+
+    @property
+    def modified(self) -> bool:
+        """``True`` if sections have been assigned or deleted other than by parsing them."""
+        return bool(self._assigned or self._removed)
+
+    def is_loaded(self, section: str) -> bool:
+        """Check if the option entries of ``section`` have been parsed or assigned."""
+        return section in self._entries
+
+    def __getitem__(self, section):
+        if section in self._entries:
+            return self._entries[section]
+        if section in self._removed or not self._has_file_section(section):
+            raise KeyError(section)
+
+        parser = self._parser
+        parser.parse_section(section)
+        if parser.prefetch_used_sections:
+            for used_section in parser.section_index.uses(section, transitive=True):
+                if used_section not in self._entries and used_section not in self._removed:
+                    parser.parse_section(used_section)
+
+        try:
+            return self._entries[section]
+        except KeyError:
+            # `handler_finalize` of a subclass did not store the entries.
+            raise KeyError(section) from None
+
+    def __setitem__(self, section, entries):
+        self._entries[section] = entries
+        self._removed.discard(section)
+        if self._parsing:
+            self._assigned.discard(section)
+        else:
+            self._assigned.add(section)
+        return
+
+    def __delitem__(self, section):
+        if section not in self:
+            raise KeyError(section)
+        self._entries.pop(section, None)
+        self._assigned.discard(section)
+        if self._has_file_section(section):
+            self._removed.add(section)
+        return
+
+    def __contains__(self, section):
+        if section in self._entries:
+            return True
+        return section not in self._removed and self._has_file_section(section)
+
+    def __iter__(self):
+        file_sections = self._file_sections()
+        for section in file_sections:
+            if section not in self._removed:
+                yield section
+        file_sections = set(file_sections)
+        for section in list(self._entries):
+            if section not in file_sections:
+                yield section
+
+    def __len__(self):
+        return sum(1 for section in self)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(loaded={self.loaded!r}, sections={len(self)})"
+
+    def _file_sections(self) -> list:
+        """The sections of the loaded ``.ini`` file, empty if no file has been set."""
+        try:
+            return self._parser.configparserdata.sections()
+        except ValueError:
+            # The filename has not been specified yet.
+            return []
+
+    def _has_file_section(self, section) -> bool:
+        """Check if the loaded ``.ini`` file has ``section``, ``False`` if no file has been set."""
+        try:
+            return self._parser.configparserdata.has_section(section)
+        except ValueError:
+            # The filename has not been specified yet.
+            return False
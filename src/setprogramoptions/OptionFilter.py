@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+OptionFilter
+============
+
+Filters that select the option entries :py:meth:`~setprogramoptions.SetProgramOptions.gen_option_list`
+and :py:meth:`~setprogramoptions.SetProgramOptions.iter_option_list` render.
+
+An :py:class:`OptionFilter` matches entries by their operation, their parameters
+and their *name*: the CMake variable of an ``opt-set-cmake-var`` entry or the
+joined parameters of an ``opt-set`` entry (the text before the ``=``). The
+``entry_filter`` argument also accepts shortcuts that are converted by
+:py:func:`make_entry_filter`:
+
+- A ``str`` is a glob pattern (:py:func:`fnmatch.fnmatchcase`) for the name.
+- A compiled regular expression is searched for in the name.
+- A callable is a predicate that receives the option entry.
+
+.. code-block:: python
+    :linenos:
+
+    parser.gen_option_list("TRILINOS_CONFIGURATION_ALPHA", "bash", entry_filter="Trilinos_ENABLE_*")
+    parser.gen_option_list("TRILINOS_CONFIGURATION_ALPHA", "bash", entry_filter=OptionFilter(op="opt-set"))
+
+Filters are applied to the option entries before their values are expanded, so
+entries that are filtered out are not rendered.
+"""
+from __future__ import print_function
+
+from fnmatch import fnmatchcase
+import re
+
+
+
+# The type of compiled regular expressions (`re.Pattern` is not available before Python 3.7).
+_PATTERN_TYPE = type(re.compile(""))
+
+
+
+class OptionFilter(object):
+    """
+    Selects option entries. An entry is selected if it matches all the given criteria.
+
+    Args:
+        name (str,re.Pattern): A glob pattern that matches the whole name of the entry
+            or a regular expression that is found in it.
+        op (str,list): The operation (i.e., ``opt-set``), or a list of operations, of
+            the entry. Glob patterns are allowed and ``-`` and ``_`` are equivalent.
+        params (str,re.Pattern): A pattern (see ``name``) that matches at least one of
+            the parameters of the entry.
+        predicate (callable): A function that receives the option entry and returns
+            ``True`` if it is selected.
+        exclude (bool): Select the entries that do *not* match instead.
+    """
+
+    def __init__(self, name=None, op=None, params=None, predicate=None, exclude=False):
+        if predicate is not None and not callable(predicate):
+            raise TypeError(f"The predicate `{predicate}` is not callable.")
+        if isinstance(op, str):
+            op = [op]
+        self.name = name
+        self.op = None if op is None else [str(item).replace("-", "_") for item in op]
+        self.params = params
+        self.predicate = predicate
+        self.exclude = exclude
+        self._name_match = None if name is None else _pattern_matcher(name)
+        self._params_match = None if params is None else _pattern_matcher(params)
+
+    def matches(self, option_entry: dict, name: str) -> bool:
+        """Check if an option entry is selected.
+
+        Args:
+            option_entry (dict): The option entry.
+            name (str): The name of the entry.
+
+        Returns:
+            bool: ``True`` if the entry is selected.
+        """
+        return self._matches(option_entry, name) != self.exclude
+
+    def __repr__(self):
+        values = (("name", self.name), ("op", self.op), ("params", self.params),
+                  ("predicate", self.predicate))
+        criteria = [f"{key}={value!r}" for key, value in values if value is not None]
+        if self.exclude:
+            criteria.append("exclude=True")
+        return f"{self.__class__.__name__}({', '.join(criteria)})"
+
+    def _matches(self, option_entry: dict, name: str) -> bool:
+        if self.op is not None:
+            if not any(fnmatchcase(typename, op) for typename in option_entry['type'] for op in self.op):
+                return False
+        if self._name_match is not None and not self._name_match(name):
+            return False
+        if self._params_match is not None and not any(map(self._params_match, option_entry['params'])):
+            return False
+        if self.predicate is not None and not self.predicate(option_entry):
+            return False
+        return True
+
+
+
+def make_entry_filter(entry_filter) -> OptionFilter:
+    """Convert an ``entry_filter`` argument to an :py:class:`OptionFilter`.
+
+    Args:
+        entry_filter: An :py:class:`OptionFilter`, a glob pattern or compiled regular
+            expression for the name of the entries or a predicate.
+
+    Returns:
+        OptionFilter: The filter.
+
+    Raises:
+        TypeError: If ``entry_filter`` is none of these.
+    """
+    if isinstance(entry_filter, OptionFilter):
+        return entry_filter
+    if isinstance(entry_filter, (str, _PATTERN_TYPE)):
+        return OptionFilter(name=entry_filter)
+    if callable(entry_filter):
+        return OptionFilter(predicate=entry_filter)
+    raise TypeError(f"`{entry_filter!r}` is not a valid entry filter.")
+
+
+
+def _pattern_matcher(pattern):
+    """A function that matches strings against a glob pattern or a compiled regular expression."""
+    if isinstance(pattern, str):
+        return lambda text: fnmatchcase(text, pattern)
+    if isinstance(pattern, _PATTERN_TYPE):
+        return lambda text: pattern.search(text) is not None
+    raise TypeError(f"`{pattern!r}` is not a glob pattern or a regular expression.")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+ParserStats
+===========
+
+Opt-in timing and counter instrumentation for ``SetProgramOptions``.
+
+Every ``SetProgramOptions`` object has a :py:attr:`~setprogramoptions.SetProgramOptions.stats`
+property that holds a :py:class:`ParserStats` object. Instrumentation is disabled
+by default and the instrumented code paths only check :py:attr:`ParserStats.enabled`
+when it is disabled.
+
+.. code-block:: python
+    :linenos:
+
+    parser = SetProgramOptionsCMake(filename)
+    parser.stats.enabled = True
+    parser.gen_option_list("SECTION", "bash")
+    print(parser.stats.to_json(indent=2))
+
+Timings are recorded as cumulative seconds with the number of calls. The keys are:
+
+- ``parse_section`` and ``gen_option_list``: the public entry points.
+- ``handler:<name>``: each ``.ini`` operation handler, i.e., ``handler:_handler_opt_set``.
+- ``program_option_handler:<name>``: each generator handler, i.e.,
+  ``program_option_handler:_program_option_handler_opt_set_bash``.
+- ``expand``: variable field expansion of option values.
+
+Counters are:
+
+- ``expand_field:<VARTYPE>``: the number of expanded ``${VARNAME|VARTYPE}`` fields.
+- ``entries_removed``: the number of entries removed by ``opt-remove`` operations.
+- ``options_cache:hit`` / ``options_cache:miss``: ``gen_option_list`` calls that
+  found the section already parsed in ``options`` (or had to parse it).
+- ``var_cache:hit`` / ``var_cache:miss``: ``${VARNAME|CMAKE}`` lookups in the
+  CMake symbol table by the ``bash`` generator.
+"""
+from __future__ import print_function
+
+import time
+
+
+
+class ParserStats(object):
+    """
+    Cumulative timings and counters collected by a parser.
+
+    Args:
+        enabled (bool): If ``True`` then statistics are collected.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    # -------------------------------
+    #   P U B L I C   M E T H O D S
+    # -------------------------------
+
+    def reset(self):
+        """Discard all collected timings and counters."""
+        self._timings = {}
+        self._counters = {}
+        return
+
+    def add_time(self, name: str, elapsed: float):
+        """Add ``elapsed`` seconds and one call to the timing ``name``."""
+        timing = self._timings.get(name)
+        if timing is None:
+            self._timings[name] = [1, elapsed]
+        else:
+            timing[0] += 1
+            timing[1] += elapsed
+        return
+
+    def increment(self, name: str, amount=1):
+        """Add ``amount`` to the counter ``name``."""
+        self._counters[name] = self._counters.get(name, 0) + amount
+        return
+
+    def timed(self, name: str, func, *args, **kwargs):
+        """Call ``func(*args, **kwargs)`` and add its run time to the timing ``name``.
+
+        Returns:
+            The return value of ``func``.
+        """
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def wrap(self, name: str, func):
+        """Return a callable that calls ``func`` and records its run time as ``name``."""
+
+        def timed_func(*args, **kwargs):
+            return self.timed(name, func, *args, **kwargs)
+
+        return timed_func
+
+    @property
+    def timings(self) -> dict:
+        """The timings as ``{name: {"count": int, "total": float}}``."""
+        return {name: {"count": count, "total": total} for name, (count, total) in self._timings.items()}
+
+    @property
+    def counters(self) -> dict:
+        """The counters as ``{name: int}``."""
+        return dict(self._counters)
+
+    def as_dict(self) -> dict:
+        """The collected statistics as a ``dict``."""
+        return {"enabled": self.enabled, "timings": self.timings, "counters": self.counters}
+
+    def to_json(self, **kwargs) -> str:
+        """The collected statistics as a JSON string.
+
+        Args:
+            kwargs: Passed on to ``json.dumps``.
+        """
+        kwargs.setdefault("sort_keys", True)
+        import json
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def __repr__(self):
+        output = f"{self.__class__.__name__}(enabled={self.enabled!r},"
+        output += f" timings={len(self._timings)}, counters={len(self._counters)})"
+        return output
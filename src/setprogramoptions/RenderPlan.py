@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+RenderPlan
+==========
+
+A :py:class:`RenderPlan` is a section compiled for one generator by
+:py:meth:`~setprogramoptions.SetProgramOptions.compile_section`. Compiling does
+the work of :py:meth:`~setprogramoptions.SetProgramOptions.gen_option_list` that
+does not depend on the state at the time of rendering once:
+
+- The program option handler of each entry is located and bound.
+- ``opt-set`` parameters are joined into the prefix of the ``bash`` option.
+- Values with spaces are quoted and split into text and ``${VARNAME|VARTYPE}``
+  fields, and the field handlers are located.
+- Values whose fields always expand to the same text (i.e., ``ENV`` fields) are
+  expanded, and entries whose handler only depends on the parameters and the
+  value are rendered.
+
+:py:meth:`RenderPlan.execute` then only evaluates what is left: the fields that
+depend on the CMake variables set by earlier entries and the handlers that keep
+track of them or raise ``exception_control_event`` events. The current
+``exception_control_level`` is used, so a plan can be executed under different
+settings:
+
+.. code-block:: python
+    :linenos:
+
+    plan = parser.compile_section("TRILINOS_CONFIGURATION_ALPHA", "bash")
+    option_list = plan.execute()
+
+Handlers and field handlers are only treated as stateless if the class that
+defines them lists them in ``_stateless_program_option_handlers`` (parsers) or
+``_stateless_fieldhandlers`` (variable formatters), so overriding one in a
+subclass makes it run on every execution.
+
+A plan is recompiled when it is executed after the entries of its section
+changed, i.e., after the section was parsed again or assigned in
+:py:attr:`~setprogramoptions.SetProgramOptions.options`, or after entries were
+added, removed, replaced or changed in place. The plan keeps the identity and the
+``type``, ``params`` and ``value`` of each entry to detect this.
+:py:meth:`RenderPlan.invalidate` marks a plan as outdated explicitly.
+"""
+from __future__ import print_function
+
+from .common import get_function_ref
+
+
+
+# Kinds of plan steps.
+STEP_LINE = 0           # (STEP_LINE, line)
+STEP_CALL = 1           # (STEP_CALL, handler, params, value)
+STEP_NOT_FOUND = 2      # (STEP_NOT_FOUND, types, None, None)
+
+
+
+def _entries_signature(entries: list) -> list:
+    """The identity, ``type``, ``params`` and ``value`` of each entry, to detect changes of ``entries``."""
+    return [(id(entry), tuple(entry['type']), tuple(entry['params']), entry['value']) for entry in entries]
+
+
+
+class _RawValue(object):
+    """A value that is expanded by the formatter each time, because it could not be tokenized."""
+
+    __slots__ = ("text", )
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+
+class RenderPlan(object):
+    """
+    A section compiled for a generator, see :py:mod:`setprogramoptions.RenderPlan`.
+
+    Args:
+        parser (SetProgramOptions): The parser that owns the section.
+        section (str): The section (or virtual section), which is parsed if needed.
+        generator (str): The generator.
+
+    Attributes:
+        parser (SetProgramOptions): The parser.
+        section (str): The section.
+        generator (str): The generator.
+        steps (list): The compiled steps, one per entry that can render a line.
+        fallback (bool): ``True`` if the plan can not be compiled because the parser
+            or the generator customizes how sections are rendered, in which case
+            :py:meth:`execute` calls :py:meth:`~setprogramoptions.SetProgramOptions.gen_option_list`.
+    """
+
+    def __init__(self, parser, section: str, generator: str = 'bash'):
+        self.parser = parser
+        self.section = section
+        self.generator = generator
+        self.steps = []
+        self.fallback = False
+        self._source = None
+        self.compile()
+
+    @property
+    def is_valid(self) -> bool:
+        """``True`` if the plan was compiled from the current entries of the section."""
+        source = self._source
+        if source is None:
+            return False
+        options = self.parser.options
+        entries = options.get(self.section)
+        return source[0] is options and source[1] is entries and source[3] is self.parser._var_formatter \
+            and entries is not None and source[2] == _entries_signature(entries)
+
+    def invalidate(self):
+        """Mark the plan as outdated, it is compiled again the next time it is executed."""
+        self._source = None
+        return
+
+    def compile(self):
+        """Compile the current entries of the section."""
+        parser = self.parser
+        generator = self.generator
+        parser._validate_parameter(self.section, (str))
+        parser._validate_parameter(generator, (str))
+
+        if self.section not in parser.options.keys():
+            parser.parse_section(self.section)
+        entries = parser.options[self.section]
+        formatter = parser._prepare_var_formatter(generator)
+
+        generator_ref = parser._get_generator(generator)
+        self.fallback = type(generator_ref).render is not _generator_base().render \
+            or type(parser)._gen_option_entry is not _parser_base()._gen_option_entry \
+            or type(parser)._format_option_value is not _parser_base()._format_option_value
+
+        steps = []
+        if not self.fallback:
+            handlers = {}
+            join_params = _joins_params(parser)
+            tokenize = type(formatter).process is _formatter_base().process
+            for entry in entries:
+                key = tuple(entry['type'])
+                handler = handlers.get(key)
+                if handler is None:
+                    handler = handlers[key] = parser._locate_program_option_handler(entry['type'], generator)
+                step = self._compile_entry(entry, handler, formatter, tokenize, join_params)
+                if step is not None:
+                    steps.append(step)
+
+        self.steps = steps
+        self._source = (parser.options, entries, _entries_signature(entries), parser._var_formatter)
+        return
+
+    def execute(self) -> list:
+        """Render the section.
+
+        The result is the same as the result of
+        :py:meth:`~setprogramoptions.SetProgramOptions.gen_option_list`, which is used
+        instead while :py:attr:`~setprogramoptions.SetProgramOptions.stats` is enabled
+        or event hooks are registered.
+
+        Returns:
+            list: The option list.
+        """
+        if not self.is_valid:
+            self.compile()
+
+        parser = self.parser
+        generator = self.generator
+        if self.fallback or parser._stats_enabled or parser._event_hooks is not None:
+            return parser.gen_option_list(self.section, generator)
+
+        # Reset the cached vars in the formatter utility
+        del parser._var_formatter_cache
+        formatter = parser._prepare_var_formatter(generator)
+
+        output = []
+        collecting = parser._warning_collection_begin()
+        try:
+            for kind, handler, params, value in self.steps:
+                if kind == STEP_LINE:
+                    output.append(handler)
+                    continue
+                if kind == STEP_NOT_FOUND:
+                    parser._program_option_handler_not_found(handler, generator)
+                    continue
+
+                if value is not None and value.__class__ is not str:
+                    if value.__class__ is _RawValue:
+                        value = formatter.process(value.text)
+                    else:
+                        value = "".join(
+                            [token if token.__class__ is str else token[0](token[1]) for token in value]
+                        )
+
+                line = handler(list(params), value)
+                if line is not None:
+                    output.append(line)
+        finally:
+            if collecting:
+                parser._warning_collection_end(f"`{self.section}` ({generator})")
+
+        return output
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.section!r}, {self.generator!r}, steps={len(self.steps)})"
+
+    # ---------------
+    #  H E L P E R S
+    # ---------------
+
+    def _compile_entry(self, entry: dict, handler: tuple, formatter, tokenize: bool, join_params: bool):
+        """Compile one option entry.
+
+        Returns:
+            tuple: The step, or ``None`` if the entry never renders a line.
+        """
+        parser = self.parser
+        method_name, method_ref = handler
+        if method_ref is None:
+            return (STEP_NOT_FOUND, list(entry['type']), None, None)
+
+        value = entry['value']
+        if value is not None:
+            value = parser._quote_option_value(value)
+            value = self._compile_value(value, formatter) if tokenize else _RawValue(value)
+
+        params = tuple(entry['params'])
+        if value is None or value.__class__ is str:
+            if _is_stateless(parser, method_name, "_stateless_program_option_handlers"):
+                line = method_ref(list(params), value)
+                return None if line is None else (STEP_LINE, line, None, None)
+
+        if join_params and method_name == "_program_option_handler_opt_set_bash":
+            params = ("".join(params), )
+        return (STEP_CALL, method_ref, params, value)
+
+    def _compile_value(self, value: str, formatter):
+        """Split a value into text and fields.
+
+        Returns:
+            Union[str,list,_RawValue]: The expanded value if it does not depend on the
+            state, otherwise a list of text and ``(field_handler, field)`` tuples.
+        """
+        try:
+            tokens = formatter._tokenize_text_string(value)
+        except ValueError:
+            # Raise the error each time the value is expanded, like `gen_option_list`.
+            return _RawValue(value)
+
+        output = []
+        static = True
+        for token in tokens:
+            if isinstance(token, formatter.VariableFieldData):
+                method_name = "_fieldhandler_{}_{}".format(formatter.generator, token.vartype)
+                if not hasattr(formatter, method_name):
+                    return _RawValue(value)
+                field_handler = get_function_ref(formatter, method_name)
+                if _is_stateless(formatter, method_name, "_stateless_fieldhandlers"):
+                    token = field_handler(token)
+                else:
+                    static = False
+                    token = (field_handler, token)
+            if output and token.__class__ is str and output[-1].__class__ is str:
+                output[-1] += token
+            else:
+                output.append(token)
+
+        if static:
+            return "".join(output)
+        return output
+
+
+
+def _is_stateless(obj, method_name: str, attribute: str) -> bool:
+    """``True`` if the class that defines ``method_name`` lists it in its ``attribute``."""
+    for cls in type(obj).__mro__:
+        if method_name in cls.__dict__:
+            return method_name in cls.__dict__.get(attribute, ())
+    return False
+
+
+
+def _joins_params(parser) -> bool:
+    """``True`` if the ``opt-set`` ``bash`` handler of ``parser`` only joins the parameters."""
+    base = _parser_base()
+    return type(parser)._program_option_handler_opt_set_bash is base._program_option_handler_opt_set_bash \
+        and type(parser)._generic_program_option_handler_bash is base._generic_program_option_handler_bash
+
+
+
+def _parser_base():
+    from .SetProgramOptions import SetProgramOptions
+    return SetProgramOptions
+
+
+
+def _formatter_base():
+    from .SetProgramOptions import ExpandVarsInText
+    return ExpandVarsInText
+
+
+
+def _generator_base():
+    from .Generator import Generator
+    return Generator
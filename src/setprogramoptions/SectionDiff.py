@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+SectionDiff
+===========
+
+The result of :py:meth:`~setprogramoptions.SetProgramOptions.diff_sections` and the
+helpers used by the section set operations
+(:py:meth:`~setprogramoptions.SetProgramOptions.section_union`,
+:py:meth:`~setprogramoptions.SetProgramOptions.section_intersection` and
+:py:meth:`~setprogramoptions.SetProgramOptions.section_difference`).
+
+Sections are compared either by their option entries or by the lines a generator
+renders for them. Each entry (or line) is reduced to a hashable key and the keys
+are matched as multisets with a counter, so comparing two sections takes time
+linear in the number of entries. Repeated entries are matched one by one, i.e.,
+an entry that appears twice in ``A`` and once in ``B`` is common once and only in
+``A`` once.
+"""
+from __future__ import print_function
+
+from collections import Counter
+
+
+
+def entry_key(option_entry: dict) -> tuple:
+    """A hashable key that identifies an option entry by its type, parameters and value."""
+    return (tuple(option_entry['type']), tuple(option_entry['params']), option_entry['value'])
+
+
+
+def entry_to_text(option_entry: dict) -> str:
+    """Format an option entry like the ``.ini`` line it came from, i.e., ``opt-set -G : Ninja``."""
+    output = " ".join([op.replace("_", "-") for op in option_entry['type']] + list(option_entry['params']))
+    if option_entry['value'] is not None:
+        output += " : " + option_entry['value']
+    return output
+
+
+
+def match_keys(keys_a: list, keys_b: list) -> list:
+    """Match the keys of ``A`` with the keys of ``B``.
+
+    Each key in ``B`` matches one occurrence of the same key in ``A``, starting with
+    the first occurrence.
+
+    Args:
+        keys_a (list): The keys of ``A``.
+        keys_b (list): The keys of ``B``.
+
+    Returns:
+        list: A ``bool`` for each key of ``A``, ``True`` if it is matched by a key of ``B``.
+    """
+    counts = Counter(keys_b)
+    output = []
+    for key in keys_a:
+        if counts[key] > 0:
+            counts[key] -= 1
+            output.append(True)
+        else:
+            output.append(False)
+    return output
+
+
+
+class SectionDiff(object):
+    """
+    The differences between two sections.
+
+    The items are option entries (``dict``) if the sections were compared by their
+    entries, or the generated lines (``str``) if they were compared by the output of
+    ``generator``. A ``SectionDiff`` is ``True`` if the sections differ.
+
+    Attributes:
+        section_a (str): The first section.
+        section_b (str): The second section.
+        generator (str): The generator used to compare the sections, ``None`` if the
+            entries were compared.
+        only_a (list): The items of ``section_a`` that are not in ``section_b``.
+        only_b (list): The items of ``section_b`` that are not in ``section_a``.
+        common (list): The items of ``section_a`` that are also in ``section_b``.
+    """
+
+    def __init__(self, section_a: str, section_b: str, generator, only_a: list, only_b: list, common: list):
+        self.section_a = section_a
+        self.section_b = section_b
+        self.generator = generator
+        self.only_a = only_a
+        self.only_b = only_b
+        self.common = common
+
+    def __bool__(self):
+        return bool(self.only_a or self.only_b)
+
+    def __repr__(self):
+        return (
+            f"SectionDiff({self.section_a!r}, {self.section_b!r}, generator={self.generator!r}, "
+            f"only_a={len(self.only_a)}, only_b={len(self.only_b)}, common={len(self.common)})"
+        )
+
+    @property
+    def identical(self) -> bool:
+        """``True`` if the sections have the same items (regardless of their order)."""
+        return not self
+
+    def as_text(self) -> str:
+        """Format the differences, one item per line.
+
+        Items only in ``A`` are prefixed by ``-`` and items only in ``B`` by ``+``.
+
+        Returns:
+            str: The differences, with a header line naming the sections.
+        """
+        output = [f"--- {self.section_a}", f"+++ {self.section_b}"]
+        for prefix, items in (("-", self.only_a), ("+", self.only_b)):
+            for item in items:
+                output.append(prefix + " " + (item if isinstance(item, str) else entry_to_text(item)))
+        return "\n".join(output)
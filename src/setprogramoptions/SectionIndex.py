@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+SectionIndex
+============
+
+An index of the options of all the sections of a ``.ini`` file that answers
+questions like *"which sections set ``Trilinos_ENABLE_MueLu``?"* with dictionary
+lookups instead of parsing every section.
+
+The index is built once per loaded ``.ini`` file by
+:py:attr:`SetProgramOptions.section_index <setprogramoptions.SetProgramOptions.section_index>`
+from the raw options of each section (no section is parsed) and maps:
+
+- every parameter of every option that adds an entry (i.e., the variable name
+  of an ``opt-set-cmake-var``) to the options that set it,
+- every ``opt-remove`` keyword to the options that remove it,
+- every ``${VARNAME|VARTYPE}`` field in a value to the options that expand it,
+- every section to the sections that ``use`` it.
+
+Each match is an :py:class:`OptionLocation` with the file and line number of
+the option. The query methods are available on ``SetProgramOptions``, i.e.,
+:py:meth:`~setprogramoptions.SetProgramOptions.sections_setting`.
+"""
+from __future__ import print_function
+
+from collections import namedtuple
+import re
+
+
+
+#: The location of an option in a ``.ini`` file.
+#:
+#: - ``section``: The section that contains the option.
+#: - ``operation``: The operation, i.e., ``opt_set_cmake_var``.
+#: - ``params``: The parameters of the operation.
+#: - ``value``: The value of the option (``None`` if there is none).
+#: - ``filename``: The file that contains the option (``None`` if unknown).
+#: - ``lineno``: The line number of the option in the file (``None`` if unknown).
+OptionLocation = namedtuple(
+    "OptionLocation", ["section", "operation", "params", "value", "filename", "lineno"]
+)
+
+#: A ``${VARNAME|VARTYPE}`` field in the value of an option. The ``VARTYPE`` is ``None``
+#: if the field has no type.
+VariableReference = namedtuple("VariableReference", ["varname", "vartype", "location"])
+
+# Same patterns as `configparser.ConfigParser` uses for section headers and options.
+_SECTION_HEADER_RE = re.compile(r"\[(?P<header>.+)\]")
+_OPTION_RE = re.compile(r"(?P<option>.*?)\s*(?P<vi>[=:])\s*(?P<value>.*)$")
+_VARIABLE_FIELD_RE = re.compile(r"\$\{([a-zA-Z0-9_\*\@\[\]]+)(?:\|([a-zA-Z0-9_]+))?\}")
+
+
+
+def scan_option_lines(filenames) -> dict:
+    """Find the line numbers of the options in ``.ini`` files.
+
+    Args:
+        filenames (list): The ``.ini`` files, in the order they are read.
+
+    Returns:
+        dict: ``{(section, option key): (filename, lineno)}``. Options in later files
+        replace options of the same section and key in earlier files.
+    """
+    output = {}
+    for filename in filenames:
+        section = None
+        with open(filename, "r") as ifp:
+            for lineno, line in enumerate(ifp, start=1):
+                stripped = line.strip()
+                if not stripped or stripped[0] in "#;":
+                    continue
+                if line[0].isspace() and section is not None:
+                    # A continuation line of a multi-line value.
+                    continue
+                match = _SECTION_HEADER_RE.match(stripped)
+                if match is not None:
+                    section = match.group("header")
+                    continue
+                if section is None:
+                    continue
+                match = _OPTION_RE.match(stripped)
+                option_key = match.group("option").rstrip() if match is not None else stripped
+                output[(section, option_key)] = (str(filename), lineno)
+    return output
+
+
+
+class SectionIndex(object):
+    """
+    A cross-section index of the options of a ``.ini`` file.
+
+    Args:
+        parser (SetProgramOptions): The parser whose ``configparserdata`` is indexed.
+    """
+
+    def __init__(self, parser):
+        self.sections = list(parser.configparserdata.sections())
+        self._section_order = {section: index for index, section in enumerate(self.sections)}
+        self._setting = {}
+        self._removing = {}
+        self._removing_substr = []
+        self._referencing = {}
+        self._uses = {section: [] for section in self.sections}
+        self._used_by = {}
+
+        lines = scan_option_lines(parser.inifilepath)
+        configparserdata = parser.configparserdata
+        for section in self.sections:
+            for option_key in configparserdata[section].keys():
+                try:
+                    option_key_tok = parser._tokenize_option_key(option_key)
+                except ValueError:
+                    continue
+                if len(option_key_tok) < 1 or not re.match(r"^[\w\-]+$", option_key_tok[0]):
+                    continue
+                operation, params = parser._get_op_components_from_tokenized_option_key(option_key_tok)
+                value = configparserdata.get(section, option_key, raw=True)
+                filename, lineno = lines.get((section, option_key), (None, None))
+                location = OptionLocation(section, operation, tuple(params), value, filename, lineno)
+
+                if operation == "use":
+                    if params:
+                        self._uses[section].append(params[0])
+                        self._used_by.setdefault(params[0], []).append(section)
+                elif operation == "opt_remove":
+                    if len(params) >= 2 and params[1] == "SUBSTR":
+                        self._removing_substr.append(location)
+                    elif params:
+                        self._removing.setdefault(params[0], []).append(location)
+                else:
+                    for param in set(params):
+                        self._setting.setdefault(param, []).append(location)
+
+                if value is not None:
+                    for match in _VARIABLE_FIELD_RE.finditer(value):
+                        vartype = match.group(2).upper() if match.group(2) is not None else None
+                        reference = VariableReference(match.group(1), vartype, location)
+                        self._referencing.setdefault(match.group(1), []).append(reference)
+
+    def setting(self, name: str) -> list:
+        """The options that add entries with the parameter (or CMake variable) ``name``."""
+        return list(self._setting.get(name, []))
+
+    def removing(self, name: str) -> list:
+        """The ``opt-remove`` options that remove entries with the parameter ``name``."""
+        output = list(self._removing.get(name, []))
+        output.extend(location for location in self._removing_substr if location.params[0] in name)
+        return sorted(output, key=self._location_order)
+
+    def referencing(self, varname: str, vartype=None) -> list:
+        """The ``${varname|VARTYPE}`` fields in values, optionally only those of ``vartype``."""
+        references = self._referencing.get(varname, [])
+        if vartype is not None:
+            references = [reference for reference in references if reference.vartype == vartype.upper()]
+        return list(references)
+
+    def uses(self, section: str, transitive=False) -> list:
+        """The sections that ``section`` uses (directly or, if ``transitive``, recursively)."""
+        return self._walk(section, self._uses, transitive)
+
+    def used_by(self, section: str, transitive=True) -> list:
+        """The sections that use ``section`` (recursively unless ``transitive`` is ``False``)."""
+        return self._walk(section, self._used_by, transitive)
+
+    def _walk(self, section, edges, transitive) -> list:
+        seen = set()
+        pending = [section]
+        while pending:
+            current = pending.pop()
+            for neighbour in edges.get(current, []):
+                if neighbour not in seen and neighbour != section:
+                    seen.add(neighbour)
+                    if transitive:
+                        pending.append(neighbour)
+        return sorted(seen, key=lambda name: self._section_order.get(name, len(self.sections)))
+
+    def _location_order(self, location) -> tuple:
+        return (self._section_order.get(location.section, len(self.sections)), location.lineno or 0)
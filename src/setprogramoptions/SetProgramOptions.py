@@ -109,6 +109,10 @@ import configparserenhanced.ExceptionControl
 
 from .common import *
 
+# The modules of the optional features (i.e., `setprogramoptions.Generator` or
+# `setprogramoptions.SectionIndex`) are imported by the methods that use them,
+# so importing this module does not import them.
+
 # ==============================
 #  F R E E   F U N C T I O N S
 # ==============================
@@ -145,6 +149,10 @@ class ExpandVarsInText(ExceptionControl):
     def __init__(self):
         self.exception_control_level = 4
 
+    # Field handlers defined by this class whose result only depends on the field,
+    # see `setprogramoptions.RenderPlan`.
+    _stateless_fieldhandlers = ("_fieldhandler_BASH_ENV", )
+
     class VariableFieldData(object):
         """
         This is essentially a dataclass that is used to pass field data around within
@@ -189,6 +197,10 @@ class ExpandVarsInText(ExceptionControl):
     # to check for cached information (if needed).
     owner = TypedProperty.typed_property("owner", expected_type=object, default=None)
 
+    # The owner's `ParserStats` while they are enabled, otherwise ``None``.
+    # Set by `SetProgramOptions._prepare_var_formatter`.
+    _stats = None
+
     # ---------------
     #  M E T H O D S
     # ---------------
@@ -218,9 +230,13 @@ class ExpandVarsInText(ExceptionControl):
 
         tokenized_text = self._tokenize_text_string(text)
 
+        stats = self._stats
+
         for i in range(len(tokenized_text)):
             field = tokenized_text[i]
             if isinstance(field, self.VariableFieldData):
+                if stats is not None:
+                    stats.increment("expand_field:" + field.vartype)
                 conversion_method_name = "_fieldhandler_{}_{}".format(self.generator, field.vartype)
                 conversion_method_ref = get_function_ref(self, conversion_method_name)
                 tokenized_text[i] = conversion_method_ref(field)
@@ -343,6 +359,73 @@ class SetProgramOptions(ConfigParserEnhanced):
         "_var_formatter", expected_type=ExpandVarsInText, default_factory=ExpandVarsInText
     )
 
+    # If enabled, warnings generated by `gen_option_list` are collected and
+    # summarized instead of being printed one at a time.
+    collect_warnings = typed_property("collect_warnings", expected_type=bool, default=False)
+
+    # If enabled, `gen_option_list` and `iter_option_list` skip the entries that do
+    # not change the option list of the generator, see `_compact_option_entries`.
+    compact_options = typed_property("compact_options", expected_type=bool, default=False)
+
+    # If enabled, `parse_section` uses the `setprogramoptions.FastParser` for the
+    # sections that only have operations it supports.
+    fast_parse = typed_property("fast_parse", expected_type=bool, default=False)
+
+    # If enabled, looking up a section in `options` also parses the sections it uses.
+    prefetch_used_sections = typed_property("prefetch_used_sections", expected_type=bool, default=False)
+
+    # The `WarningCollector` of `warning_collector`, ``None`` until it is first accessed.
+    _warning_collector = None
+
+    # Fingerprints memoized by source digest, see `section_fingerprint`.
+    _fingerprint_memo = typed_property("_fingerprint_memo", expected_type=dict, default_factory=dict)
+
+    # The `configparserdata` that the cached section source digests belong to and the digests.
+    _section_source_digest_cache = None
+
+    # Generator objects by name, see `_get_generator`.
+    _generator_instances = None
+
+    # The option entries kept by `_compact_option_entries` by section and generator,
+    # with the entries and the settings they were compacted from.
+    _compacted_options_cache = None
+
+    # The `configparserdata` that the cached `section_index` belongs to and the index.
+    _section_index_cache = None
+
+    # The `ParserStats` of `stats`, ``None`` until it is first accessed so the
+    # instrumented paths can skip it without a property lookup.
+    _stats = None
+
+    # The `configparserdata` that the cached `FastParser` belongs to and the parser.
+    _fast_parser_cache = None
+
+    # Version of the data hashed by `section_fingerprint`, changed when the format changes.
+    _fingerprint_format = 1
+
+    # Program option handlers defined by this class whose result only depends on
+    # the parameters and the value, see `setprogramoptions.RenderPlan`.
+    _stateless_program_option_handlers = ("_program_option_handler_opt_set_bash", )
+
+    # Operation handlers defined by this class that the `setprogramoptions.FastParser`
+    # implements, and whether they add or remove an entry.
+    _fast_parse_handlers = {"_handler_opt_set": "add", "_handler_opt_remove": "remove"}
+
+    # Names of the events that callbacks can be registered for with `add_event_hook`.
+    event_hook_names = ("entry_added", "entry_removed", "entry_rendered", "section_finalized")
+
+    # Registered event hooks `{event: [callback, ...]}`. This is `None` when no hooks
+    # are registered so the hot loops only need a single check to skip them.
+    _event_hooks = None
+
+    # `True` while a `gen_option_list` call collects warnings, see `_warning_collection_begin`.
+    _warning_collection_active = False
+
+    # > 0 while warnings are suppressed, see `_collect_warning`. Helpers that evaluate
+    # entries only for their state increment it around their work instead of changing
+    # the exception control settings, so they can be nested.
+    _warnings_suppressed = 0
+
     @property
     def _data_shared_key(self) -> str:
         """Key used by ``handler_parameters`` for ``shared_data``
@@ -371,10 +454,20 @@ class SetProgramOptions(ConfigParserEnhanced):
         return self.__class__.__name__
 
     @property
-    def options(self) -> dict:
+    def collected_warnings(self) -> list:
+        """
+        The warnings collected by the last :py:meth:`gen_option_list` call when
+        :py:attr:`collect_warnings` is enabled, as a list of
+        :py:class:`setprogramoptions.WarningCollector.CollectedWarning` objects.
+        """
+        return self.warning_collector.records
+
+    @property
+    def options(self) -> "LazyOptions":
         """
-        The :py:attr:`options` property contains the set of parsed options that has
-        been processed so far stored as a dictionary. For example, the following
+        The :py:attr:`options` property maps the sections of the ``.ini`` file to
+        their parsed options. Sections are parsed the first time they are looked up
+        (see :py:mod:`setprogramoptions.LazyOptions`). For example, the following
         .ini snippet:
 
         .. code-block:: ini
@@ -386,7 +479,7 @@ class SetProgramOptions(ConfigParserEnhanced):
 
         might generate the folllowing result in :py:attr:`options`:
 
-            >>> parser.options
+            >>> dict(parser.options)
             {'SECTION_A':
                 [
                     {'type': ['opt_set'], 'params': ['cmake'], 'value': None },
@@ -400,26 +493,132 @@ class SetProgramOptions(ConfigParserEnhanced):
         This data is used by the ``gen_option_list`` method to generate snippets
         according to the requested generator, such as "bash" or "cmake_fragment".
 
+        A plain ``dict`` can be assigned to this property, it is used as-is and
+        sections that are not in it are parsed on demand by the methods that
+        need them.
+
         Raises:
             TypeError: A TypeError can be raised if a non-dictionary is assigned
                 to this property.
 
         """
         if not hasattr(self, '_property_options'):
-            self._property_options = {}
+            from .LazyOptions import LazyOptions
+            self._property_options = LazyOptions(self)
         return self._property_options
 
     @options.setter
     def options(self, value) -> dict:
-        self._validate_parameter(value, (dict))
+        from .LazyOptions import LazyOptions
+        self._validate_parameter(value, (dict, LazyOptions))
         self._property_options = value
         return self._property_options
 
+    @property
+    def stats(self) -> "ParserStats":
+        """Opt-in timings and counters, see :py:class:`~setprogramoptions.ParserStats.ParserStats`.
+
+        Raises:
+            TypeError: If something other than a ``ParserStats`` is assigned.
+        """
+        if self._stats is None:
+            from .ParserStats import ParserStats
+            self._stats = ParserStats()
+        return self._stats
+
+    @stats.setter
+    def stats(self, value) -> "ParserStats":
+        from .ParserStats import ParserStats
+        self._validate_parameter(value, (ParserStats))
+        self._stats = value
+        return self._stats
+
+    @property
+    def warning_collector(self) -> "WarningCollector":
+        """Stores the warnings collected when :py:attr:`collect_warnings` is enabled.
+
+        Raises:
+            TypeError: If something other than a ``WarningCollector`` is assigned.
+        """
+        if self._warning_collector is None:
+            from .WarningCollector import WarningCollector
+            self._warning_collector = WarningCollector()
+        return self._warning_collector
+
+    @warning_collector.setter
+    def warning_collector(self, value) -> "WarningCollector":
+        from .WarningCollector import WarningCollector
+        self._validate_parameter(value, (WarningCollector))
+        self._warning_collector = value
+        return self._warning_collector
+
+    @property
+    def _stats_enabled(self) -> bool:
+        """Check if :py:attr:`stats` is enabled without creating its ``ParserStats``.
+
+        The instrumented paths check this instead of ``stats.enabled`` so that the
+        disabled path does not import or create a ``ParserStats``.
+        """
+        stats = self._stats
+        return stats is not None and stats.enabled
+
+    @property
+    def section_index(self) -> "SectionIndex":
+        """The :py:class:`~setprogramoptions.SectionIndex.SectionIndex` of the loaded ``.ini`` file.
+
+        The index is built from the raw options of all sections on first access and
+        again after a different ``.ini`` file is loaded.
+        """
+        cache = self._section_index_cache
+        if cache is None or cache[0] is not self.configparserdata:
+            from .SectionIndex import SectionIndex
+            cache = (self.configparserdata, SectionIndex(self))
+            self._section_index_cache = cache
+        return cache[1]
+
+    @property
+    def _fast_parser(self) -> "FastParser":
+        """The :py:class:`~setprogramoptions.FastParser.FastParser` of the loaded ``.ini`` file."""
+        cache = self._fast_parser_cache
+        if cache is None or cache[0] is not self.configparserdata:
+            from .FastParser import FastParser
+            cache = (self.configparserdata, FastParser(self))
+            self._fast_parser_cache = cache
+        return cache[1]
+
     # -------------------------------
     #   P U B L I C   M E T H O D S
     # -------------------------------
 
-    def gen_option_list(self, section, generator='bash') -> list:
+    def parse_section(self, section, initialize=True, finalize=True):
+        """Execute parser operations for the provided *section*.
+
+        This extends ``ConfigParserEnhanced.parse_section`` to record the time
+        spent parsing in :py:attr:`stats` when it is enabled and to parse the
+        section with the :py:class:`~setprogramoptions.FastParser.FastParser`
+        when :py:attr:`fast_parse` is enabled.
+        """
+        from .LazyOptions import LazyOptions
+        options = self.options
+        lazy = isinstance(options, LazyOptions)
+        if lazy:
+            # The entries that ``handler_finalize`` stores are parsed, not assigned.
+            options._parsing += 1
+        try:
+            if not self._stats_enabled:
+                if self.fast_parse and initialize and finalize and isinstance(section, str) and section:
+                    result = self._fast_parser.parse(section)
+                    if result is not None:
+                        return result
+                return super().parse_section(section, initialize=initialize, finalize=finalize)
+            return self._stats.timed(
+                "parse_section", super().parse_section, section, initialize=initialize, finalize=finalize
+            )
+        finally:
+            if lazy:
+                options._parsing -= 1
+
+    def gen_option_list(self, section, generator='bash', entry_filter=None) -> list:
         """Generate a list of options for a section.
 
         Generates a list of strings that captures the requested
@@ -465,37 +664,574 @@ class SetProgramOptions(ConfigParserEnhanced):
         This can then be executed in a bash shell or saved to a script file
         that could be executed separately.
 
+        The option list is generated by the :py:class:`~setprogramoptions.Generator.Generator`
+        registered under the name ``generator`` (see :py:mod:`setprogramoptions.Generator`).
+        Names without a registered generator use the program option handlers
+        ``_program_option_handler_<operation>_<generator>()`` of this class.
+
         Args:
             section (str): The section name that contains the options
                 we wish to process.
             generator (str): What kind of generator are we to use to
                 build up our options list? Currently we allow ``bash``
                 but subclasses can define their own functions using the
-                format ``_gen_option_entry_<generator>(option_entry:dict)``
+                format ``_program_option_handler_<operation>_<generator>(params, value)``
+            entry_filter (OptionFilter,str,re.Pattern,callable): If given, only the entries
+                selected by this filter are rendered, see :py:mod:`setprogramoptions.OptionFilter`.
+                Entries that are filtered out still set the CMake variables that the
+                selected entries use, but generate no warnings.
 
         Returns:
             list: A ``list`` containing the processed options text.
         """
         self._validate_parameter(section, (str))
         self._validate_parameter(generator, (str))
+        if entry_filter is not None:
+            from .OptionFilter import make_entry_filter
+            entry_filter = make_entry_filter(entry_filter)
+
+        stats = self._stats if self._stats_enabled else None
+        if stats is not None:
+            import time
+            start = time.perf_counter()
 
         output = []
 
+        if not self._section_options_loaded(section):
+            if stats is not None:
+                stats.increment("options_cache:miss")
+            if section not in self.options.keys():
+                self.parse_section(section)
+        elif stats is not None:
+            stats.increment("options_cache:hit")
+
+        section_data = self.options[section]
+        if self.compact_options and self._event_hooks is None:
+            section_data = self._compacted_section_data(section, section_data, generator)
+
+        # Reset the cached vars in the formatter utility
+        del self._var_formatter_cache
+
+        generator_ref = self._get_generator(generator)
+
+        collecting = self._warning_collection_begin()
+        try:
+            if entry_filter is None and self._event_hooks is None and stats is None:
+                output = generator_ref.render(section_data)
+            else:
+                output = list(self._iter_option_lines(section, section_data, generator_ref, entry_filter))
+        finally:
+            if collecting:
+                self._warning_collection_end(f"`{section}` ({generator})")
+
+        if stats is not None:
+            stats.add_time("gen_option_list", time.perf_counter() - start)
+
+        return output
+
+    def iter_option_list(self, section, generator='bash', entry_filter=None):
+        """Generate the options of a section one at a time.
+
+        Yields the same options as :py:meth:`gen_option_list`, which makes it possible
+        to stop early, i.e., after the first option that matches a condition. The
+        CMake variables known to the generator are reset when the iteration starts, so
+        other option lists must not be generated with this parser before it finishes.
+
+        Args:
+            section (str): The section name.
+            generator (str): The generator.
+            entry_filter (OptionFilter,str,re.Pattern,callable): If given, only the entries
+                selected by this filter are rendered, see :py:meth:`gen_option_list`.
+
+        Yields:
+            str: The options.
+        """
+        self._validate_parameter(section, (str))
+        self._validate_parameter(generator, (str))
+        if entry_filter is not None:
+            from .OptionFilter import make_entry_filter
+            entry_filter = make_entry_filter(entry_filter)
+
         if section not in self.options.keys():
             self.parse_section(section)
-
         section_data = self.options[section]
+        if self.compact_options and self._event_hooks is None:
+            section_data = self._compacted_section_data(section, section_data, generator)
 
         # Reset the cached vars in the formatter utility
         del self._var_formatter_cache
 
-        for option_entry in section_data:
-            line = self._gen_option_entry(option_entry, generator=generator)
-            if line is not None:
-                output.append(line)
+        generator_ref = self._get_generator(generator)
+
+        collecting = self._warning_collection_begin()
+        try:
+            yield from self._iter_option_lines(section, section_data, generator_ref, entry_filter)
+        finally:
+            if collecting:
+                self._warning_collection_end(f"`{section}` ({generator})")
+        return
+
+    def gen_option_lists(self, sections, generator='bash') -> dict:
+        """Generate the option lists of several sections.
+
+        The result is the same as calling :py:meth:`gen_option_list` for each section,
+        but sections that start with the same entries (usually because they first
+        ``use`` the same common sections) share the work: each common leading run of
+        entries is rendered once, the state of :py:attr:`_var_formatter_cache` at the
+        end of the run is saved and the sections resume from there.
+
+        Warnings and errors of a shared run are reported once instead of once per
+        section. Each section is rendered on its own by :py:meth:`gen_option_list`
+        while :py:attr:`stats` is enabled, event hooks are registered or the generator
+        renders whole sections itself.
+
+        Args:
+            sections (list): The sections (or virtual sections), which are parsed if needed.
+            generator (str): The generator.
+
+        Returns:
+            dict: The option list of each section, in the order of ``sections``.
+        """
+        self._validate_parameter(sections, (list, tuple))
+        self._validate_parameter(generator, (str))
+
+        from .Generator import Generator
+        from .SectionDiff import entry_key
+        sections = list(dict.fromkeys(sections))
+        generator_ref = self._get_generator(generator)
+        if self._stats_enabled or self._event_hooks is not None \
+                or type(generator_ref).render is not Generator.render:
+            return {section: self.gen_option_list(section, generator) for section in sections}
+
+        entries = {}
+        keys = {}
+        for section in sections:
+            self._validate_parameter(section, (str))
+            if section not in self.options.keys():
+                self.parse_section(section)
+            entries[section] = self.options[section]
+            keys[section] = [entry_key(entry) for entry in entries[section]]
+
+        output = {}
+
+        # Reset the cached vars in the formatter utility
+        del self._var_formatter_cache
+
+        collecting = self._warning_collection_begin()
+        try:
+            # Groups of sections whose entries before `start` are the same, with the
+            # lines rendered for those entries and the formatter state after them.
+            stack = [(sections, 0, [], self._var_formatter_cache_snapshot())] if sections else []
+            while stack:
+                group, start, lines, snapshot = stack.pop()
+                self._var_formatter_cache_restore(snapshot)
+
+                # Runs and branches are both found with `entry_key` so that a group
+                # always splits when its run ends.
+                first = keys[group[0]]
+                others = [keys[section] for section in group[1 :]]
+                end = min(len(section_keys) for section_keys in [first] + others)
+                stop = start
+                while stop < end and all(section_keys[stop] == first[stop] for section_keys in others):
+                    stop += 1
+                if stop > start:
+                    lines = lines + generator_ref.render(entries[group[0]][start : stop])
+
+                branches = {}
+                for section in group:
+                    if len(entries[section]) == stop:
+                        output[section] = list(lines)
+                    else:
+                        branches.setdefault(keys[section][stop], []).append(section)
+
+                if branches:
+                    snapshot = self._var_formatter_cache_snapshot()
+                    for branch in reversed(list(branches.values())):
+                        stack.append((branch, stop, lines, snapshot))
+        finally:
+            if collecting:
+                self._warning_collection_end(f"{len(sections)} sections ({generator})")
+
+        return {section: output[section] for section in sections}
+
+    def compile_section(self, section, generator='bash') -> "RenderPlan":
+        """Compile a section into a plan that renders it for ``generator``.
+
+        Use this for sections that are rendered many times, i.e., with different
+        exception control settings or seeded CMake variables. The plan does the
+        handler lookups, the quoting and the splitting of values into fields once
+        and :py:meth:`~setprogramoptions.RenderPlan.RenderPlan.execute` produces the
+        same option list as :py:meth:`gen_option_list`. See :py:mod:`setprogramoptions.RenderPlan`.
+
+        Args:
+            section (str): The section (or virtual section), which is parsed if needed.
+            generator (str): The generator.
+
+        Returns:
+            RenderPlan: The plan. It is compiled again when it is executed after the
+            entries of the section were replaced.
+        """
+        from .RenderPlan import RenderPlan
+        return RenderPlan(self, section, generator)
+
+    def section_use_graph(self) -> dict:
+        """The ``use`` links between the sections of the ``.ini`` file.
+
+        The options of each section are scanned for ``use`` operations without
+        parsing the section.
+
+        Returns:
+            dict: The sections of the ``.ini`` file (in file order) and the list of
+            sections each one uses (in the order of the ``use`` operations).
+        """
+        graph = {}
+        for section_name in self.configparserdata.sections():
+            uses = []
+            for option_key in self.configparserdata[section_name].keys():
+                used_section = self._used_section_from_option_key(option_key)
+                if used_section is not None:
+                    uses.append(used_section)
+            graph[section_name] = uses
+        return graph
+
+    def root_sections(self) -> list:
+        """The sections that are not used by any other section.
+
+        These are usually the complete configurations that option lists are
+        generated for.
+
+        Returns:
+            list: The names of the root sections in file order.
+        """
+        graph = self.section_use_graph()
+        used = set(used_section for uses in graph.values() for used_section in uses)
+        return [section_name for section_name in graph if section_name not in used]
+
+    def sections_setting(self, name: str) -> list:
+        """The options in all sections that add an entry with the parameter ``name``.
+
+        For ``opt-set-cmake-var`` options the variable name is a parameter, so this
+        finds the sections that set a CMake variable. Only the sections that contain
+        the option are returned, see :py:meth:`configurations_setting` for the
+        sections that include them with ``use``.
+
+        Args:
+            name (str): The parameter or CMake variable name.
+
+        Returns:
+            list: :py:class:`~setprogramoptions.SectionIndex.OptionLocation` tuples in file order.
+        """
+        self._validate_parameter(name, (str))
+        return self.section_index.setting(name)
+
+    def sections_removing(self, name: str) -> list:
+        """The ``opt-remove`` options in all sections that remove entries with the parameter ``name``.
+
+        Includes ``opt-remove <keyword> SUBSTR`` options whose keyword is a substring of ``name``.
+
+        Returns:
+            list: :py:class:`~setprogramoptions.SectionIndex.OptionLocation` tuples.
+        """
+        self._validate_parameter(name, (str))
+        return self.section_index.removing(name)
+
+    def sections_referencing(self, varname: str, vartype=None) -> list:
+        """The ``${varname|VARTYPE}`` fields in the values of the options of all sections.
+
+        Args:
+            varname (str): The variable name.
+            vartype (str): If given, only fields of this type (i.e., ``ENV`` or ``CMAKE``).
+
+        Returns:
+            list: :py:class:`~setprogramoptions.SectionIndex.VariableReference` tuples.
+        """
+        self._validate_parameter(varname, (str))
+        self._validate_parameter(vartype, (str, None))
+        return self.section_index.referencing(varname, vartype)
+
+    def sections_using(self, section: str, transitive=True) -> list:
+        """The sections that ``use`` a section.
+
+        Args:
+            section (str): The section.
+            transitive (bool): Include the sections that use it indirectly.
+
+        Returns:
+            list: The section names in file order.
+        """
+        self._validate_parameter(section, (str))
+        return self.section_index.used_by(section, transitive)
+
+    def configurations_setting(self, name: str) -> list:
+        """The sections whose resolved options have an entry with the parameter ``name``.
+
+        Answers questions like *"which configurations enable* ``Trilinos_ENABLE_MueLu`` *?"*
+        from the :py:attr:`section_index`: the sections that set ``name`` and the sections
+        that use them. Only sections that use a section with an ``opt-remove`` that
+        could remove the entry are parsed to find out whether it is removed.
+
+        Args:
+            name (str): The parameter or CMake variable name.
+
+        Returns:
+            list: The section names in file order.
+        """
+        self._validate_parameter(name, (str))
+        index = self.section_index
+
+        candidates = set()
+        params = set()
+        for location in index.setting(name):
+            candidates.add(location.section)
+            candidates.update(index.used_by(location.section))
+            params.update(location.params)
 
+        # The sections with an opt-remove that matches any parameter of the entries.
+        removing = set(location.section for param in params for location in index.removing(param))
+
+        output = []
+        for section in index.sections:
+            if section not in candidates:
+                continue
+            if removing and removing.intersection({section}.union(index.uses(section, transitive=True))):
+                if section not in self.options.keys():
+                    self.parse_section(section)
+                if not any(name in entry['params'] for entry in self.options[section]):
+                    continue
+            output.append(section)
         return output
 
+    def section_fingerprint(self, section: str, generator=None) -> str:
+        """A stable digest of the resolved options of a section.
+
+        The digest only depends on the resolved option entries (or, if ``generator`` is
+        given, on the generated option list), not on the names of the sections or how
+        the options were split between them. Configurations with identical effective
+        options have the same fingerprint, which makes it usable as a build cache key.
+
+        Fingerprints are memoized by a digest of the section's source: its own options
+        and, recursively, the source digests of the sections it ``use``-es, which are
+        themselves computed once per loaded ``.ini`` file. A section whose source did not
+        change is neither parsed nor rendered again.
+
+        Args:
+            section (str): The section (or virtual section).
+            generator (str): If given, the digest is computed from the option list that
+                this generator renders instead of from the option entries.
+
+        Returns:
+            str: The SHA-256 hex digest.
+        """
+        self._validate_parameter(section, (str))
+        self._validate_parameter(generator, (str, None))
+
+        memo_key = None
+        context = self._fingerprint_context(generator)
+        if context is not None and self.configparserdata.has_section(section):
+            memo_key = (self._section_source_digest(section), generator, context)
+            digest = self._fingerprint_memo.get(memo_key)
+            if digest is not None:
+                return digest
+
+        if generator is None:
+            if section not in self.options.keys():
+                self.parse_section(section)
+            payload = [[entry['type'], entry['params'], entry['value']] for entry in self.options[section]]
+        else:
+            payload = self.gen_option_list(section, generator=generator)
+
+        import hashlib
+        import json
+        text = json.dumps(
+            [self._fingerprint_format, generator, payload], ensure_ascii=False, separators=(",", ":")
+        )
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if memo_key is not None:
+            self._fingerprint_memo[memo_key] = digest
+        return digest
+
+    def diff_sections(self, section_a: str, section_b: str, generator=None) -> "SectionDiff":
+        """Compare the options of two sections.
+
+        Args:
+            section_a (str): The first section (or virtual section).
+            section_b (str): The second section (or virtual section).
+            generator (str): If given, the sections are compared by the lines this
+                generator renders for them instead of by their option entries. Entries
+                that render no line are ignored.
+
+        Returns:
+            SectionDiff: The items only in ``section_a``, only in ``section_b`` and in both.
+        """
+        from .SectionDiff import match_keys
+        from .SectionDiff import SectionDiff
+        entries_a, keys_a = self._section_entry_keys(section_a, generator)
+        entries_b, keys_b = self._section_entry_keys(section_b, generator)
+        items_a = entries_a if generator is None else keys_a
+        items_b = entries_b if generator is None else keys_b
+
+        matched_a = match_keys(keys_a, keys_b)
+        matched_b = match_keys(keys_b, keys_a)
+        return SectionDiff(
+            section_a,
+            section_b,
+            generator,
+            only_a=[item for item, matched in zip(items_a, matched_a) if not matched],
+            only_b=[item for item, matched in zip(items_b, matched_b) if not matched],
+            common=[item for item, matched in zip(items_a, matched_a) if matched],
+        )
+
+    def section_union(self, section_a: str, section_b: str, name=None, generator=None) -> str:
+        """Create a virtual section with the entries of ``section_a`` followed by the
+        entries of ``section_b`` that are not in ``section_a``.
+
+        Virtual sections are stored in :py:attr:`options` and can be passed to
+        :py:meth:`gen_option_list` and to the other section operations.
+        They are rendered on their own, so values that reference variables set by
+        entries that were left out may no longer resolve.
+
+        Args:
+            section_a (str): The first section (or virtual section).
+            section_b (str): The second section (or virtual section).
+            name (str): The name of the virtual section. Defaults to ``"<section_a> | <section_b>"``.
+            generator (str): If given, entries are compared by the line this generator
+                renders for them. Entries that render no line are left out.
+
+        Returns:
+            str: The name of the virtual section.
+        """
+        from .SectionDiff import match_keys
+        entries_a, keys_a = self._section_entry_keys(section_a, generator)
+        entries_b, keys_b = self._section_entry_keys(section_b, generator)
+        entries = entries_a + [
+            entry for entry, matched in zip(entries_b, match_keys(keys_b, keys_a)) if not matched
+        ]
+        return self._add_virtual_section(name or f"{section_a} | {section_b}", entries)
+
+    def section_intersection(self, section_a: str, section_b: str, name=None, generator=None) -> str:
+        """Create a virtual section with the entries of ``section_a`` that are also in ``section_b``.
+
+        See :py:meth:`section_union` for the arguments. The default name is
+        ``"<section_a> & <section_b>"``.
+
+        Returns:
+            str: The name of the virtual section.
+        """
+        from .SectionDiff import match_keys
+        entries_a, keys_a = self._section_entry_keys(section_a, generator)
+        entries_b, keys_b = self._section_entry_keys(section_b, generator)
+        entries = [entry for entry, matched in zip(entries_a, match_keys(keys_a, keys_b)) if matched]
+        return self._add_virtual_section(name or f"{section_a} & {section_b}", entries)
+
+    def section_difference(self, section_a: str, section_b: str, name=None, generator=None) -> str:
+        """Create a virtual section with the entries of ``section_a`` that are not in ``section_b``.
+
+        See :py:meth:`section_union` for the arguments. The default name is
+        ``"<section_a> - <section_b>"``.
+
+        Returns:
+            str: The name of the virtual section.
+        """
+        from .SectionDiff import match_keys
+        entries_a, keys_a = self._section_entry_keys(section_a, generator)
+        entries_b, keys_b = self._section_entry_keys(section_b, generator)
+        entries = [entry for entry, matched in zip(entries_a, match_keys(keys_a, keys_b)) if not matched]
+        return self._add_virtual_section(name or f"{section_a} - {section_b}", entries)
+
+    def publish_options(self, sections=None):
+        """Publish the resolved options in shared memory for worker processes.
+
+        See :py:mod:`setprogramoptions.sharedstore`.
+
+        Args:
+            sections (list): The sections to publish. Defaults to all the sections
+                that can be parsed.
+
+        Returns:
+            SharedOptionStore: The store, which must be closed by this process.
+        """
+        from .sharedstore import SharedOptionStore
+        self._validate_parameter(sections, (list, tuple, None))
+        return SharedOptionStore(self, sections)
+
+    def add_event_hook(self, event: str, callback):
+        """Register a callback for an event.
+
+        Callbacks are called as ``callback(parser, section_name, **data)`` where
+        ``data`` depends on the event:
+
+        - ``entry_added``: ``entry`` is the option entry that an operation in section
+          ``section_name`` added during a parse.
+        - ``entry_removed``: ``entry`` is an option entry that an ``opt-remove``
+          operation in section ``section_name`` removed during a parse.
+        - ``entry_rendered``: ``entry``, ``generator`` and the generated ``line``
+          (``None`` if the generator skipped the entry) for each entry
+          :py:meth:`gen_option_list` processes.
+        - ``section_finalized``: ``options`` is the final list of option entries
+          for the section ``section_name`` that was parsed.
+
+        Args:
+            event (str): One of :py:attr:`event_hook_names`.
+            callback (callable): The callback.
+
+        Raises:
+            ValueError: If ``event`` is not a known event.
+            TypeError: If ``callback`` is not callable.
+        """
+        if event not in self.event_hook_names:
+            raise ValueError(f"Unknown event `{event}`, expected one of {self.event_hook_names}.")
+        if not callable(callback):
+            raise TypeError(f"`{callback}` is not callable.")
+
+        event_hooks = dict(self._event_hooks) if self._event_hooks is not None else {}
+        event_hooks[event] = event_hooks.get(event, []) + [callback]
+        self._event_hooks = event_hooks
+        return
+
+    def remove_event_hook(self, event: str, callback):
+        """Remove a callback that was registered with :py:meth:`add_event_hook`.
+
+        Raises:
+            ValueError: If ``callback`` is not registered for ``event``.
+        """
+        event_hooks = dict(self._event_hooks) if self._event_hooks is not None else {}
+        callbacks = list(event_hooks.get(event, []))
+        callbacks.remove(callback)
+        if callbacks:
+            event_hooks[event] = callbacks
+        else:
+            event_hooks.pop(event)
+        self._event_hooks = event_hooks if event_hooks else None
+        return
+
+    def register_observer(self, observer) -> list:
+        """Register the ``on_<event>`` methods of an object as event hooks.
+
+        For example, an object with an ``on_entry_added(parser, section_name, entry)``
+        method is registered for ``entry_added`` events.
+
+        Args:
+            observer (object): The observer.
+
+        Returns:
+            list: The names of the events the observer was registered for.
+        """
+        events = []
+        for event in self.event_hook_names:
+            callback = getattr(observer, "on_" + event, None)
+            if callback is not None:
+                self.add_event_hook(event, callback)
+                events.append(event)
+        return events
+
+    def unregister_observer(self, observer):
+        """Remove the event hooks registered by :py:meth:`register_observer`."""
+        for event in self.event_hook_names:
+            callback = getattr(observer, "on_" + event, None)
+            if callback is not None and callback in (self._event_hooks or {}).get(event, []):
+                self.remove_event_hook(event, callback)
+        return
+
     # ---------------------------------------------------------------
     #   H A N D L E R S  -  P R O G R A M   O P T I O N S
     # ---------------------------------------------------------------
@@ -529,48 +1265,90 @@ class SetProgramOptions(ConfigParserEnhanced):
 
         output = None
 
-        method_name = None
-        method_ref = None
-
-        method_name_list = []
-
-        # Look for a matching method in the list of 'types' that
-        # this operation can map to.
-        for typename in option_entry['type']:
-            method_name = "_".join(["_program_option_handler", str(typename), generator])
-            (method_name, method_ref) = self._locate_class_method(method_name)
-            if method_ref is not None:
-                break
-            method_name_list.append(method_name)
-        else:
-            # The for did _not_ exit via the break...
-            message = ["ERROR: Unable to locate an option formatter named:"]
-            for method_name in method_name_list:
-                message.append("- `{}()`".format(method_name))
-            self.exception_control_event("SILENT", ValueError, "\n".join(message))
+        method_name, method_ref = self._locate_program_option_handler(option_entry['type'], generator)
+        if method_ref is None:
+            self._program_option_handler_not_found(option_entry['type'], generator)
 
         # Found a match.
         if method_ref is not None:
             params = copy.deepcopy(option_entry['params'])
             value = copy.deepcopy(option_entry['value'])
 
-            if value is not None:
-                if " " in value:
-                    value = '"' + value + '"'
+            if self._stats_enabled:
+                stats = self._stats
+                value = stats.timed("expand", self._format_option_value, value, generator)
+                output = stats.timed("program_option_handler:" + method_name, method_ref, params, value)
+            else:
+                value = self._format_option_value(value, generator)
+                output = method_ref(params, value)
+
+        return output
 
-                # Update the var formatter's ECL to match the current value.
-                self._var_formatter.exception_control_level = self.exception_control_level
-                self._var_formatter.exception_control_compact_warnings = self.exception_control_compact_warnings
+    def _get_generator(self, generator: str) -> "Generator":
+        """The :py:class:`~setprogramoptions.Generator.Generator` object for a generator name.
 
-                # format the value
-                formatter = self._var_formatter
-                formatter.generator = generator
-                formatter.owner = self
-                value = formatter.process(value)
+        Generator objects are created once per parser and generator class.
+        """
+        from .Generator import Generator
+        from .Generator import get_generator
+        generator_class = get_generator(generator) or Generator
+        instances = self._generator_instances
+        if instances is None:
+            instances = self._generator_instances = {}
+        generator_ref = instances.get(generator)
+        if generator_ref is None or type(generator_ref) is not generator_class:
+            generator_ref = instances[generator] = generator_class(self, generator)
+        return generator_ref
+
+    def _locate_program_option_handler(
+        self, types: list, generator: str, prefix="_program_option_handler"
+    ) -> tuple:
+        """Locate the program option handler for an option entry.
+
+        Looks for a method named ``_program_option_handler_<typename>_<generator>`` for
+        each of the ``types`` of the entry, in order.
 
-            output = method_ref(params, value)
+        Args:
+            types (list): The ``type`` field of an option entry.
+            generator (str): The generator.
+            prefix (str): The prefix of the method name, i.e., ``_program_option_state``
+                to locate the state handler used by :py:meth:`_program_option_state`.
 
-        return output
+        Returns:
+            tuple: The name of the method and a reference to it, ``(None, None)`` if
+            there is no handler.
+        """
+        for typename in types:
+            method_name = "_".join([prefix, str(typename), generator])
+            (method_name, method_ref) = self._locate_class_method(method_name)
+            if method_ref is not None:
+                return method_name, method_ref
+        return None, None
+
+    def _program_option_state(self, option_entry: dict, generator: str):
+        """Apply the effect of an option entry that is filtered out of an option list.
+
+        Entries that are not rendered can still change the state that later entries
+        are rendered with, i.e., a CMake variable that is used by a later entry. This
+        calls ``_program_option_state_<typename>_<generator>(params, value)`` with the
+        parameters and the unexpanded value of the entry, if it exists. State handlers
+        generate no lines and no warnings.
+        """
+        types = option_entry['type']
+        method_ref = self._locate_program_option_handler(types, generator, "_program_option_state")[1]
+        if method_ref is not None:
+            method_ref(list(option_entry['params']), option_entry['value'])
+        return
+
+    def _program_option_handler_not_found(self, types: list, generator: str):
+        """Trigger the ``SILENT`` event for an option entry without a program option handler."""
+        if exception_control_event_enabled(self, "SILENT"):
+            message = ["ERROR: Unable to locate an option formatter named:"]
+            for typename in types:
+                method_name = "_".join(["_program_option_handler", str(typename), generator])
+                message.append("- `{}()`".format(method_name))
+            self.exception_control_event("SILENT", ValueError, "\n".join(message))
+        return
 
     def _generic_program_option_handler_bash(self, params: list, value: str) -> str:
         """Generic processer for generic bash options.
@@ -599,13 +1377,8 @@ class SetProgramOptions(ConfigParserEnhanced):
         Returns:
             str: A ``str`` object representing an option.
         """
-        output = "".join(params)
-        if value is not None:
-            # Make sure STRING flag values are surrounded by double quotes
-            if "STRING" in output and not value.startswith('"') and not value.endswith('"'):
-                value = f'"{value}"'
-            output += "=" + value
-        return output
+        from .Generator import BashGenerator
+        return BashGenerator.option(params, value)
 
     def _program_option_handler_opt_set_bash(self, params: list, value: str) -> str:
         """Bash generator for ``opt-set`` operations.
@@ -656,8 +1429,13 @@ class SetProgramOptions(ConfigParserEnhanced):
             - [1-10]: Reserved for future use (WARNING)
             - > 10  : An unknown failure occurred (SERIOUS)
         """
+        options = handler_parameters.data_shared[self._data_shared_key]
+
         # save the results into the right `options_cache` entry
-        self.options[section_name] = handler_parameters.data_shared[self._data_shared_key]
+        self.options[section_name] = options
+
+        if self._event_hooks is not None:
+            self._fire_event("section_finalized", section_name, options=self.options[section_name])
         return 0
 
     @ConfigParserEnhanced.operation_handler
@@ -753,13 +1531,14 @@ class SetProgramOptions(ConfigParserEnhanced):
             self.exception_control_event("CATASTROPHIC", IndexError)
 
         removal_key = params[0]
+        num_entries = len(data_shared_ref)
 
         if len(params) == 1:
-            self.debug_message(2, " -> Remove all options containing:`{}`".format(removal_key))
+            self._debug_message_lazy(2, " -> Remove all options containing:`%s`", removal_key)
             data_shared_ref = list(filter(lambda x: removal_key not in x['params'], data_shared_ref))
 
         if len(params) >= 2 and params[1] == "SUBSTR":
-            self.debug_message(2, " -> Remove all options containing SUBSTRING:`{}`".format(removal_key))
+            self._debug_message_lazy(2, " -> Remove all options containing SUBSTRING:`%s`", removal_key)
             data_shared_ref = list(
                 filter(
                     lambda entry,
@@ -768,7 +1547,16 @@ class SetProgramOptions(ConfigParserEnhanced):
                 )
             )
 
+        if self._event_hooks is not None and len(data_shared_ref) != num_entries:
+            kept = set(id(entry) for entry in data_shared_ref)
+            for entry in handler_parameters.data_shared[self._data_shared_key]:
+                if id(entry) not in kept:
+                    self._fire_event("entry_removed", section_name, entry=entry)
+
         handler_parameters.data_shared[self._data_shared_key] = data_shared_ref
+
+        if self._stats_enabled:
+            self._stats.increment("entries_removed", num_entries - len(data_shared_ref))
         return 0
 
     def _option_handler_helper_add(self, section_name: str, handler_parameters) -> int:
@@ -823,12 +1611,469 @@ class SetProgramOptions(ConfigParserEnhanced):
         entry = {'type': [op], 'value': value, 'params': params}
 
         data_shared_ref.append(entry)
+
+        if self._event_hooks is not None:
+            self._fire_event("entry_added", section_name, entry=entry)
         return 0
 
     # -----------------------
     #   H E L P E R S
     # -----------------------
 
+    def _iter_option_lines(self, section: str, section_data: list, generator_ref, entry_filter):
+        """Render option entries one run at a time.
+
+        Called by :py:meth:`gen_option_list` and :py:meth:`iter_option_list` after the
+        formatter state has been reset.
+
+        Args:
+            section (str): The section, for event hooks.
+            section_data (list): The option entries of the section.
+            generator_ref (Generator): The generator object.
+            entry_filter (OptionFilter): The filter, or ``None`` to render all entries.
+
+        Yields:
+            str: The lines.
+        """
+        from .Generator import Generator
+        generator = generator_ref.name
+        batch = self._event_hooks is None and not self._stats_enabled
+        if entry_filter is None:
+            steps = [(option_entry, True) for option_entry in section_data]
+        else:
+            steps = self._filter_option_entries(section_data, entry_filter, generator)
+
+        # A generator that renders whole sections receives all the selected entries.
+        if batch and type(generator_ref).render is not Generator.render:
+            yield from generator_ref.render([option_entry for option_entry, selected in steps if selected])
+            return
+
+        run = []
+        for option_entry, selected in steps:
+            if selected and batch:
+                run.append(option_entry)
+                continue
+            if run:
+                yield from generator_ref.render(run)
+                run = []
+
+            if not selected:
+                self._program_option_state(option_entry, generator)
+                continue
+
+            line = generator_ref.render_entry(option_entry)
+            if self._event_hooks is not None:
+                self._fire_event(
+                    "entry_rendered", section, entry=option_entry, generator=generator, line=line
+                )
+            if line is not None:
+                yield line
+
+        if run:
+            yield from generator_ref.render(run)
+        return
+
+    def _filter_option_entries(self, section_data: list, entry_filter, generator: str) -> list:
+        """Apply an entry filter to the option entries of a section.
+
+        Entries that are filtered out are kept (and marked as not selected) if they
+        have a state handler, see :py:meth:`_program_option_state`.
+
+        Args:
+            section_data (list): The option entries.
+            entry_filter (OptionFilter): The filter.
+            generator (str): The generator.
+
+        Returns:
+            list: ``(option_entry, selected)`` tuples, in order.
+        """
+        output = []
+        has_state = {}
+        for option_entry in section_data:
+            if entry_filter.matches(option_entry, self._option_entry_name(option_entry)):
+                output.append((option_entry, True))
+                continue
+            key = tuple(option_entry['type'])
+            if key not in has_state:
+                has_state[key] = self._locate_program_option_handler(
+                    option_entry['type'], generator, "_program_option_state"
+                )[1] is not None
+            if has_state[key]:
+                output.append((option_entry, False))
+        return output
+
+    def _option_entry_name(self, option_entry: dict) -> str:
+        """The name of an option entry that entry filters match, i.e., ``-G`` for ``opt-set -G : Ninja``."""
+        return "".join(option_entry['params'])
+
+    def _var_formatter_cache_snapshot(self):
+        """Capture the state of :py:attr:`_var_formatter_cache`.
+
+        See :py:meth:`_var_formatter_cache_restore`.
+        """
+        return dict(self._var_formatter_cache)
+
+    def _var_formatter_cache_restore(self, snapshot):
+        """Restore :py:attr:`_var_formatter_cache` to a state from :py:meth:`_var_formatter_cache_snapshot`.
+
+        A snapshot can be restored any number of times.
+        """
+        self._var_formatter_cache = dict(snapshot)
+        return
+
+    def _section_entry_keys(self, section: str, generator=None) -> tuple:
+        """The option entries of a section and their keys for the section operations.
+
+        Args:
+            section (str): The section, which is parsed if needed.
+            generator (str): If ``None`` the keys are :py:func:`~setprogramoptions.SectionDiff.entry_key`
+                values, otherwise they are the lines this generator renders for the entries.
+                Entries that render no line are left out.
+
+        Returns:
+            tuple: The list of entries and the list of their keys.
+        """
+        self._validate_parameter(section, (str))
+        self._validate_parameter(generator, (str, None))
+
+        if section not in self.options.keys():
+            self.parse_section(section)
+        entries = self.options[section]
+
+        if generator is None:
+            from .SectionDiff import entry_key
+            return entries, [entry_key(entry) for entry in entries]
+
+        # Render the entries in order, like `gen_option_list`, so variable expansions
+        # see the same state.
+        del self._var_formatter_cache
+        rendered = []
+        keys = []
+        for entry in entries:
+            line = self._gen_option_entry(entry, generator=generator)
+            if line is not None:
+                rendered.append(entry)
+                keys.append(line)
+        return rendered, keys
+
+    def _section_options_loaded(self, section: str) -> bool:
+        """Check if :py:attr:`options` has the parsed option entries of ``section``."""
+        from .LazyOptions import LazyOptions
+        options = self.options
+        if isinstance(options, LazyOptions):
+            return options.is_loaded(section)
+        return section in options.keys()
+
+    def _add_virtual_section(self, name: str, entries: list) -> str:
+        """Store copies of ``entries`` in :py:attr:`options` as the section ``name``."""
+        self._validate_parameter(name, (str))
+        self.options[name] = [
+            dict(entry, type=list(entry['type']), params=list(entry['params'])) for entry in entries
+        ]
+        return name
+
+    def _used_section_from_option_key(self, option_key: str) -> Union[str, None]:
+        """The section that an option key ``use``-es, or ``None`` if it is not a ``use`` operation."""
+        try:
+            option_key_tok = self._tokenize_option_key(option_key)
+        except ValueError:
+            return None
+        if len(option_key_tok) < 2 or not re.match(r"^[\w\-]+$", option_key_tok[0]):
+            return None
+        op, params = self._get_op_components_from_tokenized_option_key(option_key_tok)
+        return params[0] if op == "use" else None
+
+    def _section_source_digest(self, section: str) -> str:
+        """A digest of the options of a section, including the sections it uses.
+
+        The digests are cached for the currently loaded ``.ini`` data, so each section
+        is hashed once.
+        """
+        cache = self._section_source_digest_cache
+        if cache is None or cache[0] is not self.configparserdata:
+            cache = (self.configparserdata, {})
+            self._section_source_digest_cache = cache
+        return self._section_source_digest_helper(section, cache[1], set())
+
+    def _section_source_digest_helper(self, section: str, digests: dict, active: set) -> str:
+        digest = digests.get(section)
+        if digest is not None:
+            return digest
+
+        import hashlib
+        hasher = hashlib.sha256()
+        if not self.configparserdata.has_section(section):
+            hasher.update(b"missing\0" + section.encode("utf-8"))
+            return hasher.hexdigest()
+
+        active.add(section)
+        for option_key in self.configparserdata[section].keys():
+            used_section = self._used_section_from_option_key(option_key)
+            if used_section is None:
+                value = self.configparserdata.get(section, option_key, raw=True)
+                part = f"option\0{option_key}\0{value!r}"
+            elif used_section in active:
+                part = f"cycle\0{used_section}"
+            else:
+                part = "use\0" + self._section_source_digest_helper(used_section, digests, active)
+            hasher.update(part.encode("utf-8") + b"\n")
+        active.discard(section)
+
+        digest = hasher.hexdigest()
+        digests[section] = digest
+        return digest
+
+    def _fingerprint_context(self, generator) -> Union[tuple, None]:
+        """The settings besides the source of a section that its fingerprint depends on.
+
+        Returns:
+            tuple: The settings, part of the key fingerprints are memoized under, or
+            ``None`` if fingerprints can not be memoized.
+        """
+        context = (type(self).__qualname__, )
+        if generator is not None:
+            context += (self.exception_control_level, )
+        return context
+
+    def _compacted_section_data(self, section: str, section_data: list, generator: str) -> list:
+        """The option entries of a section that :py:meth:`_compact_option_entries` keeps.
+
+        The result is cached until the entries of the section or the warning settings change.
+
+        Args:
+            section (str): The section.
+            section_data (list): The option entries of the section.
+            generator (str): The generator.
+
+        Returns:
+            list: The option entries that remain.
+        """
+        cache = self._compacted_options_cache
+        if cache is None:
+            cache = self._compacted_options_cache = {}
+
+        settings = (
+            self.exception_control_level, self.exception_control_silent_warnings, self.collect_warnings
+        )
+        cached = cache.get((section, generator))
+        if cached is not None and cached[0] is section_data and cached[1] == (len(section_data), settings):
+            return cached[2]
+
+        output = self._compact_option_entries(section_data, generator)
+        if self._stats_enabled:
+            self._stats.increment("entries_compacted", len(section_data) - len(output))
+        cache[(section, generator)] = (section_data, (len(section_data), settings), output)
+        return output
+
+    def _compact_option_entries(self, entries: list, generator: str) -> list:
+        """Remove the entries that do not change the option list of a generator.
+
+        Called by :py:meth:`gen_option_list` and :py:meth:`iter_option_list` when
+        :py:attr:`compact_options` is enabled. An entry is removed if its program option
+        handler for ``generator`` is stateless (see :py:mod:`setprogramoptions.RenderPlan`)
+        and generates nothing for it, and the fields of its value are expanded by stateless
+        field handlers. The option list and its warnings are the same with and without
+        the removed entries.
+
+        Subclasses that extend this must keep the order of the remaining entries.
+
+        Args:
+            entries (list): The option entries of a section.
+            generator (str): The generator.
+
+        Returns:
+            list: The option entries that remain.
+        """
+        from .RenderPlan import _is_stateless
+
+        stateless_attribute = "_stateless_program_option_handlers"
+        output = []
+        for entry in entries:
+            method_name, method_ref = self._locate_program_option_handler(entry['type'], generator)
+            if method_ref is not None and _is_stateless(self, method_name, stateless_attribute) \
+                    and self._compact_value_is_static(entry['value'], generator):
+                value = self._format_option_value(copy.deepcopy(entry['value']), generator)
+                if method_ref(copy.deepcopy(entry['params']), value) is None:
+                    continue
+            output.append(entry)
+        return output
+
+    def _compact_value_fields(self, value) -> Union[list, None]:
+        """The ``(varname, vartype)`` tuples of the variable fields in a value.
+
+        Returns:
+            list: The fields, or ``None`` if the value can not be tokenized.
+        """
+        if value is None:
+            return []
+        try:
+            tokens = self._var_formatter._tokenize_text_string(value)
+        except ValueError:
+            return None
+        return [(token.varname, token.vartype) for token in tokens if not isinstance(token, str)]
+
+    def _compact_value_is_static(self, value, generator: str) -> bool:
+        """``True`` if the fields of a value are expanded by stateless field handlers for ``generator``."""
+        from .RenderPlan import _is_stateless
+
+        fields = self._compact_value_fields(value)
+        if fields is None:
+            return False
+        formatter = self._var_formatter
+        for _, vartype in fields:
+            method_name = "_fieldhandler_{}_{}".format(generator.upper(), vartype)
+            if not hasattr(formatter, method_name) \
+                    or not _is_stateless(formatter, method_name, "_stateless_fieldhandlers"):
+                return False
+        return True
+
+    def _debug_message_lazy(self, debug_level: int, message, *args):
+        """Lazily formatted version of ``debug_message``.
+
+        The message is printed if ``debug_level`` is high enough, otherwise it is
+        sent to the ``setprogramoptions`` logger if that is enabled for ``DEBUG``
+        messages. It is only formatted if it is emitted.
+
+        Args:
+            debug_level (int): The debug level requirement of this message.
+            message (str,callable): A ``%``-style format string or a callable that
+                returns the message (see :py:class:`setprogramoptions.common.LazyMessage`).
+            args: The arguments for the format string.
+        """
+        if self.debug_level >= debug_level:
+            self.debug_message(debug_level, str(LazyMessage(message, *args)))
+        else:
+            import logging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s", LazyMessage(message, *args))
+        return
+
+    def _collect_warning(self, category: str, varname: str, message, event_type="WARNING") -> bool:
+        """Record a warning if :py:attr:`collect_warnings` is enabled and a collection is active.
+
+        Warnings are only collected while a :py:meth:`gen_option_list` call (or a
+        similar call) collects them, otherwise there is no summary that reports them.
+        Events that would raise an exception based on ``exception_control_level``
+        are not collected. While :py:attr:`_warnings_suppressed` is set, warnings are
+        dropped, i.e., neither collected nor generated as events.
+
+        Args:
+            category (str): The kind of warning.
+            varname (str): The variable the warning is about.
+            message (str,LazyMessage): The warning message.
+            event_type (str): The ``exception_control_event`` type of the warning.
+
+        Returns:
+            bool: ``True`` if the warning was collected or dropped, in which case the
+            caller should not generate the ``exception_control_event``.
+        """
+        if self._warnings_suppressed:
+            return True
+        if not self._warning_collection_active or not self.collect_warnings:
+            return False
+        if self.exception_control_level >= self._exception_control_map_event_to_level_req[event_type]:
+            return False
+        self.warning_collector.add(category, varname, message, event_type)
+        return True
+
+    def _warning_collection_begin(self) -> bool:
+        """Start collecting warnings for a :py:meth:`gen_option_list` call.
+
+        Returns:
+            bool: ``True`` if this call started the collection (nested calls
+            add to the collection of the outermost call).
+        """
+        if not self.collect_warnings or self._warning_collection_active:
+            return False
+        self._warning_collection_active = True
+        self.warning_collector.clear()
+        return True
+
+    def _warning_collection_end(self, title: str):
+        """Finish collecting warnings and print the summary."""
+        self._warning_collection_active = False
+        if len(self.warning_collector) > 0 and self.exception_control_level > 0 \
+                and not self.exception_control_silent_warnings:
+            print(self.warning_collector.summary(title))
+            sys.stdout.flush()
+        return
+
+    def _fire_event(self, event: str, section_name: str, **data):
+        """Call the callbacks registered for ``event``.
+
+        Callers check that :py:attr:`_event_hooks` is not ``None`` first.
+        """
+        for callback in self._event_hooks.get(event, ()):
+            callback(self, section_name, **data)
+        return
+
+    def _locate_handler_method(self, operation) -> tuple:
+        """Convert ``operation`` to a handler name and get the reference to the handler.
+
+        This extends ``ConfigParserEnhanced._locate_handler_method`` to wrap the
+        handler so that its run time is recorded in :py:attr:`stats` when it is enabled.
+        """
+        handler_name, handler_ref = super()._locate_handler_method(operation)
+        if handler_ref is not None and self._stats_enabled:
+            handler_ref = self._stats.wrap("handler:" + handler_name, handler_ref)
+        return (handler_name, handler_ref)
+
+    def _format_option_value(self, value: str, generator='bash', formatter=None) -> Union[str, None]:
+        """
+        Formats the ``value`` of an option entry for a given ``generator``.
+
+        Values containing spaces are surrounded by double quotes (see
+        :py:meth:`_quote_option_value`) and any variable fields (i.e.,
+        ``${VARNAME|VARTYPE}``) are expanded using :py:attr:`_var_formatter`.
+
+        Called by: :py:meth:`_gen_option_entry`
+
+        Args:
+            value (str): The value of an option entry (can be ``None``).
+            generator (str): The generator the value is being formatted for.
+            formatter (ExpandVarsInText): The formatter returned by
+                :py:meth:`_prepare_var_formatter` for ``generator``, if it is already
+                prepared.
+
+        Returns:
+            Union[str,None]: The formatted value or ``None`` if ``value`` is ``None``.
+        """
+        if value is None:
+            return None
+
+        if formatter is None:
+            formatter = self._prepare_var_formatter(generator)
+
+        # format the value
+        return formatter.process(self._quote_option_value(value))
+
+    def _quote_option_value(self, value: str) -> str:
+        """Surround the value of an option entry with double quotes if it contains spaces.
+
+        This is the part of :py:meth:`_format_option_value` that is done before the
+        variable fields are expanded.
+        """
+        if " " in value:
+            value = '"' + value + '"'
+        return value
+
+    def _prepare_var_formatter(self, generator: str) -> ExpandVarsInText:
+        """Configure :py:attr:`_var_formatter` to expand values for ``generator``.
+
+        Returns:
+            ExpandVarsInText: The formatter.
+        """
+        formatter = self._var_formatter
+
+        # Update the var formatter's ECL to match the current value.
+        formatter.exception_control_level = self.exception_control_level
+        formatter.exception_control_compact_warnings = self.exception_control_compact_warnings
+
+        formatter.generator = generator
+        formatter.owner = self
+        formatter._stats = self._stats if self._stats_enabled else None
+        return formatter
+
     def _initialize_handler_parameters(self, section_name, handler_parameters) -> int:
         """Initialize ``handler_parameters``
 
@@ -97,13 +97,14 @@ try:                         # pragma: no cover
 except ImportError:          # pragma: no cover
     pass
 
+from collections.abc import MutableMapping
+import os
 from pathlib import Path
-from pprint import pprint
-import shlex
 
 from configparserenhanced import *
 from configparserenhanced import TypedProperty
 
+from .common import *
 from .SetProgramOptions import SetProgramOptions
 from .SetProgramOptions import ExpandVarsInText
 
@@ -133,6 +134,14 @@ class ExpandVarsInTextCMake(ExpandVarsInText):
     def __init__(self):
         self.exception_control_level = 3
 
+    # Field handlers defined by this class whose result only depends on the field.
+    _stateless_fieldhandlers = (
+        "_fieldhandler_CMAKE_FRAGMENT_ENV",
+        "_fieldhandler_CMAKE_FRAGMENT_CMAKE",
+        "_fieldhandler_CMAKE_INITIAL_CACHE_ENV",
+        "_fieldhandler_CMAKE_INITIAL_CACHE_CMAKE",
+    )
+
     def _fieldhandler_BASH_CMAKE(self, field):
         """
         Format CMAKE fields for the BASH generator.
@@ -151,15 +160,26 @@ class ExpandVarsInTextCMake(ExpandVarsInText):
                 to 3 or lower. If it is 4 or higher then the exception is raised.
         """
         output = field.varfield
-        if field.varname in self.owner._var_formatter_cache.keys():
+        stats = self._stats
+        if field.varname in self.owner._var_formatter_cache:
+            if stats is not None:
+                stats.increment("var_cache:hit")
             output = self.owner._var_formatter_cache[field.varname].strip('"')
         else:
+            if stats is not None:
+                stats.increment("var_cache:miss")
             # If self.exception_control_level is >= 4 then we'll raise the error
             # instead of sending a warning.
             # Change this to `CATASTROPHIC` to always throw the error.
-            msg = f"Unresolved variable expansion for `{field.varname}` in a BASH file."
-            msg += " CMake variables are only valid in a CMake fragment file."
-            self.exception_control_event(self._bashgen_unhandled_cmake_var_eventtype, ValueError, msg)
+            event_type = self._bashgen_unhandled_cmake_var_eventtype
+            msg = LazyMessage(
+                "Unresolved variable expansion for `%s` in a BASH file."
+                " CMake variables are only valid in a CMake fragment file.",
+                field.varname
+            )
+            if not self.owner._collect_warning("bash_unresolved_cmake_var", field.varname, msg, event_type) \
+                    and exception_control_event_enabled(self, event_type):
+                self.exception_control_event(event_type, ValueError, str(msg))
             output = ""
         return output
 
@@ -173,6 +193,235 @@ class ExpandVarsInTextCMake(ExpandVarsInText):
         output = "${" + field.varname + "}"
         return output
 
+    def _fieldhandler_CMAKE_INITIAL_CACHE_ENV(self, field):
+        """Format ENV fields for CMAKE_INITIAL_CACHE generators.
+
+        Initial-cache scripts are loaded by CMake via ``-C`` so they use the
+        same syntax as CMake fragment files.
+        """
+        return self._fieldhandler_CMAKE_FRAGMENT_ENV(field)
+
+    def _fieldhandler_CMAKE_INITIAL_CACHE_CMAKE(self, field):
+        """Format CMAKE fields for CMAKE_INITIAL_CACHE generators."""
+        return self._fieldhandler_CMAKE_FRAGMENT_CMAKE(field)
+
+
+
+class CMakeSymbolTableSnapshot(object):
+    """
+    Immutable state of a :py:class:`CMakeSymbolTable` captured by
+    :py:meth:`CMakeSymbolTable.snapshot`.
+    """
+
+    def __init__(self, cache: dict, scopes: tuple):
+        self._cache = cache
+        self._scopes = scopes
+
+
+
+class CMakeSymbolTable(MutableMapping):
+    """
+    Symbol table that tracks CMake variables the way CMake does.
+
+    CMake keeps *cache* variables and *normal* variables in separate namespaces.
+    Normal variables live in a stack of scopes (one per ``function()`` or
+    ``add_subdirectory()``) and shadow cache variables of the same name when
+    a variable is referenced.
+
+    - ``set(<var> <value> CACHE ...)`` only changes an existing cache entry if
+      ``FORCE`` is given.
+    - ``set(<var> <value> PARENT_SCOPE)`` assigns the variable in the parent
+      scope and leaves the current scope untouched. At the top-level scope
+      there is no parent so CMake ignores the assignment.
+
+    Snapshots are copy-on-write so :py:meth:`snapshot` and :py:meth:`restore`
+    are O(1) operations. The first modification of a scope after a snapshot
+    copies that scope.
+
+    The mapping interface (``[]``, ``in``, ``keys()``, ...) provides *lookup*
+    semantics: reading a name returns the normal variable if one exists and
+    the cache variable otherwise. Assigning through the mapping interface
+    performs a ``FORCE``\ d cache assignment, which is what a ``-D`` option
+    on the CMake command line does.
+
+    Args:
+        cache (dict): Initial cache variables.
+        normal (dict): Initial normal variables of the top-level scope.
+    """
+
+    def __init__(self, cache=None, normal=None):
+        self._cache = dict(cache) if cache is not None else {}
+        self._cache_shared = False
+        self._scopes = [dict(normal) if normal is not None else {}]
+        self._scopes_shared = [False]
+
+    # -------------------------------
+    #   P U B L I C   M E T H O D S
+    # -------------------------------
+
+    def set(self, varname: str, value, cache=False, force=False, parent_scope=False) -> bool:
+        """Assign a CMake variable using ``set()`` semantics.
+
+        Args:
+            varname (str): The name of the variable.
+            value: The value of the variable.
+            cache (bool): If ``True`` this is a cache variable assignment.
+            force (bool): If ``True`` an existing cache variable is overwritten.
+            parent_scope (bool): If ``True`` the normal variable is assigned in
+                the parent scope.
+
+        Returns:
+            bool: ``True`` if the assignment changed the symbol table, otherwise ``False``.
+        """
+        if cache:
+            if varname in self._cache and not force:
+                return False
+            self._writable_cache()[varname] = value
+            return True
+
+        if parent_scope:
+            if len(self._scopes) < 2:
+                return False
+            self._writable_scope(-2)[varname] = value
+            return True
+
+        self._writable_scope(-1)[varname] = value
+        return True
+
+    def get(self, varname: str, default=None):
+        """Look up a variable, normal variables shadow cache variables.
+
+        Args:
+            varname (str): The name of the variable.
+            default: The value returned if ``varname`` is not defined.
+
+        Returns:
+            The value of ``varname`` or ``default``.
+        """
+        for scope in reversed(self._scopes):
+            if varname in scope:
+                return scope[varname]
+        return self._cache.get(varname, default)
+
+    def has_cache_var(self, varname: str) -> bool:
+        """Check if ``varname`` is a cache variable."""
+        return varname in self._cache
+
+    def has_normal_var(self, varname: str) -> bool:
+        """Check if ``varname`` is a normal variable visible in the current scope."""
+        return any(varname in scope for scope in self._scopes)
+
+    def push_scope(self):
+        """Enter a new normal variable scope."""
+        self._scopes.append({})
+        self._scopes_shared.append(False)
+        return
+
+    def pop_scope(self):
+        """Leave the current normal variable scope.
+
+        Raises:
+            IndexError: If the current scope is the top-level scope.
+        """
+        if len(self._scopes) < 2:
+            raise IndexError("Unable to pop the top-level scope of a CMakeSymbolTable.")
+        self._scopes.pop()
+        self._scopes_shared.pop()
+        return
+
+    def snapshot(self) -> CMakeSymbolTableSnapshot:
+        """Capture the current state of the symbol table.
+
+        Returns:
+            CMakeSymbolTableSnapshot: A snapshot that can be passed to :py:meth:`restore`.
+        """
+        self._cache_shared = True
+        self._scopes_shared = [True] * len(self._scopes)
+        return CMakeSymbolTableSnapshot(self._cache, tuple(self._scopes))
+
+    def restore(self, snapshot: CMakeSymbolTableSnapshot):
+        """Restore the symbol table to the state captured in ``snapshot``.
+
+        Args:
+            snapshot (CMakeSymbolTableSnapshot): A snapshot from :py:meth:`snapshot`.
+        """
+        if not isinstance(snapshot, CMakeSymbolTableSnapshot):
+            raise TypeError("snapshot must be a `CMakeSymbolTableSnapshot` type.")
+        self._cache = snapshot._cache
+        self._cache_shared = True
+        self._scopes = list(snapshot._scopes)
+        self._scopes_shared = [True] * len(self._scopes)
+        return
+
+    def update_cache(self, mapping, force=True):
+        """Assign cache variables from a mapping.
+
+        Args:
+            mapping (dict): The variables to assign.
+            force (bool): If ``True`` existing cache variables are overwritten.
+        """
+        for varname, value in mapping.items():
+            self.set(varname, value, cache=True, force=force)
+        return
+
+    # ----------------------------------------
+    #   M U T A B L E   M A P P I N G   A P I
+    # ----------------------------------------
+
+    def __getitem__(self, varname):
+        for scope in reversed(self._scopes):
+            if varname in scope:
+                return scope[varname]
+        return self._cache[varname]
+
+    def __setitem__(self, varname, value):
+        self.set(varname, value, cache=True, force=True)
+
+    def __delitem__(self, varname):
+        found = False
+        for index in range(len(self._scopes)):
+            if varname in self._scopes[index]:
+                del self._writable_scope(index)[varname]
+                found = True
+        if varname in self._cache:
+            del self._writable_cache()[varname]
+            found = True
+        if not found:
+            raise KeyError(varname)
+
+    def __contains__(self, varname):
+        return varname in self._cache or any(varname in scope for scope in self._scopes)
+
+    def __iter__(self):
+        seen = set()
+        for mapping in [*reversed(self._scopes), self._cache]:
+            for varname in mapping:
+                if varname not in seen:
+                    seen.add(varname)
+                    yield varname
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(cache={self._cache!r}, scopes={self._scopes!r})"
+
+    # -----------------------
+    #   H E L P E R S
+    # -----------------------
+
+    def _writable_cache(self) -> dict:
+        if self._cache_shared:
+            self._cache = dict(self._cache)
+            self._cache_shared = False
+        return self._cache
+
+    def _writable_scope(self, index: int) -> dict:
+        if self._scopes_shared[index]:
+            self._scopes[index] = dict(self._scopes[index])
+            self._scopes_shared[index] = False
+        return self._scopes[index]
+
 
 
 # ===============================
@@ -206,10 +455,243 @@ class SetProgramOptionsCMake(SetProgramOptions):
         "_varhandler", expected_type=ExpandVarsInTextCMake, default_factory=ExpandVarsInTextCMake
     )
 
+    @property
+    def _var_formatter_cache(self) -> CMakeSymbolTable:
+        """
+        The :py:class:`CMakeSymbolTable` used to resolve ``${VARNAME|CMAKE}`` fields
+        while generating an option list.
+
+        This table is reset by :py:meth:`gen_option_list` to the symbols that were
+        seeded using :py:meth:`seed_cmake_symbols` (or to an empty table if nothing
+        was seeded). Assigning a ``dict`` creates a table with those cache variables.
+        """
+        if not hasattr(self, '_property_var_formatter_cache'):
+            self._property_var_formatter_cache = CMakeSymbolTable()
+            if getattr(self, '_cmake_symbol_seed', None) is not None:
+                self._property_var_formatter_cache.restore(self._cmake_symbol_seed)
+        return self._property_var_formatter_cache
+
+    @_var_formatter_cache.setter
+    def _var_formatter_cache(self, value) -> CMakeSymbolTable:
+        self._validate_parameter(value, (CMakeSymbolTable, dict))
+        if isinstance(value, dict):
+            value = CMakeSymbolTable(cache=value)
+        self._property_var_formatter_cache = value
+        return self._property_var_formatter_cache
+
+    @_var_formatter_cache.deleter
+    def _var_formatter_cache(self):
+        if hasattr(self, '_property_var_formatter_cache'):
+            del self._property_var_formatter_cache
+        return
+
+    # Program option handlers defined by this class whose result only depends on
+    # the parameters and the value.
+    _stateless_program_option_handlers = (
+        "_program_option_handler_opt_set_cmake_fragment",
+        "_program_option_handler_opt_set_cmake_initial_cache",
+    )
+
+    # Operation handlers defined by this class that the `setprogramoptions.FastParser` implements.
+    _fast_parse_handlers = {"_handler_opt_set_cmake_var": "add"}
+
+    # Size (in bytes) of the bash argument list above which
+    # `gen_option_list_bash_spill` moves the CMake cache variables
+    # into an initial-cache script.
+    bash_spill_threshold = typed_property("bash_spill_threshold", expected_type=int, default=131072)
+
     # -------------------------------
     #   P U B L I C   M E T H O D S
     # -------------------------------
 
+    def gen_option_list_bash_spill(self, section, cache_script, threshold=None) -> list:
+        """Generate a ``bash`` option list that spills large CMake caches to a file.
+
+        This generates the same options as ``gen_option_list(section, "bash")`` and
+        measures the size of the resulting argument list. If the size is larger
+        than ``threshold`` then all of the ``-D`` entries generated by
+        ``opt-set-cmake-var`` operations are moved into a CMake *initial-cache*
+        script that is written to ``cache_script`` and the ``-D`` options are
+        replaced by a single ``-C <cache_script>`` option.
+
+        The initial-cache script is generated by the ``cmake_initial_cache`` generator
+        which only emits ``set()`` commands for the variables the ``bash`` generator
+        would have passed as ``-D`` options. Every entry is written as a ``FORCE``d
+        cache assignment since ``-D`` options always overwrite the cache, so both
+        command lines result in the same CMake cache.
+
+        Args:
+            section (str): The section name that contains the options
+                we wish to process.
+            cache_script (str,Path): The path to the initial-cache script that
+                is written if the argument list is too large.
+            threshold (int): The maximum size of the argument list in bytes.
+                If not provided then :py:attr:`bash_spill_threshold` is used.
+
+        Returns:
+            list: A ``list`` containing the processed options text.
+        """
+        self._validate_parameter(section, (str))
+        self._validate_parameter(cache_script, (str, Path))
+        self._validate_parameter(threshold, (int, None))
+
+        if threshold is None:
+            threshold = self.bash_spill_threshold
+
+        if section not in self.options.keys():
+            self.parse_section(section)
+
+        # Generate the bash options, keeping track of which lines came
+        # from CMake cache variables.
+        del self._var_formatter_cache
+
+        option_lines = []
+        collecting = self._warning_collection_begin()
+        try:
+            for option_entry in self.options[section]:
+                line = self._gen_option_entry(option_entry, generator="bash")
+                if self._event_hooks is not None:
+                    self._fire_event(
+                        "entry_rendered", section, entry=option_entry, generator="bash", line=line
+                    )
+                if line is not None:
+                    option_lines.append(("opt_set_cmake_var" in option_entry['type'], line))
+        finally:
+            if collecting:
+                self._warning_collection_end(f"`{section}` (bash)")
+
+        output = [line for (is_cache_var, line) in option_lines]
+
+        if self._helper_argv_size(output) <= threshold:
+            return output
+
+        self._debug_message_lazy(1, "Spilling CMake cache variables of `%s` to `%s`", section, cache_script)
+
+        # Generate the initial-cache script. Warnings were already issued by
+        # the bash generator above so we suppress them here.
+        self._warnings_suppressed += 1
+        try:
+            cache_lines = self.gen_option_list(section, generator="cmake_initial_cache")
+        finally:
+            self._warnings_suppressed -= 1
+
+        cache_script = Path(cache_script)
+        cache_text = f"# CMake initial-cache script generated from section `{section}`\n"
+        cache_text += "\n".join(cache_lines) + "\n"
+        cache_script.write_text(cache_text)
+
+        cache_script_arg = str(cache_script)
+        if " " in cache_script_arg:
+            cache_script_arg = '"' + cache_script_arg + '"'
+
+        output = []
+        for is_cache_var, line in option_lines:
+            if not is_cache_var:
+                output.append(line)
+            elif cache_script_arg is not None:
+                output.append("-C " + cache_script_arg)
+                cache_script_arg = None
+
+        return output
+
+    def seed_cmake_symbols(self, sections=None, mapping=None) -> CMakeSymbolTable:
+        """Seed the CMake symbol table used by :py:meth:`gen_option_list`.
+
+        ``${VARNAME|CMAKE}`` fields can only be resolved by the ``bash`` generator
+        if ``VARNAME`` was set earlier in the section being generated. Seeding
+        defines variables from other sections and/or an external mapping so
+        that they can be resolved without rendering those sections first.
+
+        The ``opt-set-cmake-var`` entries of each section in ``sections`` are applied
+        to the symbol table using the CMake ``set()`` rules (see :py:class:`CMakeSymbolTable`).
+        Only the values of these entries are formatted, no option lists are generated.
+        The variables in ``mapping`` are added as cache variables before the sections
+        are applied.
+
+        Seeded cache variables are treated as if they already exist in the CMake cache,
+        so a later non-``FORCE`` assignment of one of them is skipped by the ``bash``
+        generator just as CMake would ignore it.
+
+        Each call replaces the previous seed. Calling this method with no arguments
+        clears the seed.
+
+        Args:
+            sections (list): A list of section names to take variables from.
+            mapping (dict): A dictionary of cache variables to define.
+
+        Returns:
+            CMakeSymbolTable: The seeded symbol table.
+        """
+        self._validate_parameter(sections, (list, tuple, None))
+        self._validate_parameter(mapping, (dict, None))
+
+        self._cmake_symbol_seed = None
+        del self._var_formatter_cache
+        symbols = self._var_formatter_cache
+
+        if mapping is not None:
+            symbols.update_cache(mapping)
+
+        for section in sections or []:
+            if section not in self.options.keys():
+                self.parse_section(section)
+
+            for option_entry in self.options[section]:
+                if "opt_set_cmake_var" not in option_entry['type']:
+                    continue
+                params = option_entry['params']
+                param_opts = self._helper_opt_set_cmake_var_parse_parameters(params[1 : 4], params[0])
+                value = self._format_option_value(option_entry['value'], "bash")
+                symbols.set(
+                    params[0],
+                    value,
+                    cache=param_opts['VARIANT'] == VarType.CACHE,
+                    force=param_opts['FORCE'],
+                    parent_scope=param_opts['PARENT_SCOPE']
+                )
+
+        self._cmake_symbol_seed = symbols.snapshot()
+        return symbols
+
+    def export_sections(self, out_dir, sections=None, generators=("bash", "cmake_fragment"), workers=None):
+        """Render sections with generators into files in ``out_dir``.
+
+        Each section is written to ``<out_dir>/<section><extension>`` for each generator,
+        i.e., ``SECTION.sh`` for ``bash`` and ``SECTION.cmake`` for ``cmake_fragment``,
+        and ``<out_dir>/manifest.json`` records the SHA-256 digest of every file.
+        Files are written atomically and only if their content changed.
+
+        Sections are rendered by ``workers`` processes which use their own parsers
+        with the settings of this parser. The rendering is done by this parser (in
+        this process) if ``workers`` is 1, if there is only one section or if the
+        workers can not reproduce the state of this parser, i.e., if it was not loaded
+        from files, if the CMake symbol table was seeded by :py:meth:`seed_cmake_symbols`,
+        if sections of :py:attr:`options` were assigned (e.g., virtual sections) or
+        deleted, if it has event hooks, if it collects warnings or if :py:attr:`stats`
+        is enabled.
+
+        A section whose name can not be used as a file name (e.g., it contains a
+        ``/``) is reported as an error.
+
+        An option list that can not be generated does not stop the export. The
+        error is reported in :py:attr:`ExportResult.errors
+        <setprogramoptions.export.ExportResult.errors>` and no file is written for it.
+
+        Args:
+            out_dir (str,Path): The output directory, which is created if needed.
+            sections (list): The sections to export. Defaults to all the sections
+                that are not used by another section (see :py:meth:`root_sections`).
+            generators (list): The generators to render each section with.
+            workers (int): The number of worker processes. Defaults to the number of CPUs.
+
+        Returns:
+            ExportResult: The files that were written or unchanged and the errors.
+        """
+        from .export import export_sections
+        self._validate_parameter(sections, (list, tuple, None))
+        self._validate_parameter(generators, (list, tuple))
+        return export_sections(self, os.fspath(out_dir), sections, generators, workers)
+
     # ---------------------------------------------------------------
     #   H A N D L E R S  -  P R O G R A M   O P T I O N S
     # ---------------------------------------------------------------
@@ -270,41 +752,8 @@ class SetProgramOptionsCMake(SetProgramOptions):
                 is less than 5 then warnings are generated to note the
                 exclusion.
         """
-        varname = params[0]
-        params = params[1 : 4]
-        param_opts = self._helper_opt_set_cmake_var_parse_parameters(params)
-
-        # Type-1 (non-cached / PARENT_SCOPE / non-typed) entries should not be
-        # written to the set of Bash parameters.
-        if param_opts['VARIANT'] == VarType.NON_CACHE:
-            msg = f"bash generator - `{varname}={value}` skipped because"
-            msg += f" it is a non-cached (type-1) operation."
-            msg += f" To generate a bash arg for this consider adding FORCE or a TYPE"
-            msg += f" and remove PARENT_SCOPE if it exists."
-            self.exception_control_event("WARNING", ValueError, message=msg)
-            return None
-
-        # If varname has already been assigned and this assignment
-        # does not include FORCE then we should skip adding it to the
-        # set of command line options.
-        if varname in self._var_formatter_cache and not param_opts['FORCE']:
-            msg = f"bash generator - `{varname}={value}` skipped because"
-            msg += f" CACHE var `{varname}` is already set and CMake requires"
-            msg += f" FORCE to be set to change the value."
-            self.exception_control_event("WARNING", ValueError, message=msg)
-            return None
-
-        # Prepend `-D` to the parameters
-        params = ["-D", varname]
-
-        # If the type is provided then include the `:<typename>` argument.
-        # Note: CMake defaults to STRING if not provided.
-        params.append(":" + param_opts['TYPE'])
-
-        # Save variable to the cache of 'known'/'set' cmake variables
-        self._var_formatter_cache[varname] = value
-
-        return self._generic_program_option_handler_bash(params, value)
+        from .Generator import BashGenerator
+        return BashGenerator(self).opt_set_cmake_var(params, value)
 
     def _program_option_handler_opt_set_cmake_var_cmake_fragment(self, params: list, value: str) -> str:
         """
@@ -332,24 +781,83 @@ class SetProgramOptionsCMake(SetProgramOptions):
             performs a deep-copy of these parameters prior to calling this.
             Any changes we make are ephemeral.
         """
+        from .Generator import CMakeFragmentGenerator
+        return CMakeFragmentGenerator(self).opt_set_cmake_var(params, value)
+
+    def _program_option_handler_opt_set_cmake_initial_cache(self, params: list, value: str) -> str:
+        """
+        **cmake initial cache** line-item handler for ``opt-set`` entries.
+
+        Generic options are not CMake cache entries so they are left on the
+        command line by :py:meth:`gen_option_list_bash_spill`. This is a noop
+        for the same reasons as :py:meth:`_program_option_handler_opt_set_cmake_fragment`.
+
+        Returns:
+            None
+        """
+        return None
+
+    def _program_option_handler_opt_set_cmake_var_cmake_initial_cache(self, params: list, value: str) -> str:
+        """
+        **cmake initial cache** line-item generator for ``opt-set-cmake-var`` entries.
+
+        This generates the ``set()`` command for an initial-cache script (``cmake -C``)
+        that is equivalent to the ``-D`` option the ``bash`` generator would produce.
+        The same entries that the ``bash`` generator skips are skipped here and the
+        remaining ones are written as ``FORCE``d cache entries using
+        :py:meth:`_program_option_handler_opt_set_cmake_var_cmake_fragment`.
+
+        Called By: :py:meth:`setprogramoptions.SetProgramOptions._gen_option_entry`
+        using method name scheme: ``_program_option_handler_<operation>_<generator>()``
+
+        Args:
+            params (list): The parameters of the operation.
+            value (str): The value of the option that is being assigned.
+
+        Returns:
+            str: A ``set()`` command or ``None`` if the entry is skipped.
+        """
         varname = params[0]
         params = params[1 : 4]
-        param_opts = self._helper_opt_set_cmake_var_parse_parameters(params)
+        param_opts = self._helper_opt_set_cmake_var_parse_parameters(params, varname)
 
-        params = [varname, value]
-        if param_opts['TYPE'] is not None:
-            params.append("CACHE")
-            params.append(param_opts["TYPE"])
-            params.append('"from .ini configuration"')
+        if self._helper_opt_set_cmake_var_bash_skip(varname, value, param_opts):
+            return None
 
-        if param_opts['PARENT_SCOPE']:
-            params.append("PARENT_SCOPE")
+        # Save variable to the cache of 'known'/'set' cmake variables
+        self._var_formatter_cache[varname] = value
 
-        if param_opts['FORCE']:
-            params.append("FORCE")
+        params = [varname, param_opts['TYPE'], "FORCE"]
+        return self._program_option_handler_opt_set_cmake_var_cmake_fragment(params, value)
 
-        output = "set({})".format(" ".join(params))
-        return output
+    # ---------------------------------------------------------------
+    #   H A N D L E R S  -  P R O G R A M   O P T I O N   S T A T E
+    # ---------------------------------------------------------------
+
+    def _program_option_state_opt_set_cmake_var_bash(self, params: list, value: str):
+        """
+        State handler for ``opt-set-cmake-var`` entries that are filtered out of a
+        ``bash`` option list. Records the variable like
+        :py:meth:`_program_option_handler_opt_set_cmake_var_bash` does.
+
+        Called By: :py:meth:`setprogramoptions.SetProgramOptions._program_option_state`
+        """
+        self._helper_opt_set_cmake_var_state(params, value, "bash")
+        return
+
+    def _program_option_state_opt_set_cmake_var_cmake_initial_cache(self, params: list, value: str):
+        """
+        State handler for ``opt-set-cmake-var`` entries that are filtered out of a
+        ``cmake_initial_cache`` option list.
+
+        Called By: :py:meth:`setprogramoptions.SetProgramOptions._program_option_state`
+        """
+        self._helper_opt_set_cmake_var_state(params, value, "cmake_initial_cache")
+        return
+
+    # ---------------------------------------------------------------
+    #   H A N D L E R S  -  C O N F I G P A R S E R E N H A N C E D
+    # ---------------------------------------------------------------
 
     @ConfigParserEnhanced.operation_handler
     def handler_initialize(self, section_name: str, handler_parameters) -> int:
@@ -403,7 +911,201 @@ class SetProgramOptionsCMake(SetProgramOptions):
     #   H E L P E R S
     # -----------------------
 
-    def _helper_opt_set_cmake_var_parse_parameters(self, params: list):
+    def _fingerprint_context(self, generator):
+        """Extends :py:meth:`SetProgramOptions._fingerprint_context`.
+
+        Option lists rendered with a CMake symbol table seeded by :py:meth:`seed_cmake_symbols`
+        depend on the seed, so their fingerprints are not memoized.
+        """
+        if generator is not None and getattr(self, "_cmake_symbol_seed", None) is not None:
+            return None
+        return super()._fingerprint_context(generator)
+
+    def _compact_option_entries(self, entries: list, generator: str) -> list:
+        """Remove the entries that do not change the option list of a generator.
+
+        Extends :py:meth:`SetProgramOptions._compact_option_entries` to also remove the
+        non-cache (type-1) ``opt-set-cmake-var`` entries that the ``bash`` and
+        ``cmake_initial_cache`` generators skip, while the warning for skipping them is
+        neither generated (see :py:func:`~setprogramoptions.common.exception_control_event_enabled`)
+        nor collected.
+
+        Args:
+            entries (list): The option entries of a section.
+            generator (str): The generator.
+
+        Returns:
+            list: The option entries that remain.
+        """
+        entries = super()._compact_option_entries(entries, generator)
+        if self.collect_warnings or exception_control_event_enabled(self, "WARNING"):
+            return entries
+
+        skipping_handlers = (
+            "_program_option_handler_opt_set_cmake_var_bash",
+            "_program_option_handler_opt_set_cmake_var_cmake_initial_cache",
+        )
+        output = []
+        for entry in entries:
+            method_name, method_ref = self._locate_program_option_handler(entry['type'], generator)
+            if method_name in skipping_handlers:
+                default_handler = getattr(SetProgramOptionsCMake, method_name)
+                if getattr(method_ref, "__func__", None) is default_handler \
+                        and self._compact_entry_is_non_cache(entry, generator):
+                    continue
+            output.append(entry)
+        return output
+
+    def _compact_entry_is_non_cache(self, entry, generator: str) -> bool:
+        """``True`` if an ``opt-set-cmake-var`` entry is a non-cache (type-1) assignment.
+
+        Entries that can not be generated (``FORCE`` with ``PARENT_SCOPE``) and entries
+        whose value can not be expanded without its position are not reported.
+        """
+        params = entry['params']
+        if "FORCE" in params[1 : 4] and "PARENT_SCOPE" in params[1 : 4]:
+            return False
+        if not self._compact_value_is_static(entry['value'], generator):
+            return False
+        param_opts = self._helper_opt_set_cmake_var_parse_parameters(params[1 : 4], params[0])
+        return param_opts['VARIANT'] == VarType.NON_CACHE
+
+    def _filter_option_entries(self, section_data: list, entry_filter, generator: str) -> list:
+        """Apply an entry filter to the option entries of a section.
+
+        Extends :py:meth:`setprogramoptions.SetProgramOptions._filter_option_entries` to
+        also drop the ``opt-set-cmake-var`` entries that are filtered out and set
+        variables that none of the remaining entries use or set.
+        """
+        steps = super()._filter_option_entries(section_data, entry_filter, generator)
+
+        # Walk backwards collecting the variables that later entries depend on.
+        # `needed` is None once a value with unknown references is found.
+        needed = set()
+        output = []
+        for option_entry, selected in reversed(steps):
+            if "opt_set_cmake_var" in option_entry['type']:
+                varname = option_entry['params'][0]
+                if not selected and needed is not None and varname not in needed:
+                    continue
+                if needed is not None:
+                    needed.add(varname)
+            if needed is not None:
+                fields = self._compact_value_fields(option_entry['value'])
+                if fields is None:
+                    needed = None
+                else:
+                    needed.update(varname for varname, vartype in fields if vartype == "CMAKE")
+            output.append((option_entry, selected))
+        output.reverse()
+        return output
+
+    def _option_entry_name(self, option_entry: dict) -> str:
+        """The name of an option entry that entry filters match.
+
+        This is the variable of ``opt-set-cmake-var`` entries.
+        """
+        if "opt_set_cmake_var" in option_entry['type']:
+            return option_entry['params'][0]
+        return super()._option_entry_name(option_entry)
+
+    def _var_formatter_cache_snapshot(self) -> CMakeSymbolTableSnapshot:
+        """Capture the state of the CMake symbol table (copy-on-write)."""
+        return self._var_formatter_cache.snapshot()
+
+    def _var_formatter_cache_restore(self, snapshot: CMakeSymbolTableSnapshot):
+        """Restore the CMake symbol table to a state from :py:meth:`_var_formatter_cache_snapshot`."""
+        self._var_formatter_cache.restore(snapshot)
+        return
+
+    def _helper_argv_size(self, option_list: list) -> int:
+        """
+        Computes the number of bytes an option list occupies as an argument
+        list, including the terminating ``NUL`` of each argument.
+
+        Args:
+            option_list (list): A list of options from :py:meth:`gen_option_list`.
+
+        Returns:
+            int: The size of the argument list in bytes.
+        """
+        return sum(len(option.encode()) + 1 for option in option_list)
+
+    def _helper_opt_set_cmake_var_bash_skip(self, varname: str, value: str, param_opts: dict) -> bool:
+        """
+        Determines if an ``opt-set-cmake-var`` entry is skipped when generating
+        command line ``-D`` options. A warning is issued for skipped entries.
+
+        Called By:
+
+        - :py:meth:`_program_option_handler_opt_set_cmake_var_bash`
+        - :py:meth:`_program_option_handler_opt_set_cmake_var_cmake_initial_cache`
+
+        Args:
+            varname (str): The name of the CMake variable.
+            value (str): The value of the option that is being assigned.
+            param_opts (dict): The flags returned by :py:meth:`_helper_opt_set_cmake_var_parse_parameters`.
+
+        Returns:
+            bool: ``True`` if the entry should be skipped, otherwise ``False``.
+        """
+        # Type-1 (non-cached / PARENT_SCOPE / non-typed) entries should not be
+        # written to the set of Bash parameters.
+        if param_opts['VARIANT'] == VarType.NON_CACHE:
+            msg = LazyMessage(
+                "bash generator - `%s=%s` skipped because it is a non-cached (type-1) operation."
+                " To generate a bash arg for this consider adding FORCE or a TYPE"
+                " and remove PARENT_SCOPE if it exists.",
+                varname,
+                value
+            )
+            if not self._collect_warning("bash_skip_non_cache", varname, msg) \
+                    and exception_control_event_enabled(self, "WARNING"):
+                self.exception_control_event("WARNING", ValueError, message=str(msg))
+            return True
+
+        # If varname has already been assigned and this assignment
+        # does not include FORCE then we should skip adding it to the
+        # set of command line options.
+        if self._var_formatter_cache.has_cache_var(varname) and not param_opts['FORCE']:
+            msg = LazyMessage(
+                "bash generator - `%s=%s` skipped because CACHE var `%s` is already set"
+                " and CMake requires FORCE to be set to change the value.",
+                varname,
+                value,
+                varname
+            )
+            if not self._collect_warning("bash_skip_cache_reassign", varname, msg) \
+                    and exception_control_event_enabled(self, "WARNING"):
+                self.exception_control_event("WARNING", ValueError, message=str(msg))
+            return True
+
+        return False
+
+    def _helper_opt_set_cmake_var_state(self, params: list, value: str, generator: str):
+        """
+        Records the variable of an ``opt-set-cmake-var`` entry that is filtered out of
+        an option list in the cache of 'known'/'set' cmake variables, unless the
+        ``bash`` generator would skip it. No warnings are generated and the value is
+        only expanded if the variable is recorded.
+
+        Called By:
+
+        - :py:meth:`_program_option_state_opt_set_cmake_var_bash`
+        - :py:meth:`_program_option_state_opt_set_cmake_var_cmake_initial_cache`
+        """
+        varname = params[0]
+
+        self._warnings_suppressed += 1
+        try:
+            param_opts = self._helper_opt_set_cmake_var_parse_parameters(params[1 : 4], varname)
+            if not self._helper_opt_set_cmake_var_bash_skip(varname, value, param_opts):
+                self._var_formatter_cache[varname] = self._format_option_value(value, generator)
+        finally:
+            self._warnings_suppressed -= 1
+        return
+
+    def _helper_opt_set_cmake_var_parse_parameters(self, params: list, varname=None):
         """
         Processes the list of parameters to detect the existence of
         flags for variables. This is consumed when generating option lists
@@ -420,6 +1122,7 @@ class SetProgramOptionsCMake(SetProgramOptions):
         Args:
             params (:obj:`list` of :obj:`str`): The list of parameters
                 pulled out of the .ini file entry.
+            varname (str): The name of the variable, used to report warnings.
 
         Returns:
             dict: A dictinary object that captures the existence or
@@ -460,12 +1163,16 @@ class SetProgramOptionsCMake(SetProgramOptions):
         #         TBH: this should probably be a CATASTROPHIC but for now I'll
         #              at least warn about it which is more than CMake does.
         if output['PARENT_SCOPE'] and output["TYPE"] != None:
-            msg = "WARNING: Setting `PARENT_SCOPE` with `CACHE` parameters will result\n"
-            msg += "         in a non-CACHE variable being set containing a list of the\n"
-            msg += "         CACHE options. i.e., '<value>;CACHE;<type>;<docstring>'\n"
-            msg += "         which is probably not what is intended, but CMake will\n"
-            msg += "         not error or warn on this."
-            self.exception_control_event("WARNING", ValueError, message=msg)
+            msg = LazyMessage(
+                "WARNING: Setting `PARENT_SCOPE` with `CACHE` parameters will result\n"
+                "         in a non-CACHE variable being set containing a list of the\n"
+                "         CACHE options. i.e., '<value>;CACHE;<type>;<docstring>'\n"
+                "         which is probably not what is intended, but CMake will\n"
+                "         not error or warn on this."
+            )
+            if not self._collect_warning("parent_scope_with_cache_type", varname, msg) \
+                    and exception_control_event_enabled(self, "WARNING"):
+                self.exception_control_event("WARNING", ValueError, message=str(msg))
 
         # Determine the variant of the ``set`` operation.
         # Type 1: ``set(<variable> <value>... [PARENT_SCOPE])``
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+WarningCollector
+================
+
+Collects the warnings generated while generating option lists so they can be
+reported once, as a summary, instead of one message per event.
+
+When :py:attr:`~setprogramoptions.SetProgramOptions.collect_warnings` is enabled,
+warnings that would otherwise be printed by ``exception_control_event`` are
+recorded as :py:class:`CollectedWarning` objects. Warnings are deduplicated by their
+*category* and *variable name*; repeated warnings only increment a counter. At the
+end of :py:meth:`~setprogramoptions.SetProgramOptions.gen_option_list` a single summary
+is printed (unless warnings are silenced) and the records remain available from
+:py:attr:`~setprogramoptions.SetProgramOptions.collected_warnings`.
+
+Events that would *raise* an exception based on the ``exception_control_level``
+are never collected; they are raised as usual.
+"""
+from __future__ import print_function
+
+
+
+class CollectedWarning(object):
+    """
+    A warning recorded by :py:class:`WarningCollector`.
+
+    Attributes:
+        category (str): The kind of warning, i.e., ``bash_skip_non_cache``.
+        varname (str): The variable (or option) that the warning is about.
+        event_type (str): The ``exception_control_event`` type of the warning.
+        count (int): The number of times the warning was generated.
+    """
+
+    def __init__(self, category: str, varname: str, message, event_type="WARNING"):
+        self.category = category
+        self.varname = varname
+        self.event_type = event_type
+        self.count = 1
+        self._message = message
+
+    @property
+    def message(self) -> str:
+        """The message of the first occurrence of the warning."""
+        return str(self._message)
+
+    def as_dict(self) -> dict:
+        """The warning as a ``dict``."""
+        return {
+            "category": self.category,
+            "varname": self.varname,
+            "event_type": self.event_type,
+            "count": self.count,
+            "message": self.message,
+        }
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.category!r}, {self.varname!r}, count={self.count})"
+
+
+
+class WarningCollector(object):
+    """
+    Deduplicating store of :py:class:`CollectedWarning` objects.
+
+    Args:
+        max_names (int): The number of variable names listed per category
+            in :py:meth:`summary`.
+    """
+
+    def __init__(self, max_names=5):
+        self.max_names = max_names
+        self.clear()
+
+    def clear(self):
+        """Discard all collected warnings."""
+        self._records = {}
+        return
+
+    def add(self, category: str, varname: str, message, event_type="WARNING") -> CollectedWarning:
+        """Record a warning.
+
+        Args:
+            category (str): The kind of warning.
+            varname (str): The variable the warning is about.
+            message (str,LazyMessage): The message. It is only converted to a ``str``
+                when it is read.
+            event_type (str): The ``exception_control_event`` type of the warning.
+
+        Returns:
+            CollectedWarning: The record for ``(category, varname)``.
+        """
+        key = (category, varname)
+        record = self._records.get(key)
+        if record is None:
+            record = CollectedWarning(category, varname, message, event_type)
+            self._records[key] = record
+        else:
+            record.count += 1
+        return record
+
+    @property
+    def records(self) -> list:
+        """The collected warnings, in the order they were first generated."""
+        return list(self._records.values())
+
+    def __len__(self):
+        return len(self._records)
+
+    def summary(self, title=None) -> str:
+        """A summary of the collected warnings grouped by category.
+
+        Args:
+            title (str): Describes what the warnings were collected from.
+
+        Returns:
+            str: The summary text.
+        """
+        categories = {}
+        for record in self._records.values():
+            categories.setdefault(record.category, []).append(record)
+
+        total = sum(record.count for record in self._records.values())
+        header = f"!! {total} warning(s) ({len(self._records)} unique) collected"
+        if title is not None:
+            header += f" while generating {title}"
+        lines = [header + ":"]
+        for category, records in categories.items():
+            occurrences = sum(record.count for record in records)
+            names = ", ".join(f"`{record.varname}`" for record in records[: self.max_names])
+            if len(records) > self.max_names:
+                names += f", ... (+{len(records) - self.max_names} more)"
+            lines.append(
+                f"!!   - {category}: {len(records)} variable(s), {occurrences} occurrence(s): {names}"
+            )
+        return "\n".join(lines)
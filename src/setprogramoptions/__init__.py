@@ -37,11 +37,81 @@
 #===============================================================================
 """
 Init script for the SetProgramOptions package
+
+The classes and submodules of the package are imported on first access
+(see :pep:`562`) so that ``import setprogramoptions`` does not import
+``configparserenhanced`` and its dependencies. Tools that only need the
+command line interface or the render client do not pay for them.
 """
+import importlib
+import sys
+import types
+
 from .version import __version__
 
-from .SetProgramOptions import SetProgramOptions
-from .SetProgramOptionsCMake import SetProgramOptionsCMake
 
-# Helpers and Free Functions
-from .common import get_function_ref
+
+# Public names and the submodule that defines them.
+_LAZY_ATTRIBUTES = {
+    "SetProgramOptions": "SetProgramOptions",
+    "SetProgramOptionsCMake": "SetProgramOptionsCMake",
+    "CMakeSymbolTable": "SetProgramOptionsCMake",
+    "ParserStats": "ParserStats",
+    "Generator": "Generator",
+    "LazyOptions": "LazyOptions",
+    "OptionFilter": "OptionFilter",
+    "RenderPlan": "RenderPlan",
+    "SectionDiff": "SectionDiff",
+    "SectionIndex": "SectionIndex",
+    "WarningCollector": "WarningCollector",
+    "AsyncSetProgramOptions": "AsyncSetProgramOptions",
+    "OptionBundle": "bundle",
+    "SharedOptionStore": "sharedstore",
+
+    # Helpers and Free Functions
+    "get_function_ref": "common",
+    "compile_bundle": "bundle",
+    "get_generator": "Generator",
+    "register_generator": "Generator",
+}
+
+# Submodules that can be accessed as attributes of the package without importing them first.
+_LAZY_SUBMODULES = ("bench", "bundle", "cli", "common", "server", "sharedstore")
+
+__all__ = ["__version__"] + list(_LAZY_ATTRIBUTES)
+
+
+
+class _LazyPackage(types.ModuleType):
+    """
+    The module type of the package.
+
+    Implements the module ``__getattr__`` and ``__dir__`` of :pep:`562` as methods so
+    that lazy imports also work with Python 3.6.
+
+    Importing a submodule binds it as an attribute of the package. Several classes
+    have the same name as the submodule that defines them, i.e.,
+    ``setprogramoptions.ParserStats``, so the class is bound instead.
+    """
+
+    def __getattr__(self, name):
+        if name in _LAZY_ATTRIBUTES:
+            value = getattr(importlib.import_module("." + _LAZY_ATTRIBUTES[name], __name__), name)
+        elif name in _LAZY_SUBMODULES:
+            value = importlib.import_module("." + name, __name__)
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        setattr(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        if isinstance(value, types.ModuleType) and _LAZY_ATTRIBUTES.get(name) == name:
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_LAZY_ATTRIBUTES) | set(_LAZY_SUBMODULES))
+
+
+
+sys.modules[__name__].__class__ = _LazyPackage
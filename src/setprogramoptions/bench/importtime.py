@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+Import time
+===========
+
+Measures the time it takes to import a module with ``python3 -X importtime`` and
+checks it against a budget. Each measurement runs in a fresh interpreter so
+nothing is cached in ``sys.modules``.
+
+.. code-block:: bash
+
+    # Print the slowest imports of ``setprogramoptions``
+    python3 -m setprogramoptions.bench.importtime
+
+    # Exit with a nonzero status if ``import setprogramoptions.cli`` takes more than 50 ms
+    python3 -m setprogramoptions.bench.importtime -m setprogramoptions.cli --budget-ms 50
+
+    # Exit with a nonzero status if ``import setprogramoptions.SetProgramOptions``
+    # imports more than 4 modules of ``setprogramoptions`` (including itself)
+    python3 -m setprogramoptions.bench.importtime -m setprogramoptions.SetProgramOptions \\
+        --max-package-modules 4
+
+The reported time is the smallest cumulative import time of the module over
+``--repeat`` runs, which is the least noisy statistic. Times are noisy on shared
+machines, so ``--max-package-modules`` also budgets the number of modules of the
+package that are imported, which catches a module that starts to import an
+optional feature eagerly.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+
+def package_env() -> dict:
+    """An environment for subprocesses that import this copy of ``setprogramoptions``.
+
+    Returns:
+        dict: A copy of ``os.environ`` with the directory that contains this copy
+        of ``setprogramoptions`` prepended to ``PYTHONPATH``.
+    """
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    return env
+
+
+
+def parse_importtime(text) -> dict:
+    """Parse the output of ``python3 -X importtime``.
+
+    Args:
+        text (str): The ``stderr`` of the interpreter.
+
+    Returns:
+        dict: The cumulative import time in microseconds of each module, keyed by
+        the module name. The module names are stripped of their indentation.
+    """
+    output = {}
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            cumulative = int(fields[1])
+        except ValueError:
+            # The header line: ``self [us] | cumulative | imported package``
+            continue
+        output[fields[2].strip()] = cumulative
+    return output
+
+
+
+def measure_import_time(module="setprogramoptions", repeat=5, executable=None) -> dict:
+    """Measure the import time of a module in fresh interpreters.
+
+    The interpreters use :py:func:`package_env` so the measured package is the one
+    that is running.
+
+    Args:
+        module (str): The module to import.
+        repeat (int): The number of interpreters to run.
+        executable (str): The Python interpreter (default: ``sys.executable``).
+
+    Returns:
+        dict: ``module``, ``repeat``, ``min_us``, ``samples_us`` (the cumulative import
+        time of ``module`` in each run) and ``modules`` (the cumulative import times
+        of every module imported by the fastest run).
+
+    Raises:
+        RuntimeError: If the import fails.
+    """
+    if executable is None:
+        executable = sys.executable
+
+    env = package_env()
+    samples = []
+    fastest = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [executable, "-X", "importtime", "-c", f"import {module}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            env=env
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"`import {module}` failed:\n{proc.stderr}")
+        modules = parse_importtime(proc.stderr)
+        if module not in modules:
+            raise RuntimeError(f"`{module}` was not found in the -X importtime output.")
+        samples.append(modules[module])
+        if fastest is None or modules[module] < fastest[module]:
+            fastest = modules
+
+    return {
+        "module": module,
+        "repeat": repeat,
+        "min_us": min(samples),
+        "samples_us": samples,
+        "modules": fastest,
+    }
+
+
+
+def package_modules(result, package="setprogramoptions") -> list:
+    """The modules of a package that were imported in a :py:func:`measure_import_time` run.
+
+    Args:
+        result (dict): The result of :py:func:`measure_import_time`.
+        package (str): The package.
+
+    Returns:
+        list: The sorted names of ``package`` and its submodules in ``result["modules"]``.
+    """
+    return sorted(name for name in result["modules"] if name == package or name.startswith(package + "."))
+
+
+
+def check_budget(result, budget_ms=None, max_package_modules=None, package="setprogramoptions") -> bool:
+    """Check an import measured by :py:func:`measure_import_time` against a budget.
+
+    Args:
+        result (dict): The result of :py:func:`measure_import_time`.
+        budget_ms (float): The import time budget in milliseconds, or ``None``.
+        max_package_modules (int): The maximum number of modules of ``package``
+            (see :py:func:`package_modules`) that may be imported, or ``None``.
+        package (str): The package whose modules are counted.
+
+    Returns:
+        bool: ``True`` if the import is within the budget.
+    """
+    if budget_ms is not None and result["min_us"] > budget_ms * 1000.0:
+        return False
+    if max_package_modules is not None and len(package_modules(result, package)) > max_package_modules:
+        return False
+    return True
+
+
+
+def main(argv=None) -> int:
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m setprogramoptions.bench.importtime",
+        description="Measure the import time of a module and check it against a budget."
+    )
+    argument_parser.add_argument(
+        "-m",
+        "--module",
+        default="setprogramoptions",
+        help="The module to import (default: setprogramoptions)."
+    )
+    argument_parser.add_argument("--repeat", type=int, default=5, help="Interpreters to run.")
+    argument_parser.add_argument("--budget-ms", type=float, default=None, help="Import time budget in ms.")
+    argument_parser.add_argument(
+        "--max-package-modules",
+        type=int,
+        default=None,
+        help="The maximum number of setprogramoptions modules the import may import."
+    )
+    argument_parser.add_argument(
+        "--top", type=int, default=15, help="The number of slowest imports to print."
+    )
+    args = argument_parser.parse_args(argv)
+
+    result = measure_import_time(args.module, repeat=args.repeat)
+
+    print(f"import {result['module']}: {result['min_us'] / 1000.0:.3f} ms (min of {result['repeat']})")
+    slowest = sorted(result["modules"].items(), key=lambda item: item[1], reverse=True)[: args.top]
+    for name, cumulative in slowest:
+        print(f"  {cumulative / 1000.0:10.3f} ms  {name}")
+
+    if args.budget_ms is not None:
+        if not check_budget(result, budget_ms=args.budget_ms):
+            print(f"FAILED: over the budget of {args.budget_ms:.3f} ms", file=sys.stderr)
+            return 1
+        print(f"OK: within the budget of {args.budget_ms:.3f} ms")
+
+    if args.max_package_modules is not None:
+        modules = package_modules(result)
+        if not check_budget(result, max_package_modules=args.max_package_modules):
+            print(
+                f"FAILED: {len(modules)} setprogramoptions modules imported, over the budget of "
+                f"{args.max_package_modules}: {', '.join(modules)}",
+                file=sys.stderr
+            )
+            return 1
+        print(
+            f"OK: {len(modules)} setprogramoptions modules imported, within the budget of "
+            f"{args.max_package_modules}"
+        )
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,751 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+Benchmark suite
+===============
+
+Times the hot paths of ``SetProgramOptions`` and ``SetProgramOptionsCMake`` on
+synthetic workloads from :py:mod:`setprogramoptions.bench.synth`. Only the
+standard library is required.
+
+Results are written as JSON together with metadata that describes the
+environment they were measured in. Two result files can be compared to flag
+regressions:
+
+.. code-block:: bash
+
+    python3 -m setprogramoptions.bench.suite run -o baseline.json
+    # ... make changes ...
+    python3 -m setprogramoptions.bench.suite run -o current.json
+    python3 -m setprogramoptions.bench.suite compare baseline.json current.json
+
+``compare`` exits with a nonzero status if any benchmark is slower than the
+baseline by more than ``--threshold`` (default: 10%).
+
+New benchmarks are added with the :py:func:`benchmark` decorator. A benchmark
+function receives a :py:class:`BenchmarkContext` and returns the zero-argument
+callable that is timed; any setup done before returning is not timed.
+"""
+from __future__ import print_function
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import synth
+
+
+SCHEMA_VERSION = 1
+
+# Arguments to `synth.generate_ini()` for each workload scale.
+SCALES = {
+    "tiny": {
+        "sections": 12, "roots": 2, "options_per_section": 8
+    },
+    "small": {
+        "sections": 60, "roots": 4, "options_per_section": 20
+    },
+    "medium": {
+        "sections": 400, "roots": 8, "options_per_section": 40
+    },
+    "large": {
+        "sections": 2000, "roots": 10, "options_per_section": 50
+    },
+}
+
+_BENCHMARKS = {}
+
+
+
+def benchmark(name):
+    """Decorator that registers a benchmark function under ``name``."""
+
+    def register(func):
+        _BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+
+def benchmark_names() -> list:
+    """The names of all registered benchmarks, sorted."""
+    return sorted(_BENCHMARKS.keys())
+
+
+
+class BenchmarkContext(object):
+    """
+    Workloads shared by the benchmarks in a run.
+
+    The synthetic ``.ini`` files are generated lazily into a temporary
+    directory the first time a benchmark requests them.
+
+    Args:
+        scale (str,dict): A key in :py:data:`SCALES` or a ``dict`` of arguments
+            for :py:func:`setprogramoptions.bench.synth.generate_ini`.
+        workdir (str): Directory that the workload files are written to.
+    """
+
+    def __init__(self, scale, workdir):
+        if isinstance(scale, str):
+            if scale not in SCALES:
+                raise ValueError(f"Unknown scale `{scale}`, expected one of {sorted(SCALES)}.")
+            scale = SCALES[scale]
+        self.scale = dict(scale)
+        self.workdir = workdir
+        self._files = {}
+        self._cleanups = []
+
+    def add_cleanup(self, func):
+        """Register a callable that is called by :py:meth:`close`."""
+        self._cleanups.append(func)
+        return
+
+    def close(self):
+        """Call the registered cleanup callables in reverse order."""
+        while self._cleanups:
+            self._cleanups.pop()()
+        return
+
+    def ini_file(self, name="default", **kwargs) -> str:
+        """Generate (once) and return the path to a synthetic ``.ini`` file.
+
+        Args:
+            name (str): The name of the workload.
+            kwargs: Arguments that override the scale for this workload.
+
+        Returns:
+            str: The path to the ``.ini`` file.
+        """
+        if name not in self._files:
+            synth_args = dict(self.scale)
+            synth_args.update(kwargs)
+            filename = os.path.join(self.workdir, f"{name}.ini")
+            with open(filename, "w") as ofp:
+                ofp.write(synth.generate_ini(**synth_args))
+            self._files[name] = (filename, synth_args)
+        return self._files[name][0]
+
+    def write_ini(self, name, text) -> str:
+        """Write a hand-made workload and return the path to it.
+
+        Args:
+            name (str): The name of the workload.
+            text (str): The contents of the ``.ini`` file.
+
+        Returns:
+            str: The path to the ``.ini`` file.
+        """
+        filename = os.path.join(self.workdir, f"{name}.ini")
+        with open(filename, "w") as ofp:
+            ofp.write(text)
+        self._files[name] = (filename, {"roots": 0})
+        return filename
+
+    def root_sections(self, name="default") -> list:
+        """The root section names of a workload created by :py:meth:`ini_file`."""
+        return synth.root_section_names(self._files[name][1].get("roots", 10))
+
+    def new_parser(self, cls, name="default", **kwargs):
+        """Create a quiet parser for a workload.
+
+        Args:
+            cls (type): The parser class.
+            name (str): The name of the workload.
+            kwargs: Arguments that override the scale for this workload.
+
+        Returns:
+            A ``cls`` object reading the workload ``.ini`` file.
+        """
+        parser = cls(self.ini_file(name, **kwargs))
+        parser.exception_control_silent_warnings = True
+        return parser
+
+
+
+# ===============================
+#   B E N C H M A R K S
+# ===============================
+
+
+
+@benchmark("parse_section.deep_use")
+def _bench_parse_section_deep_use(ctx):
+    from setprogramoptions import SetProgramOptionsCMake
+    depth = 16
+    parser = ctx.new_parser(
+        SetProgramOptionsCMake, "deep_use", sections=depth * 2, roots=1, use_depth=depth, use_fanout=1
+    )
+    parser.configparserdata
+    section = ctx.root_sections("deep_use")[0]
+    return lambda: parser.parse_section(section)
+
+
+
+@benchmark("parse_section.wide_use")
+def _bench_parse_section_wide_use(ctx):
+    from setprogramoptions import SetProgramOptionsCMake
+    parser = ctx.new_parser(SetProgramOptionsCMake)
+    parser.configparserdata
+    sections = ctx.root_sections()
+
+    def run():
+        for section in sections:
+            parser.parse_section(section)
+
+    return run
+
+
+@benchmark("parse_section.wide_use.fast")
+def _bench_parse_section_wide_use_fast(ctx):
+    from setprogramoptions import SetProgramOptionsCMake
+    parser = ctx.new_parser(SetProgramOptionsCMake)
+    parser.fast_parse = True
+    parser.configparserdata
+    sections = ctx.root_sections()
+
+    def run():
+        for section in sections:
+            parser.parse_section(section)
+
+    return run
+
+
+
+@benchmark("remove.many")
+def _bench_remove_many(ctx):
+    from configparserenhanced.HandlerParameters import HandlerParameters
+    from setprogramoptions import SetProgramOptions
+    parser = SetProgramOptions()
+    key = parser._data_shared_key
+    n_entries = 50 * ctx.scale.get("options_per_section", 20)
+    entries = [
+        {
+            'type': ['opt_set'], 'value': "V", 'params': [f"SYN_S{i // 100:04d}_O{i % 100:04d}"]
+        } for i in range(n_entries)
+    ]
+    removals = []
+    for i in range(0, n_entries, 37):
+        removals.append([f"SYN_S{i // 100:04d}_O{i % 100:04d}"])
+        removals.append([f"SYN_S{i // 100:04d}_O{i % 100:04d}"[:-1], "SUBSTR"])
+    handler_parameters = HandlerParameters()
+
+    def run():
+        handler_parameters.data_shared[key] = entries
+        for params in removals:
+            handler_parameters.params = params
+            parser._option_handler_helper_remove("BENCH", handler_parameters)
+
+    return run
+
+
+
+@benchmark("expand.process.bash")
+def _bench_expand_process_bash(ctx):
+    from setprogramoptions.SetProgramOptions import ExpandVarsInText
+    formatter = ExpandVarsInText()
+    formatter.generator = "bash"
+    texts = [f"-I/some/path/{i} ${{SYN_ENV_{i % 16:02d}|ENV}}/include ${{HOME|ENV}}" for i in range(2000)]
+
+    def run():
+        for text in texts:
+            formatter.process(text)
+
+    return run
+
+
+
+@benchmark("expand.process.cmake_fragment")
+def _bench_expand_process_cmake_fragment(ctx):
+    from setprogramoptions import SetProgramOptionsCMake
+    parser = SetProgramOptionsCMake()
+    formatter = parser._var_formatter
+    formatter.generator = "cmake_fragment"
+    formatter.owner = parser
+    texts = [f"${{SYNBASE_V{i % 32:04d}|CMAKE}} ${{SYN_ENV_{i % 16:02d}|ENV}} -O{i % 4}" for i in range(2000)]
+
+    def run():
+        for text in texts:
+            formatter.process(text)
+
+    return run
+
+
+
+def _gen_option_list_benchmark(cls_name, generator, **synth_args):
+
+    def bench(ctx):
+        import setprogramoptions
+        cls = getattr(setprogramoptions, cls_name)
+        workload = "default" if not synth_args else "no_cmake_fields"
+        parser = ctx.new_parser(cls, workload, **synth_args)
+        sections = ctx.root_sections(workload)
+        for section in sections:
+            parser.parse_section(section)
+
+        def run():
+            for section in sections:
+                parser.gen_option_list(section, generator=generator)
+
+        return run
+
+    return bench
+
+
+
+# `SetProgramOptions` does not know about `${VAR|CMAKE}` fields.
+for _generator in ("bash", "cmake_fragment"):
+    benchmark(f"gen_option_list.SetProgramOptions.{_generator}")(
+        _gen_option_list_benchmark("SetProgramOptions", _generator, cmake_density=0.0)
+    )
+    benchmark(f"gen_option_list.SetProgramOptionsCMake.{_generator}")(
+        _gen_option_list_benchmark("SetProgramOptionsCMake", _generator)
+    )
+del _generator
+
+
+
+def _render_plan_benchmark(generator):
+
+    def bench(ctx):
+        from setprogramoptions import SetProgramOptionsCMake
+        parser = ctx.new_parser(SetProgramOptionsCMake)
+        plans = [parser.compile_section(section, generator) for section in ctx.root_sections()]
+
+        def run():
+            for plan in plans:
+                plan.execute()
+
+        return run
+
+    return bench
+
+
+
+# Same workload as `gen_option_list.SetProgramOptionsCMake.*` using compiled sections.
+for _generator in ("bash", "cmake_fragment"):
+    benchmark(f"render_plan.SetProgramOptionsCMake.{_generator}")(_render_plan_benchmark(_generator))
+del _generator
+
+
+
+def _shared_prefix_benchmark(shared):
+
+    def bench(ctx):
+        from setprogramoptions import SetProgramOptionsCMake
+        n_shared = 5 * ctx.scale.get("options_per_section", 20)
+        n_roots = 5 * ctx.scale.get("roots", 10)
+        lines = ["[SHARED_PREFIX_COMMON]", "opt-set cmake"]
+        for index in range(n_shared):
+            if index % 3 == 2:
+                lines.append(
+                    f'opt-set-cmake-var SYN_P_{index:05d} STRING : "${{SYN_P_{index - 1:05d}|CMAKE}} -x"'
+                )
+            else:
+                lines.append(f"opt-set-cmake-var SYN_P_{index:05d} BOOL : ON")
+        sections = []
+        for index in range(n_roots):
+            sections.append(f"SHARED_PREFIX_ROOT_{index:04d}")
+            lines.append(f"[{sections[-1]}]")
+            lines.append("use SHARED_PREFIX_COMMON")
+            lines.append(f'opt-set-cmake-var SYN_R_{index:04d} STRING FORCE : "${{SYN_P_00000|CMAKE}}"')
+        filename = ctx.write_ini("shared_prefix", "\n".join(lines) + "\n")
+
+        parser = SetProgramOptionsCMake(filename)
+        parser.exception_control_silent_warnings = True
+        for section in sections:
+            parser.parse_section(section)
+
+        if shared:
+            return lambda: parser.gen_option_lists(sections, generator="bash")
+        return lambda: [parser.gen_option_list(section, generator="bash") for section in sections]
+
+    return bench
+
+
+
+# A/B comparison of rendering sections that start with the same entries one at a
+# time and with `gen_option_lists`, which renders the common entries once.
+benchmark("gen_option_lists.shared_prefix.independent")(_shared_prefix_benchmark(shared=False))
+benchmark("gen_option_lists.shared_prefix.shared")(_shared_prefix_benchmark(shared=True))
+
+
+
+def _skipped_non_cache_benchmark(eager):
+
+    def bench(ctx):
+        from setprogramoptions import SetProgramOptionsCMake
+        from setprogramoptions.SetProgramOptionsCMake import VarType
+
+        class EagerDiagnostics(SetProgramOptionsCMake):
+            """Builds the skip warnings unconditionally, as releases before 0.5.1 did."""
+
+            def _helper_opt_set_cmake_var_bash_skip(self, varname, value, param_opts):
+                if param_opts['VARIANT'] == VarType.NON_CACHE:
+                    msg = f"bash generator - `{varname}={value}` skipped because"
+                    msg += f" it is a non-cached (type-1) operation."
+                    msg += f" To generate a bash arg for this consider adding FORCE or a TYPE"
+                    msg += f" and remove PARENT_SCOPE if it exists."
+                    self.exception_control_event("WARNING", ValueError, message=msg)
+                    return True
+                return super()._helper_opt_set_cmake_var_bash_skip(varname, value, param_opts)
+
+        n_vars = 25 * ctx.scale.get("options_per_section", 20)
+        lines = ["[SKIPPED_NON_CACHE]", "opt-set cmake"]
+        for index in range(n_vars):
+            lines.append(f"opt-set-cmake-var SYN_NC_{index:05d} PARENT_SCOPE : value_{index}")
+            if index % 10 == 0:
+                lines.append(f"opt-set-cmake-var SYN_C_{index:05d} BOOL : ON")
+        filename = ctx.write_ini("skipped_non_cache", "\n".join(lines) + "\n")
+
+        parser = (EagerDiagnostics if eager else SetProgramOptionsCMake)(filename)
+        parser.exception_control_silent_warnings = True
+        parser.parse_section("SKIPPED_NON_CACHE")
+        return lambda: parser.gen_option_list("SKIPPED_NON_CACHE", generator="bash")
+
+    return bench
+
+
+
+# A/B comparison of eager and lazy diagnostics on a section whose
+# (silenced) warnings are generated for most entries.
+benchmark("diagnostics.skipped_non_cache.eager")(_skipped_non_cache_benchmark(eager=True))
+benchmark("diagnostics.skipped_non_cache.lazy")(_skipped_non_cache_benchmark(eager=False))
+
+
+
+def _options_lookup_benchmark(eager):
+
+    def bench(ctx):
+        from setprogramoptions import SetProgramOptionsCMake
+        filename = ctx.ini_file()
+        section = ctx.root_sections()[0]
+
+        def run():
+            parser = SetProgramOptionsCMake(filename)
+            parser.exception_control_silent_warnings = True
+            if eager:
+                for name in parser.configparserdata.sections():
+                    parser.parse_section(name)
+            return parser.options[section]
+
+        return run
+
+    return bench
+
+
+
+# A/B comparison of parsing all the sections up front and looking up one
+# section in the lazy `options` mapping.
+benchmark("options.lookup_one.eager")(_options_lookup_benchmark(eager=True))
+benchmark("options.lookup_one.lazy")(_options_lookup_benchmark(eager=False))
+
+
+
+@benchmark("server.gen_option_list")
+def _bench_server_gen_option_list(ctx):
+    from setprogramoptions.server import RenderClient
+    from setprogramoptions.server import RenderServer
+    filename = ctx.ini_file()
+    section = ctx.root_sections()[0]
+    server = RenderServer(os.path.join(ctx.workdir, "render.sock")).start()
+    client = RenderClient(server.socket_path, fallback=False)
+    ctx.add_cleanup(server.close)
+    ctx.add_cleanup(client.close)
+    client.gen_option_list(filename, section, "bash")
+    return lambda: client.gen_option_list(filename, section, "bash")
+
+
+
+def _import_benchmark(module):
+    """Create a benchmark that starts an interpreter and imports ``module``."""
+
+    def bench(ctx):
+        from .importtime import package_env
+        command = [sys.executable, "-c", f"import {module}"]
+        env = package_env()
+        return lambda: subprocess.run(command, env=env, check=True)
+
+    return bench
+
+
+
+# Interpreter startup plus import, which every command line wrapper pays.
+# See ``python3 -m setprogramoptions.bench.importtime`` for a breakdown.
+benchmark("import.setprogramoptions")(_import_benchmark("setprogramoptions"))
+benchmark("import.setprogramoptions.cli")(_import_benchmark("setprogramoptions.cli"))
+benchmark("import.SetProgramOptionsCMake")(_import_benchmark("setprogramoptions.SetProgramOptionsCMake"))
+
+
+
+# ===============================
+#   T I M I N G
+# ===============================
+
+
+
+def time_callable(func, repeat=5, number=1) -> dict:
+    """Time a callable with ``time.perf_counter``.
+
+    Args:
+        func (callable): The zero-argument callable to time.
+        repeat (int): The number of samples to take.
+        number (int): The number of calls per sample.
+
+    Returns:
+        dict: Statistics of the per-call time in seconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples": samples,
+    }
+
+
+
+def environment_metadata() -> dict:
+    """Describe the environment benchmarks are run in."""
+    from setprogramoptions import __version__
+    try:
+        from configparserenhanced import __version__ as cpe_version
+    except ImportError:      # pragma: no cover
+        cpe_version = None
+
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python_version": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "setprogramoptions_version": __version__,
+        "configparserenhanced_version": cpe_version,
+    }
+
+
+
+def run_benchmarks(names=None, scale="small", repeat=5, number=1, verbose=False) -> dict:
+    """Run benchmarks and collect their results.
+
+    Args:
+        names (list): The benchmarks to run (default: all of them).
+        scale (str,dict): The workload scale, see :py:class:`BenchmarkContext`.
+        repeat (int): The number of samples to take of each benchmark.
+        number (int): The number of calls per sample.
+        verbose (bool): Print each result as it completes.
+
+    Returns:
+        dict: The results, which can be serialized with ``json``.
+
+    Raises:
+        KeyError: If an unknown benchmark is requested.
+    """
+    if names is None:
+        names = benchmark_names()
+    for name in names:
+        if name not in _BENCHMARKS:
+            raise KeyError(f"Unknown benchmark `{name}`.")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="spo-bench-") as workdir:
+        ctx = BenchmarkContext(scale, workdir)
+        try:
+            for name in names:
+                func = _BENCHMARKS[name](ctx)
+                results[name] = time_callable(func, repeat=repeat, number=number)
+                if verbose:
+                    print(f"{name:<55} {results[name]['min']*1e3:12.3f} ms")
+        finally:
+            ctx.close()
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "metadata": environment_metadata(),
+        "config": {
+            "scale": ctx.scale, "repeat": repeat, "number": number
+        },
+        "results": results,
+    }
+
+
+
+def compare_results(baseline: dict, current: dict, threshold=0.10) -> list:
+    """Compare two sets of benchmark results.
+
+    Benchmarks are compared using the minimum time, which is the least noisy
+    statistic. A benchmark is a ``regression`` if the current time is larger than
+    the baseline time by more than ``threshold`` (a fraction), and an ``improvement``
+    if it is smaller by more than ``threshold``.
+
+    Args:
+        baseline (dict): Results from :py:func:`run_benchmarks`.
+        current (dict): Results from :py:func:`run_benchmarks`.
+        threshold (float): The relative change that is considered significant.
+
+    Returns:
+        list: A list of ``dict`` rows with the keys ``name``, ``baseline``,
+        ``current``, ``ratio`` and ``status``.
+    """
+    base_results = baseline.get("results", {})
+    curr_results = current.get("results", {})
+
+    rows = []
+    for name in sorted(set(base_results) | set(curr_results)):
+        base = base_results[name]["min"] if name in base_results else None
+        curr = curr_results[name]["min"] if name in curr_results else None
+        ratio = None
+        if base is None:
+            status = "new"
+        elif curr is None:
+            status = "missing"
+        else:
+            ratio = curr / base if base > 0 else float("inf")
+            if ratio > 1.0 + threshold:
+                status = "regression"
+            elif ratio < 1.0 - threshold:
+                status = "improvement"
+            else:
+                status = "ok"
+        rows.append({"name": name, "baseline": base, "current": curr, "ratio": ratio, "status": status})
+    return rows
+
+
+
+def _format_comparison(rows) -> str:
+    lines = [f"{'benchmark':<55} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}  status"]
+    for row in rows:
+        base = f"{row['baseline']*1e3:12.3f}" if row['baseline'] is not None else f"{'-':>12}"
+        curr = f"{row['current']*1e3:12.3f}" if row['current'] is not None else f"{'-':>12}"
+        ratio = f"{row['ratio']:7.3f}" if row['ratio'] is not None else f"{'-':>7}"
+        lines.append(f"{row['name']:<55} {base} {curr} {ratio}  {row['status']}")
+    return "\n".join(lines)
+
+
+
+def main(argv=None) -> int:
+    """Command line interface for the benchmark suite.
+
+    Args:
+        argv (list): The command line arguments, ``sys.argv[1:]`` is used if ``None``.
+
+    Returns:
+        int: 0 on success, 1 if ``compare`` found a regression.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python3 -m setprogramoptions.bench.suite", description="SetProgramOptions benchmark suite."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    parser_run = subparsers.add_parser("run", help="Run benchmarks.")
+    parser_run.add_argument("-b", "--benchmark", action="append", default=None, help="Benchmark to run.")
+    parser_run.add_argument("--scale", default="small", choices=sorted(SCALES), help="Workload scale.")
+    parser_run.add_argument("--repeat", type=int, default=5, help="Samples per benchmark.")
+    parser_run.add_argument("--number", type=int, default=1, help="Calls per sample.")
+    parser_run.add_argument("-o", "--output", default=None, help="JSON output file (default: stdout).")
+
+    subparsers.add_parser("list", help="List the benchmarks.")
+
+    parser_compare = subparsers.add_parser("compare", help="Compare results with a baseline.")
+    parser_compare.add_argument("baseline", help="JSON results of the baseline.")
+    parser_compare.add_argument("current", help="JSON results to check.")
+    parser_compare.add_argument(
+        "--threshold", type=float, default=0.10, help="Relative slowdown that is a regression."
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        print("\n".join(benchmark_names()))
+        return 0
+
+    if args.command == "run":
+        results = run_benchmarks(
+            names=args.benchmark,
+            scale=args.scale,
+            repeat=args.repeat,
+            number=args.number,
+            verbose=args.output is not None
+        )
+        text = json.dumps(results, indent=2, sort_keys=True)
+        if args.output is None:
+            print(text)
+        else:
+            with open(args.output, "w") as ofp:
+                ofp.write(text + "\n")
+        return 0
+
+    if args.command == "compare":
+        with open(args.baseline, "r") as ifp:
+            baseline = json.load(ifp)
+        with open(args.current, "r") as ifp:
+            current = json.load(ifp)
+        rows = compare_results(baseline, current, threshold=args.threshold)
+        print(_format_comparison(rows))
+        regressions = [row for row in rows if row["status"] == "regression"]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) found.")
+            return 1
+        return 0
+
+    parser.print_help()
+    return 2
+
+
+
+if __name__ == "__main__":   # pragma: no cover
+    sys.exit(main())
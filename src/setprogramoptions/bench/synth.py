@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+Synthetic ``.ini`` workload generator
+=====================================
+
+Generates large, reproducible ``.ini`` files that exercise the same features as
+production configurations: deep ``use`` hierarchies, ``opt-set`` and
+``opt-set-cmake-var`` entries, ``opt-remove`` (exact and ``SUBSTR``) operations
+and ``${VAR|ENV}`` / ``${VAR|CMAKE}`` field expansions.
+
+The generated file contains three kinds of sections:
+
+- ``SYN_BASE`` defines the CMake cache variables ``SYNBASE_V####`` that
+  ``${SYNBASE_V####|CMAKE}`` fields refer to. It is at the bottom of every
+  ``use`` hierarchy so these fields always resolve.
+- ``SYN_S####`` *library* sections are arranged in ``use_depth`` levels. Each
+  section uses ``use_fanout`` sections from the next level down.
+- ``SYN_ROOT_####`` *root* sections are the sections an application would
+  generate option lists for.
+
+Options set by library section ``SYN_S####`` are named ``SYN_S####_O####`` so that
+``opt-remove`` operations in the sections that use it can target them.
+
+Usage:
+
+.. code-block:: bash
+
+    python3 -m setprogramoptions.bench.synth --sections 2000 --options-per-section 50 -o big.ini
+"""
+from __future__ import print_function
+
+import argparse
+import random
+import string
+import sys
+
+
+BASE_SECTION = "SYN_BASE"
+BASE_VAR_FMT = "SYNBASE_V{:04d}"
+ENV_VAR_FMT = "SYN_ENV_{:02d}"
+LIBRARY_SECTION_FMT = "SYN_S{:04d}"
+ROOT_SECTION_FMT = "SYN_ROOT_{:04d}"
+
+_CMAKE_TYPES = ("BOOL", "STRING", "PATH", "STRING")
+
+
+
+def root_section_names(roots=10) -> list:
+    """Names of the root sections created by :py:func:`generate_ini`.
+
+    Args:
+        roots (int): The number of root sections.
+
+    Returns:
+        list: A list of section names.
+    """
+    return [ROOT_SECTION_FMT.format(index) for index in range(roots)]
+
+
+
+def generate_ini(
+    sections=100,
+    roots=10,
+    use_depth=3,
+    use_fanout=2,
+    options_per_section=20,
+    remove_density=0.05,
+    substr_fraction=0.5,
+    env_density=0.1,
+    cmake_density=0.1,
+    value_length=16,
+    base_vars=32,
+    env_vars=16,
+    seed=0
+) -> str:
+    """Generate the text of a synthetic ``.ini`` file.
+
+    The same arguments always generate the same text.
+
+    Args:
+        sections (int): The number of library sections (``SYN_S####``).
+        roots (int): The number of root sections (``SYN_ROOT_####``).
+        use_depth (int): The number of levels of library sections below the roots.
+        use_fanout (int): The number of ``use`` operations in each section.
+        options_per_section (int): The number of option entries in each section.
+        remove_density (float): The number of ``opt-remove`` operations per option entry.
+        substr_fraction (float): The fraction of ``opt-remove`` operations that use ``SUBSTR``.
+        env_density (float): The probability that a value contains a ``${VAR|ENV}`` field.
+        cmake_density (float): The probability that a value contains a ``${VAR|CMAKE}`` field.
+        value_length (int): The length of the random text in each value.
+        base_vars (int): The number of CMake variables defined in ``SYN_BASE``.
+        env_vars (int): The number of distinct environment variables referenced.
+        seed (int): The seed for the random number generator.
+
+    Returns:
+        str: The contents of the ``.ini`` file.
+
+    Raises:
+        ValueError: If an argument is out of range.
+    """
+    for name, value in (("sections", sections), ("roots", roots), ("use_depth", use_depth),
+                        ("use_fanout", use_fanout), ("options_per_section", options_per_section),
+                        ("value_length", value_length), ("base_vars", base_vars), ("env_vars", env_vars)):
+        if not isinstance(value, int) or value < 0:
+            raise ValueError(f"`{name}` must be a non-negative integer, got `{value}`.")
+    for name, value in (("remove_density", remove_density), ("substr_fraction", substr_fraction),
+                        ("env_density", env_density), ("cmake_density", cmake_density)):
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"`{name}` must be in the range [0, 1], got `{value}`.")
+    if base_vars < 1 or env_vars < 1:
+        raise ValueError("`base_vars` and `env_vars` must be at least 1.")
+
+    rng = random.Random(seed)
+
+    # Distribute the library sections over the levels of the `use` hierarchy.
+    # Level 0 holds the roots and the deepest level uses SYN_BASE.
+    levels = [[] for _ in range(use_depth + 1)]
+    if use_depth > 0:
+        for index in range(sections):
+            levels[1 + index%use_depth].append(index)
+
+    def random_text():
+        return "".join(rng.choice(string.ascii_letters) for _ in range(value_length))
+
+    def random_value(cmake_type):
+        if cmake_type == "BOOL":
+            return rng.choice(("ON", "OFF"))
+        value = random_text()
+        if rng.random() < env_density:
+            value += " ${" + ENV_VAR_FMT.format(rng.randrange(env_vars)) + "|ENV}"
+        if rng.random() < cmake_density:
+            value += " ${" + BASE_VAR_FMT.format(rng.randrange(base_vars)) + "|CMAKE}"
+        if " " in value:
+            value = '"' + value + '"'
+        return value
+
+    def used_sections(level):
+        candidates = levels[level + 1] if level + 1 < len(levels) else []
+        if not candidates:
+            return [None]
+        return rng.sample(candidates, min(use_fanout, len(candidates)))
+
+    lines = []
+    lines.append("#")
+    lines.append("# Synthetic configuration generated by setprogramoptions.bench.synth")
+    lines.append(
+        f"# sections={sections} roots={roots} use_depth={use_depth} use_fanout={use_fanout}"
+        f" options_per_section={options_per_section} remove_density={remove_density}"
+        f" substr_fraction={substr_fraction} env_density={env_density}"
+        f" cmake_density={cmake_density} value_length={value_length} seed={seed}"
+    )
+    lines.append("#")
+    lines.append("")
+
+    lines.append(f"[{BASE_SECTION}]")
+    for index in range(base_vars):
+        lines.append(f"opt-set-cmake-var {BASE_VAR_FMT.format(index)} STRING : {random_text()}")
+    lines.append("")
+
+    def emit_section(name, option_prefix, level, is_root):
+        lines.append(f"[{name}]")
+        if is_root:
+            lines.append("opt-set cmake")
+            lines.append("opt-set -G : Ninja")
+
+        uses = used_sections(level)
+        for used in uses:
+            lines.append("use " + (BASE_SECTION if used is None else LIBRARY_SECTION_FMT.format(used)))
+        removable = [used for used in uses if used is not None]
+
+        removed = set()
+        for option_index in range(options_per_section):
+            option_name = f"{option_prefix}_O{option_index:04d}"
+            if rng.random() < 0.2:
+                lines.append(f"opt-set --{option_name.lower().replace('_', '-')} : {random_value('STRING')}")
+            else:
+                cmake_type = rng.choice(_CMAKE_TYPES)
+                lines.append(f"opt-set-cmake-var {option_name} {cmake_type} : {random_value(cmake_type)}")
+
+            if removable and rng.random() < remove_density:
+                target = LIBRARY_SECTION_FMT.format(rng.choice(removable))
+                target += f"_O{rng.randrange(max(options_per_section, 1)):04d}"
+                if rng.random() < substr_fraction:
+                    key = f"opt-remove {target[:-1]} SUBSTR"
+                else:
+                    key = f"opt-remove {target}"
+                if key not in removed:
+                    removed.add(key)
+                    lines.append(key)
+
+        if is_root:
+            lines.append("opt-set /path/to/source/dir")
+        lines.append("")
+        return
+
+    for level in range(len(levels) - 1, 0, -1):
+        for index in levels[level]:
+            name = LIBRARY_SECTION_FMT.format(index)
+            emit_section(name, name, level, False)
+
+    for index, name in enumerate(root_section_names(roots)):
+        emit_section(name, f"SYN_R{index:04d}", 0, True)
+
+    return "\n".join(lines)
+
+
+
+def main(argv=None) -> int:
+    """Command line interface for :py:func:`generate_ini`.
+
+    Args:
+        argv (list): The command line arguments, ``sys.argv[1:]`` is used if ``None``.
+
+    Returns:
+        int: 0 on success.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python3 -m setprogramoptions.bench.synth",
+        description="Generate a synthetic .ini workload for SetProgramOptions."
+    )
+    parser.add_argument("--sections", type=int, default=100, help="Number of library sections.")
+    parser.add_argument("--roots", type=int, default=10, help="Number of root sections.")
+    parser.add_argument("--use-depth", type=int, default=3, help="Levels of library sections.")
+    parser.add_argument("--use-fanout", type=int, default=2, help="`use` operations per section.")
+    parser.add_argument("--options-per-section", type=int, default=20, help="Options per section.")
+    parser.add_argument("--remove-density", type=float, default=0.05, help="`opt-remove` per option.")
+    parser.add_argument("--substr-fraction", type=float, default=0.5, help="Fraction of SUBSTR removals.")
+    parser.add_argument("--env-density", type=float, default=0.1, help="Probability of ${VAR|ENV} fields.")
+    parser.add_argument(
+        "--cmake-density", type=float, default=0.1, help="Probability of ${VAR|CMAKE} fields."
+    )
+    parser.add_argument("--value-length", type=int, default=16, help="Length of random value text.")
+    parser.add_argument("--seed", type=int, default=0, help="Random number generator seed.")
+    parser.add_argument("-o", "--output", default=None, help="Output file (default: stdout).")
+    args = parser.parse_args(argv)
+
+    text = generate_ini(
+        sections=args.sections,
+        roots=args.roots,
+        use_depth=args.use_depth,
+        use_fanout=args.use_fanout,
+        options_per_section=args.options_per_section,
+        remove_density=args.remove_density,
+        substr_fraction=args.substr_fraction,
+        env_density=args.env_density,
+        cmake_density=args.cmake_density,
+        value_length=args.value_length,
+        seed=args.seed
+    )
+
+    if args.output is None:
+        sys.stdout.write(text + "\n")
+    else:
+        with open(args.output, "w") as ofp:
+            ofp.write(text + "\n")
+
+    return 0
+
+
+
+if __name__ == "__main__":   # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,767 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+Option bundles
+==============
+
+A bundle is a read-only binary file that contains the resolved ``options`` of the
+sections of a ``.ini`` file. It is created once by :py:func:`compile_bundle` and
+loaded by :py:class:`OptionBundle`, which generates option lists without importing
+``configparserenhanced`` or parsing the ``.ini`` file:
+
+.. code-block:: bash
+
+    # Compile all sections of config.ini
+    python3 -m setprogramoptions.bundle compile config.ini -o config.spob
+
+    # Render from the bundle, the command line interface detects bundles
+    setprogramoptions config.spob -s SECTION_A -g bash
+
+.. code-block:: python
+    :linenos:
+
+    from setprogramoptions.bundle import OptionBundle
+
+    with OptionBundle("config.spob") as bundle:
+        options = bundle.gen_option_list("SECTION_A", "bash")
+
+The bundle is memory-mapped, so opening it costs (almost) nothing regardless of its
+size, only the pages of the sections that are rendered are read, and the pages are
+shared by every process on a host that maps the same file.
+
+The entries are stored pre-processed: the parameters of ``opt-set-cmake-var``
+entries are classified (type, ``FORCE``, ``PARENT_SCOPE`` and cache or non-cache
+variable) and values are split into text and ``${VARNAME|VARTYPE}`` fields.
+:py:meth:`OptionBundle.gen_option_list` supports the ``bash``, ``cmake_fragment``
+and ``cmake_initial_cache`` generators of ``SetProgramOptionsCMake``, and produces
+the same option lists as a parser with the default exception control level:
+
+- Entries that the ``bash`` generator skips (non-cache variables and assignments
+  to cache variables that are already set without ``FORCE``) are skipped
+  silently, i.e., no warnings are printed.
+- An unresolved ``${VARNAME|CMAKE}`` field in a ``bash`` option list raises a
+  ``ValueError`` unless ``strict`` is ``False``, in which case it expands to an
+  empty string.
+- Entries that the parser can not generate, i.e., ``FORCE`` with ``PARENT_SCOPE``,
+  raise the parser's ``ValueError``.
+- Entries whose type has no program option handler for the generator in the
+  parser class (i.e., ``opt-set`` in ``cmake_fragment`` option lists of a
+  ``SetProgramOptions`` bundle) generate nothing, which the metadata records.
+
+Bundles do not support CMake symbol tables seeded by ``seed_cmake_symbols()``.
+
+Format
+------
+All integers are little-endian. The file starts with a header
+(:py:data:`HEADER_STRUCT`) that contains the magic number, the format version,
+the sizes of the tables and their offsets:
+
+- *string index*: ``(offset, length)`` pairs (``uint32``) that locate the UTF-8
+  encoded strings in the *string data*. Strings are stored once and referred
+  to by their index. :py:data:`NO_STRING` stands for ``None``.
+- *sections*: ``(name, first record, record count)`` (``uint32``), sorted by the
+  UTF-8 encoded name so sections are found with a binary search.
+- *records*: one :py:data:`RECORD_STRUCT` per option entry.
+- *words*: a pool of ``uint32`` values. Each record refers to a slice of
+  parameter string ids and a slice of value tokens, which are ``(text, vartype)``
+  string id pairs. ``vartype`` is :py:data:`NO_STRING` for plain text and
+  ``text`` is the variable name for variable fields.
+
+The header also refers to a JSON metadata string with the package version, the
+parser class and the SHA-256 digests of the source ``.ini`` files.
+"""
+from __future__ import print_function
+
+import mmap
+import os
+import struct
+import sys
+
+
+BUNDLE_MAGIC = b"SPOBNDL\x00"
+BUNDLE_VERSION = 1
+
+#: magic, version, flags, string count, section count, record count, word count,
+#: metadata string, offsets of the string index, string data, sections, records and words.
+HEADER_STRUCT = struct.Struct("<8sIIIIIIIQQQQQ")
+
+#: string index entry: offset and length in the string data.
+STRING_STRUCT = struct.Struct("<II")
+
+#: section: name string, first record, record count.
+SECTION_STRUCT = struct.Struct("<III")
+
+#: record: kind, CMake type, flags, (padding), varname or error message string,
+#: first parameter word, parameter count, first value token word, value token count.
+#: The CMake type of a ``RECORD_ERROR`` is the kind of the entry that can not be generated.
+RECORD_STRUCT = struct.Struct("<BBBBIIIII")
+
+NO_STRING = 0xFFFFFFFF
+
+# Record kinds
+RECORD_UNKNOWN = 0           # An entry type without a program option handler (rendered as nothing).
+RECORD_OPT_SET = 1           # ``opt-set``
+RECORD_CMAKE_VAR = 2         # ``opt-set-cmake-var``
+RECORD_ERROR = 3             # An entry that raises a ``ValueError`` when it is generated.
+
+#: The entry types of the record kinds whose program option handlers are looked up
+#: for each generator when a bundle is compiled.
+RECORD_TYPES = (("opt_set", RECORD_OPT_SET), ("opt_set_cmake_var", RECORD_CMAKE_VAR))
+
+# Record flags
+FLAG_HAS_VALUE = 0x01
+FLAG_FORCE = 0x02
+FLAG_PARENT_SCOPE = 0x04
+FLAG_CACHE = 0x08
+
+#: CMake cache variable types, stored as the index + 1 (0 is "no type").
+CMAKE_TYPES = ("BOOL", "FILEPATH", "PATH", "STRING", "INTERVAL")
+
+GENERATORS = ("bash", "cmake_fragment", "cmake_initial_cache")
+
+
+
+def is_bundle(filename) -> bool:
+    """``True`` if ``filename`` starts with the bundle magic number."""
+    try:
+        with open(filename, "rb") as ifp:
+            return ifp.read(len(BUNDLE_MAGIC)) == BUNDLE_MAGIC
+    except OSError:
+        return False
+
+
+
+# ===============================
+#   C O M P I L E R
+# ===============================
+
+
+
+class _BundleWriter(object):
+    """Accumulates the tables of a bundle."""
+
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        self.sections = []
+        self.records = []
+        self.words = []
+
+    def string_id(self, text) -> int:
+        if text is None:
+            return NO_STRING
+        sid = self.string_ids.get(text)
+        if sid is None:
+            sid = len(self.strings)
+            self.strings.append(text)
+            self.string_ids[text] = sid
+        return sid
+
+    def add_words(self, words) -> int:
+        first = len(self.words)
+        self.words.extend(words)
+        return first
+
+    def add_record(self, kind, cmake_type=0, flags=0, aux=NO_STRING, params=(), tokens=()):
+        param_first = self.add_words(self.string_id(param) for param in params)
+        token_words = []
+        for text, vartype in tokens:
+            token_words.extend((self.string_id(text), self.string_id(vartype)))
+        token_first = self.add_words(token_words)
+        self.records.append(
+            (kind, cmake_type, flags, 0, aux, param_first, len(params), token_first, len(tokens))
+        )
+        return
+
+    def to_bytes(self, metadata) -> bytes:
+        metadata_sid = self.string_id(metadata)
+
+        encoded = [text.encode("utf-8") for text in self.strings]
+        string_index = bytearray()
+        offset = 0
+        for data in encoded:
+            string_index += STRING_STRUCT.pack(offset, len(data))
+            offset += len(data)
+        string_data = b"".join(encoded)
+
+        sections = sorted(self.sections, key=lambda section: self.strings[section[0]].encode("utf-8"))
+        section_table = b"".join(SECTION_STRUCT.pack(*section) for section in sections)
+        record_table = b"".join(RECORD_STRUCT.pack(*record) for record in self.records)
+        word_table = struct.pack(f"<{len(self.words)}I", *self.words)
+
+        tables = [bytes(string_index), string_data, section_table, record_table, word_table]
+        offsets = []
+        offset = HEADER_STRUCT.size
+        for table in tables:
+            # Align the tables to 8 bytes.
+            offset += -offset % 8
+            offsets.append(offset)
+            offset += len(table)
+
+        output = bytearray(offset)
+        header = HEADER_STRUCT.pack(
+            BUNDLE_MAGIC,
+            BUNDLE_VERSION,
+            0,
+            len(self.strings),
+            len(self.sections),
+            len(self.records),
+            len(self.words),
+            metadata_sid,
+            *offsets
+        )
+        output[: len(header)] = header
+        for table_offset, table in zip(offsets, tables):
+            output[table_offset : table_offset + len(table)] = table
+        return bytes(output)
+
+
+
+def _tokenize_value(parser, value):
+    """Split a value, quoted like ``_format_option_value`` does, into ``(text, vartype)`` tokens."""
+    tokens = []
+    for token in parser._var_formatter._tokenize_text_string(parser._quote_option_value(value)):
+        if isinstance(token, str):
+            if token:
+                tokens.append((token, None))
+        else:
+            tokens.append((token.varname, token.vartype))
+    return tokens
+
+
+
+def _compile_entry(writer, parser, option_entry):
+    """Add the record of one option entry."""
+    types = option_entry["type"]
+    params = option_entry["params"]
+    value = option_entry["value"]
+
+    if "opt_set_cmake_var" in types and hasattr(parser, "_helper_opt_set_cmake_var_parse_parameters"):
+        kind = RECORD_CMAKE_VAR
+    elif "opt_set" in types:
+        kind = RECORD_OPT_SET
+    else:
+        writer.add_record(RECORD_UNKNOWN)
+        return
+
+    flags = 0
+    tokens = ()
+    try:
+        if value is not None:
+            flags |= FLAG_HAS_VALUE
+            tokens = _tokenize_value(parser, value)
+        if kind == RECORD_CMAKE_VAR:
+            param_opts = parser._helper_opt_set_cmake_var_parse_parameters(params[1 : 4], params[0])
+    except ValueError as exc:
+        writer.add_record(RECORD_ERROR, kind, aux=writer.string_id(str(exc)))
+        return
+
+    if kind == RECORD_OPT_SET:
+        writer.add_record(kind, flags=flags, params=params, tokens=tokens)
+        return
+
+    cmake_type = 0
+    if param_opts["TYPE"] is not None:
+        cmake_type = CMAKE_TYPES.index(param_opts["TYPE"]) + 1
+    if param_opts["FORCE"]:
+        flags |= FLAG_FORCE
+    if param_opts["PARENT_SCOPE"]:
+        flags |= FLAG_PARENT_SCOPE
+    if param_opts["VARIANT"].name == "CACHE":
+        flags |= FLAG_CACHE
+    writer.add_record(kind, cmake_type, flags, aux=writer.string_id(params[0]), tokens=tokens)
+    return
+
+
+
+def _file_sha256(filename) -> str:
+    import hashlib
+    with open(filename, "rb") as ifp:
+        return hashlib.sha256(ifp.read()).hexdigest()
+
+
+
+def compile_bundle_bytes(parser, sections=None) -> tuple:
+    """Compile the resolved options of a parser into the bytes of a bundle.
+
+    Args:
+        parser (SetProgramOptions): The parser. Exception control events are silenced
+            while compiling.
+        sections (list): The sections to compile. If ``None`` all sections are compiled,
+            except sections that can not be parsed, which are skipped.
+
+    Returns:
+        tuple: The bundle (``bytes``) and the names of the compiled sections (``list``).
+
+    Raises:
+        Exception: Whatever ``parse_section`` raises for a section in ``sections``.
+    """
+    import json
+    from .version import __version__
+
+    explicit_sections = sections is not None
+    if sections is None:
+        sections = parser.configparserdata.sections()
+
+    writer = _BundleWriter()
+    compiled = []
+    skipped = []
+
+    silent_warnings = parser.exception_control_silent_warnings
+    parser.exception_control_silent_warnings = True
+    try:
+        for section in sections:
+            try:
+                if section not in parser.options.keys():
+                    parser.parse_section(section)
+                entries = parser.options[section]
+            except Exception:
+                if explicit_sections:
+                    raise
+                skipped.append(section)
+                continue
+
+            first_record = len(writer.records)
+            for option_entry in entries:
+                _compile_entry(writer, parser, option_entry)
+            writer.sections.append(
+                (writer.string_id(section), first_record, len(writer.records) - first_record)
+            )
+            compiled.append(section)
+    finally:
+        parser.exception_control_silent_warnings = silent_warnings
+
+    # The generators that each entry type has a program option handler for.
+    handlers = {}
+    for typename, _ in RECORD_TYPES:
+        handlers[typename] = [
+            generator for generator in GENERATORS
+            if parser._locate_program_option_handler([typename], generator)[1] is not None
+        ]
+
+    metadata = {
+        "setprogramoptions_version": __version__,
+        "bundle_version": BUNDLE_VERSION,
+        "parser_class": type(parser).__name__,
+        "inifiles": {
+            str(path): _file_sha256(path)
+            for path in parser.inifilepath
+        },
+        "skipped_sections": skipped,
+        "handlers": handlers,
+    }
+    return writer.to_bytes(json.dumps(metadata, sort_keys=True)), compiled
+
+
+
+def compile_bundle(parser, filename, sections=None) -> list:
+    """Compile the resolved options of a parser into a bundle file.
+
+    The bundle is written atomically (to a temporary file that replaces ``filename``)
+    and is made read-only.
+
+    Args:
+        parser (SetProgramOptions): The parser. Exception control events are silenced
+            while compiling.
+        filename (str,Path): The bundle file to write.
+        sections (list): The sections to compile. If ``None`` all sections are compiled,
+            except sections that can not be parsed, which are skipped.
+
+    Returns:
+        list: The names of the compiled sections.
+
+    Raises:
+        Exception: Whatever ``parse_section`` raises for a section in ``sections``.
+    """
+    data, compiled = compile_bundle_bytes(parser, sections)
+
+    filename = os.fspath(filename)
+    tmp_filename = f"{filename}.tmp{os.getpid()}"
+    try:
+        with open(tmp_filename, "wb") as ofp:
+            ofp.write(data)
+        os.chmod(tmp_filename, 0o444)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.unlink(tmp_filename)
+        raise
+    return compiled
+
+
+
+# ===============================
+#   L O A D E R
+# ===============================
+
+
+
+class OptionBundle(object):
+    """
+    A memory-mapped bundle created by :py:func:`compile_bundle`.
+
+    Args:
+        filename (str,Path): The bundle file.
+
+    Raises:
+        ValueError: If the file is not a bundle or has an unsupported version.
+    """
+
+    def __init__(self, filename):
+        self.filename = os.fspath(filename)
+        with open(self.filename, "rb") as ifp:
+            self._mmap = mmap.mmap(ifp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._init_from_buffer(self._mmap)
+
+    @classmethod
+    def from_buffer(cls, buffer, name="<buffer>"):
+        """Load a bundle from a buffer, i.e., ``bytes`` or a ``memoryview`` of shared memory."""
+        bundle = cls.__new__(cls)
+        bundle.filename = name
+        bundle._mmap = None
+        bundle._init_from_buffer(buffer)
+        return bundle
+
+    def _init_from_buffer(self, buffer):
+        self._buffer = memoryview(buffer)
+        if len(self._buffer) < HEADER_STRUCT.size:
+            raise ValueError(f"`{self.filename}` is not an option bundle.")
+        header = HEADER_STRUCT.unpack_from(self._buffer, 0)
+        if header[0] != BUNDLE_MAGIC:
+            raise ValueError(f"`{self.filename}` is not an option bundle.")
+        if header[1] != BUNDLE_VERSION:
+            raise ValueError(
+                f"`{self.filename}` has bundle version {header[1]}, expected version {BUNDLE_VERSION}."
+            )
+        (
+            self._n_strings,
+            self._n_sections,
+            self._n_records,
+            self._n_words,
+            self._metadata_sid,
+            self._off_string_index,
+            self._off_string_data,
+            self._off_sections,
+            self._off_records,
+            self._off_words,
+        ) = header[3 :]
+        self._strings = {}
+        self._generator_kinds = {}
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def __contains__(self, section):
+        return self._find_section(section) is not None
+
+    def __len__(self):
+        return self._n_sections
+
+    @property
+    def metadata(self) -> dict:
+        """The metadata of the bundle (package version, parser class, source file digests)."""
+        import json
+        return json.loads(self._string(self._metadata_sid))
+
+    def sections(self) -> list:
+        """The names of the sections in the bundle, sorted."""
+        return [
+            self._string(
+                SECTION_STRUCT.unpack_from(self._buffer, self._off_sections + i * SECTION_STRUCT.size)[0]
+            ) for i in range(self._n_sections)
+        ]
+
+    def close(self):
+        """Release the buffer and unmap the file."""
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        return
+
+    def entries(self, section) -> list:
+        """The option entries of a section as they are stored in the bundle.
+
+        Returns:
+            list: ``dict`` objects with the keys ``kind``, ``params``, ``value``, ``tokens``
+            and, for ``opt-set-cmake-var`` entries, ``varname``, ``type``, ``force``,
+            ``parent_scope`` and ``cache``.
+        """
+        output = []
+        for record in self._section_records(section):
+            kind, cmake_type, flags, _, aux, param_first, n_params, token_first, n_tokens = record
+            tokens = self._tokens(token_first, n_tokens)
+            value = None
+            if flags & FLAG_HAS_VALUE:
+                value = "".join(
+                    text if vartype is None else f"${{{text}|{vartype}}}" for text, vartype in tokens
+                )
+            entry = {
+                "kind": kind,
+                "params": [self._string(sid) for sid in self._words(param_first, n_params)],
+                "value": value,
+                "tokens": tokens,
+            }
+            if kind == RECORD_CMAKE_VAR:
+                entry.update(
+                    {
+                        "varname": self._string(aux),
+                        "type": CMAKE_TYPES[cmake_type - 1] if cmake_type else None,
+                        "force": bool(flags & FLAG_FORCE),
+                        "parent_scope": bool(flags & FLAG_PARENT_SCOPE),
+                        "cache": bool(flags & FLAG_CACHE),
+                    }
+                )
+            elif kind == RECORD_ERROR:
+                entry["error"] = self._string(aux)
+            output.append(entry)
+        return output
+
+    def gen_option_list(self, section, generator="bash", strict=True) -> list:
+        """Generate a list of options for a section.
+
+        Args:
+            section (str): The section.
+            generator (str): ``bash``, ``cmake_fragment`` or ``cmake_initial_cache``.
+            strict (bool): Raise a ``ValueError`` for unresolved ``${VARNAME|CMAKE}``
+                fields in ``bash`` option lists.
+
+        Returns:
+            list: The option list.
+
+        Raises:
+            KeyError: If the section is not in the bundle.
+            ValueError: If the generator is not supported or an entry can not be generated.
+        """
+        if generator not in GENERATORS:
+            raise ValueError(f"Unsupported generator `{generator}`, expected one of {GENERATORS}.")
+
+        # The values of the CMake cache variables set so far (bash and cmake_initial_cache).
+        cmake_cache = {}
+        output = []
+        kinds = self._kinds_with_handlers(generator)
+        for record in self._section_records(section):
+            kind, cmake_type, flags, _, aux, param_first, n_params, token_first, n_tokens = record
+            if kind == RECORD_ERROR:
+                # Like the parser, entries without a program option handler are skipped
+                # before they are generated.
+                if cmake_type in kinds or cmake_type == RECORD_UNKNOWN:
+                    raise ValueError(self._string(aux))
+                continue
+            if kind not in kinds:
+                continue
+
+            value = None
+            if flags & FLAG_HAS_VALUE:
+                value = self._expand(self._tokens(token_first, n_tokens), generator, cmake_cache, strict)
+
+            if kind == RECORD_OPT_SET:
+                if generator == "bash":
+                    params = [self._string(sid) for sid in self._words(param_first, n_params)]
+                    output.append(self._bash_option(params, value))
+                continue
+
+            varname = self._string(aux)
+            type_name = CMAKE_TYPES[cmake_type - 1] if cmake_type else None
+            if generator == "cmake_fragment":
+                params = [varname, value]
+                if type_name is not None:
+                    params += ["CACHE", type_name, '"from .ini configuration"']
+                if flags & FLAG_PARENT_SCOPE:
+                    params.append("PARENT_SCOPE")
+                if flags & FLAG_FORCE:
+                    params.append("FORCE")
+                output.append("set({})".format(" ".join(params)))
+                continue
+
+            # bash and cmake_initial_cache skip non-cache variables and
+            # cache variables that are already set unless FORCE is used.
+            if not flags & FLAG_CACHE or (varname in cmake_cache and not flags & FLAG_FORCE):
+                continue
+            cmake_cache[varname] = value
+            if generator == "bash":
+                output.append(self._bash_option(["-D", varname, ":" + type_name], value))
+            else:
+                output.append(f'set({varname} {value} CACHE {type_name} "from .ini configuration" FORCE)')
+        return output
+
+    # ---------------------------------
+    #   P R I V A T E   M E T H O D S
+    # ---------------------------------
+
+    def _kinds_with_handlers(self, generator) -> set:
+        """The record kinds that the parser of the bundle has program option handlers for."""
+        kinds = self._generator_kinds.get(generator)
+        if kinds is None:
+            handlers = self.metadata.get("handlers")
+            if handlers is None:
+                # Bundles compiled before the handlers were recorded.
+                kinds = {RECORD_OPT_SET, RECORD_CMAKE_VAR}
+            else:
+                kinds = {kind for typename, kind in RECORD_TYPES if generator in handlers.get(typename, ())}
+            self._generator_kinds[generator] = kinds
+        return kinds
+
+    def _string(self, sid):
+        if sid == NO_STRING:
+            return None
+        text = self._strings.get(sid)
+        if text is None:
+            position = self._off_string_index + sid * STRING_STRUCT.size
+            offset, length = STRING_STRUCT.unpack_from(self._buffer, position)
+            start = self._off_string_data + offset
+            text = str(self._buffer[start : start + length], "utf-8")
+            self._strings[sid] = text
+        return text
+
+    def _words(self, first, count) -> tuple:
+        return struct.unpack_from(f"<{count}I", self._buffer, self._off_words + first*4)
+
+    def _tokens(self, first, count) -> list:
+        words = self._words(first, 2 * count)
+        return [(self._string(words[i]), self._string(words[i + 1])) for i in range(0, 2 * count, 2)]
+
+    def _find_section(self, section):
+        """Binary search for a section, returns ``(first record, record count)`` or ``None``."""
+        key = section.encode("utf-8")
+        low, high = 0, self._n_sections
+        while low < high:
+            middle = (low+high) // 2
+            name_sid, first, count = SECTION_STRUCT.unpack_from(
+                self._buffer, self._off_sections + middle * SECTION_STRUCT.size
+            )
+            name = self._string(name_sid).encode("utf-8")
+            if name == key:
+                return first, count
+            if name < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _section_records(self, section):
+        location = self._find_section(section)
+        if location is None:
+            raise KeyError(f"ERROR: No section named `{section}` was found in the bundle `{self.filename}`.")
+        first, count = location
+        for index in range(first, first + count):
+            yield RECORD_STRUCT.unpack_from(self._buffer, self._off_records + index * RECORD_STRUCT.size)
+
+    @staticmethod
+    def _expand(tokens, generator, cmake_cache, strict) -> str:
+        output = []
+        for text, vartype in tokens:
+            if vartype is None:
+                output.append(text)
+            elif vartype == "ENV":
+                output.append("${" + text + "}" if generator == "bash" else "$ENV{" + text + "}")
+            elif vartype == "CMAKE":
+                if generator != "bash":
+                    output.append("${" + text + "}")
+                elif text in cmake_cache:
+                    output.append(cmake_cache[text].strip('"'))
+                elif strict:
+                    raise ValueError(
+                        f"Unresolved variable expansion for `{text}` in a BASH file."
+                        " CMake variables are only valid in a CMake fragment file."
+                    )
+            else:
+                raise ValueError(f"Unsupported variable type `{vartype}` in expansion of `{text}`.")
+        return "".join(output)
+
+    @staticmethod
+    def _bash_option(params, value) -> str:
+        output = "".join(params)
+        if value is not None:
+            # Make sure STRING flag values are surrounded by double quotes
+            if "STRING" in output and not value.startswith('"') and not value.endswith('"'):
+                value = f'"{value}"'
+            output += "=" + value
+        return output
+
+
+
+def main(argv=None) -> int:
+    """Command line interface to compile bundles and list their sections."""
+    import argparse
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m setprogramoptions.bundle", description="Compile and inspect option bundles."
+    )
+    subparsers = argument_parser.add_subparsers(dest="command")
+    compile_parser = subparsers.add_parser("compile", help="Compile a .ini file into a bundle.")
+    compile_parser.add_argument("inifile", help="The .ini file.")
+    compile_parser.add_argument("-o", "--output", required=True, help="The bundle file to write.")
+    compile_parser.add_argument(
+        "-s", "--section", action="append", default=None, help="A section to compile."
+    )
+    compile_parser.add_argument(
+        "--class",
+        dest="parser_class",
+        default="SetProgramOptionsCMake",
+        choices=("SetProgramOptionsCMake", "SetProgramOptions"),
+        help="The parser class to use (default: SetProgramOptionsCMake)."
+    )
+    info_parser = subparsers.add_parser("info", help="Print the metadata and sections of a bundle.")
+    info_parser.add_argument("bundle", help="The bundle file.")
+    args = argument_parser.parse_args(argv)
+
+    if args.command == "compile":
+        import setprogramoptions
+        parser = getattr(setprogramoptions, args.parser_class)(args.inifile)
+        sections = compile_bundle(parser, args.output, args.section)
+        print(f"Compiled {len(sections)} sections into {args.output}")
+    elif args.command == "info":
+        import json
+        with OptionBundle(args.bundle) as bundle:
+            print(json.dumps(bundle.metadata, indent=2, sort_keys=True))
+            for section in bundle.sections():
+                print(section)
+    else:
+        argument_parser.print_help()
+        return 2
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
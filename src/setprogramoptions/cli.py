@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+Command line interface
+======================
+
+The ``setprogramoptions`` console script loads a ``.ini`` file once and generates
+the option lists of many sections with many generators in a single process.
+
+.. code-block:: bash
+
+    # Print the bash command and CMake fragment for two sections
+    setprogramoptions config.ini -s SECTION_A -s SECTION_B -g bash -g cmake_fragment
+
+    # Write SECTION_A.sh, SECTION_A.cmake, ... into a directory
+    setprogramoptions config.ini -s SECTION_A -g bash -g cmake_fragment --out-dir build/
+
+    # Use a manifest file for large batches
+    setprogramoptions config.ini --manifest sections.txt --out-dir build/
+
+    # Export all root sections (not used by other sections) with 8 worker processes,
+    # only rewriting the files that changed
+    setprogramoptions config.ini --export --out-dir build/ -j 8
+
+    # Render through a running render server (see setprogramoptions.server)
+    setprogramoptions config.ini -s SECTION_A --socket /tmp/spo.sock
+
+    # Render from a precompiled bundle (see setprogramoptions.bundle)
+    setprogramoptions config.spob -s SECTION_A -g bash
+
+A manifest file lists one section per line, optionally followed by the generators
+to use for that section. Sections without generators use the ``--generator`` values.
+Blank lines and lines starting with ``#`` are ignored:
+
+.. code-block:: text
+
+    # section               generators
+    SECTION_A               bash cmake_fragment
+    SECTION_B
+
+When ``--out-dir`` is given each option list is written to the file
+``<section><extension>`` where the extension depends on the generator (``.sh`` for
+``bash`` and ``.cmake`` for ``cmake_fragment``). Otherwise the option lists are
+printed to stdout.
+
+With ``--socket`` the option lists are rendered by a
+:py:class:`~setprogramoptions.server.RenderServer` using the server's settings, or
+in-process if the server is not running.
+
+If ``inifile`` is an option bundle created by
+:py:func:`~setprogramoptions.bundle.compile_bundle` the option lists are rendered
+from the bundle and the ``.ini`` parser is not loaded.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+
+
+PARSER_CLASSES = ("SetProgramOptionsCMake", "SetProgramOptions")
+
+
+
+def read_manifest(filename) -> list:
+    """Read a manifest file.
+
+    Args:
+        filename (str): The path to the manifest file.
+
+    Returns:
+        list: A list of ``(section, [generator, ...])`` tuples. The list of
+        generators is empty if none were given for a section.
+    """
+    output = []
+    with open(filename, "r") as ifp:
+        for line in ifp:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split()
+            output.append((fields[0], fields[1 :]))
+    return output
+
+
+
+def build_jobs(sections, generators, manifest=None) -> list:
+    """Build the list of ``(section, generator)`` pairs to generate.
+
+    Args:
+        sections (list): Section names from the command line.
+        generators (list): The default generators.
+        manifest (str): Optional path to a manifest file.
+
+    Returns:
+        list: A list of unique ``(section, generator)`` tuples in the order given.
+    """
+    requests = [(section, []) for section in sections or []]
+    if manifest is not None:
+        requests += read_manifest(manifest)
+
+    jobs = []
+    for section, section_generators in requests:
+        for generator in section_generators or generators:
+            if (section, generator) not in jobs:
+                jobs.append((section, generator))
+    return jobs
+
+
+
+def render_jobs(parser, jobs, out_dir=None, stream=None) -> list:
+    """Generate the option lists for a list of jobs.
+
+    Args:
+        parser (SetProgramOptions): The parser to use.
+        jobs (list): ``(section, generator)`` tuples from :py:func:`build_jobs`.
+        out_dir (str): If given, each option list is written to a file in this directory.
+        stream (file): Where option lists are printed if ``out_dir`` is not given.
+
+    Returns:
+        list: The paths of the files that were written.
+
+    Raises:
+        ValueError: If ``out_dir`` is given and a section name can not be used as a
+            file name (see :py:func:`~setprogramoptions.common.section_output_filename`).
+            Nothing is written in this case.
+    """
+    from .common import join_option_list
+    from .common import section_output_filename
+
+    if stream is None:
+        stream = sys.stdout
+
+    written = []
+    filenames = None
+    if out_dir is not None:
+        filenames = [
+            os.path.join(out_dir, section_output_filename(section, generator)) for section, generator in jobs
+        ]
+        os.makedirs(out_dir, exist_ok=True)
+
+    for index, (section, generator) in enumerate(jobs):
+        text = join_option_list(parser.gen_option_list(section, generator=generator), generator)
+        if out_dir is None:
+            stream.write(f"# [{section}] ({generator})\n")
+            stream.write(text + "\n\n")
+        else:
+            filename = filenames[index]
+            with open(filename, "w") as ofp:
+                ofp.write(text + "\n")
+            written.append(filename)
+    return written
+
+
+
+def create_parser(inifile, parser_class="SetProgramOptionsCMake"):
+    """Create a parser object for ``inifile``.
+
+    Args:
+        inifile (str): The path to the ``.ini`` file.
+        parser_class (str): One of :py:data:`PARSER_CLASSES`.
+    """
+    import setprogramoptions
+    return getattr(setprogramoptions, parser_class)(inifile)
+
+
+
+def _build_argument_parser():
+    parser = argparse.ArgumentParser(
+        prog="setprogramoptions",
+        description="Generate program options for many sections of a .ini file in one run."
+    )
+    parser.add_argument("inifile", help="The .ini file (or option bundle) to load.")
+    parser.add_argument(
+        "-s", "--section", action="append", default=[], help="A section to generate (repeatable)."
+    )
+    parser.add_argument(
+        "-g",
+        "--generator",
+        action="append",
+        default=None,
+        help="A generator to use, i.e., bash or cmake_fragment (repeatable, default: bash)."
+    )
+    parser.add_argument("-m", "--manifest", default=None, help="A file listing sections and generators.")
+    parser.add_argument("-o", "--out-dir", default=None, help="Write one file per section and generator.")
+    parser.add_argument(
+        "--export",
+        action="store_true",
+        help="Export to --out-dir with parallel workers, skipping unchanged files and writing "
+        "manifest.json. Exports all root sections with bash and cmake_fragment by default."
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, default=None, help="Worker processes for --export (default: CPU count)."
+    )
+    parser.add_argument(
+        "--class",
+        dest="parser_class",
+        default="SetProgramOptionsCMake",
+        choices=PARSER_CLASSES,
+        help="The parser class to use (default: SetProgramOptionsCMake)."
+    )
+    parser.add_argument(
+        "--exception-control-level",
+        type=int,
+        default=None,
+        help="Set the exception control level of the parser (0-5)."
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="Render through the render server listening on this Unix domain socket "
+        "(rendered in-process if the server is not running). Can not be combined with "
+        "--exception-control-level or --collect-warnings."
+    )
+    parser.add_argument("--silent-warnings", action="store_true", help="Do not print warnings.")
+    parser.add_argument("--collect-warnings", action="store_true", help="Summarize warnings per option list.")
+    parser.add_argument(
+        "--fast-parse", action="store_true", help="Parse sections with the fast parser where possible."
+    )
+    return parser
+
+
+
+def main(argv=None) -> int:
+    """Entry point of the ``setprogramoptions`` console script.
+
+    Args:
+        argv (list): The command line arguments, ``sys.argv[1:]`` is used if ``None``.
+
+    Returns:
+        int: 0 on success, 1 if an option list could not be generated and 2 for usage errors.
+    """
+    argument_parser = _build_argument_parser()
+    args = argument_parser.parse_args(argv)
+
+    if args.export:
+        return _main_export(argument_parser, args)
+
+    generators = args.generator if args.generator else ["bash"]
+    jobs = build_jobs(args.section, generators, args.manifest)
+    if not jobs:
+        argument_parser.print_usage(sys.stderr)
+        print("setprogramoptions: error: no sections given (use --section or --manifest)", file=sys.stderr)
+        return 2
+
+    if args.socket is not None and (args.exception_control_level is not None or args.collect_warnings):
+        # The render server uses its own parser settings.
+        argument_parser.print_usage(sys.stderr)
+        print(
+            "setprogramoptions: error: --socket can not be combined with --exception-control-level "
+            "or --collect-warnings",
+            file=sys.stderr
+        )
+        return 2
+
+    client = None
+    if args.socket is not None:
+        from .server import RenderClient
+        client = RenderClient(
+            args.socket, parser_class=args.parser_class, silent_warnings=args.silent_warnings
+        )
+        parser = client.bind(args.inifile)
+    else:
+        parser = _create_configured_parser(args)
+
+    try:
+        render_jobs(parser, jobs, out_dir=args.out_dir)
+    except Exception as exc:
+        print(f"setprogramoptions: error: {type(exc).__name__}: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if client is not None:
+            client.close()
+
+    return 0
+
+
+
+def _create_configured_parser(args):
+    from .bundle import is_bundle, OptionBundle
+    if is_bundle(args.inifile):
+        return OptionBundle(args.inifile)
+    parser = create_parser(args.inifile, args.parser_class)
+    if args.exception_control_level is not None:
+        parser.exception_control_level = args.exception_control_level
+    parser.exception_control_silent_warnings = args.silent_warnings
+    parser.collect_warnings = args.collect_warnings
+    parser.fast_parse = args.fast_parse
+    return parser
+
+
+
+def _main_export(argument_parser, args) -> int:
+    """Implements ``--export``, see :py:func:`setprogramoptions.export.export_sections`."""
+    from .export import export_sections
+
+    if args.out_dir is None:
+        argument_parser.print_usage(sys.stderr)
+        print("setprogramoptions: error: --export requires --out-dir", file=sys.stderr)
+        return 2
+
+    parser = _create_configured_parser(args)
+    if not hasattr(parser, "configparserdata"):
+        print("setprogramoptions: error: --export requires a .ini file", file=sys.stderr)
+        return 2
+    generators = args.generator if args.generator else ["bash", "cmake_fragment"]
+
+    # Group the sections by their generators so each group is one export.
+    groups = {}
+    if args.section or args.manifest is not None:
+        for section, generator in build_jobs(args.section, generators, args.manifest):
+            groups.setdefault(section, []).append(generator)
+        exports = {}
+        for section, section_generators in groups.items():
+            exports.setdefault(tuple(section_generators), []).append(section)
+    else:
+        exports = {tuple(generators): None}
+
+    written = unchanged = 0
+    errors = {}
+    try:
+        for export_generators, sections in exports.items():
+            result = export_sections(parser, args.out_dir, sections, export_generators, args.workers)
+            written += len(result.written)
+            unchanged += len(result.unchanged)
+            errors.update(result.errors)
+    except Exception as exc:
+        print(f"setprogramoptions: error: {type(exc).__name__}: {exc}", file=sys.stderr)
+        return 1
+
+    for (section, generator), error in errors.items():
+        print(f"setprogramoptions: error: [{section}] ({generator}): {error}", file=sys.stderr)
+    print(f"Exported to {args.out_dir}: {written} written, {unchanged} unchanged, {len(errors)} failed")
+    return 1 if errors else 0
@@ -38,6 +38,122 @@
 """
 Free functions and helpers
 """
+import logging
+
+
+
+# Diagnostics are also sent to the `setprogramoptions` logger at the DEBUG level.
+# Applications that do not configure logging see no output from it.
+logger = logging.getLogger("setprogramoptions")
+logger.addHandler(logging.NullHandler())
+
+
+
+class LazyMessage(object):
+    """
+    A diagnostic message that is only formatted when it is converted to a ``str``.
+
+    The message is either a ``%``-style format string with arguments (as used by
+    the ``logging`` module) or a callable that returns the message text.
+
+        >>> LazyMessage("Remove all options containing: `%s`", key)
+        >>> LazyMessage(lambda: build_expensive_message(entry))
+
+    Args:
+        message (str,callable): The format string or a callable.
+        args: The arguments for a format string.
+    """
+    __slots__ = ("_message", "_args", "_text")
+
+    def __init__(self, message, *args):
+        self._message = message
+        self._args = args
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            if callable(self._message):
+                self._text = str(self._message())
+            elif self._args:
+                self._text = self._message % self._args
+            else:
+                self._text = str(self._message)
+        return self._text
+
+
+
+def exception_control_event_enabled(obj, event_type: str) -> bool:
+    """Check if an ``exception_control_event`` would raise or print anything.
+
+    Use this to skip building the message of an event that would be ignored
+    based on the ``exception_control_level`` and
+    ``exception_control_silent_warnings`` settings of ``obj``.
+
+    Args:
+        obj (ExceptionControl): The object that would handle the event.
+        event_type (str): The event type, i.e., "WARNING".
+
+    Returns:
+        bool: ``True`` if the event would be raised or printed.
+    """
+    event_type = str(event_type).upper()
+    exception_control_level = obj.exception_control_level
+    if exception_control_level >= obj._exception_control_map_event_to_level_req[event_type]:
+        return True
+    if exception_control_level <= 0 or event_type == "SILENT":
+        return False
+    return not obj.exception_control_silent_warnings
+
+
+
+# File extensions used when option lists are written to files.
+GENERATOR_FILE_EXTENSIONS = {
+    "bash": ".sh",
+    "cmake_fragment": ".cmake",
+    "cmake_initial_cache": ".initial_cache.cmake",
+}
+
+
+
+def generator_file_extension(generator: str) -> str:
+    """The file extension for the output of ``generator``, i.e., ``.sh`` for ``bash``."""
+    return GENERATOR_FILE_EXTENSIONS.get(generator, "." + generator)
+
+
+
+def section_output_filename(section: str, generator: str) -> str:
+    """The name of the file that the output of ``generator`` for ``section`` is written to.
+
+    Section names are used as file names as-is, so names that would write the file
+    somewhere else than in the output directory are rejected.
+
+    Raises:
+        ValueError: If ``section`` is empty, ``.`` or ``..`` or if it contains a
+            path separator or a NUL character.
+    """
+    if section in ("", ".", "..") or any(char in section for char in ("/", "\\", "\0")):
+        raise ValueError(f"section `{section}` can not be used as a file name")
+    return section + generator_file_extension(generator)
+
+
+
+def join_option_list(option_list: list, generator: str) -> str:
+    """Join the output of ``gen_option_list`` into text.
+
+    ``bash`` options are joined into a single command with line continuations,
+    other generators produce one entry per line unless their registered
+    :py:class:`~setprogramoptions.Generator.Generator` joins them differently.
+
+    Args:
+        option_list (list): The list returned by ``gen_option_list``.
+        generator (str): The generator that produced ``option_list``.
+
+    Returns:
+        str: The joined text.
+    """
+    from .Generator import Generator
+    from .Generator import get_generator
+    return (get_generator(generator) or Generator).join(option_list)
 
 
 
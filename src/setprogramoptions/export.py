@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+Export
+======
+
+Renders many sections with many generators into a directory, i.e.,
+``<out_dir>/<section>.sh`` and ``<out_dir>/<section>.cmake``. This is the
+implementation of :py:meth:`SetProgramOptionsCMake.export_sections()
+<setprogramoptions.SetProgramOptionsCMake.export_sections>` and of
+``setprogramoptions --export``.
+
+- Sections are rendered by parallel worker processes. Each worker creates its
+  own parser and renders a contiguous chunk of the sections, so sections that
+  are ``use``-d by several sections in a chunk are only parsed once per worker.
+- Files are written atomically: the content is written to a temporary file in
+  the output directory which then replaces the destination file. The file keeps
+  the mode of the file it replaces, new files get the default mode (``0o666``
+  without the bits of the umask).
+- A file is only written if its SHA-256 digest differs from the file that is
+  already there, so the modification times of unchanged outputs are preserved
+  and build tools don't rebuild anything that depends on them.
+- A ``manifest.json`` file records the section, generator, SHA-256 digest and
+  size of every exported file.
+"""
+from __future__ import print_function
+
+import hashlib
+import importlib
+import json
+import os
+import stat
+import tempfile
+
+from .LazyOptions import LazyOptions
+from .common import join_option_list
+from .common import section_output_filename
+
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_SCHEMA_VERSION = 1
+
+# Parsers created by ``_render_chunk_in_worker`` in a worker process.
+_WORKER_PARSERS = {}
+
+
+
+class ExportResult(object):
+    """
+    The outcome of an export.
+
+    Attributes:
+        written (list): Paths of the files that were created or changed.
+        unchanged (list): Paths of the files whose content did not change.
+        errors (dict): Error messages keyed by ``(section, generator)`` for the
+            option lists that could not be generated. No file is written for them.
+        manifest (dict): The contents of the manifest file.
+    """
+
+    def __init__(self):
+        self.written = []
+        self.unchanged = []
+        self.errors = {}
+        self.manifest = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(written={len(self.written)}, unchanged={len(self.unchanged)}, "
+            f"errors={len(self.errors)})"
+        )
+
+
+
+def file_digest(text) -> str:
+    """The SHA-256 hex digest of ``text`` encoded as UTF-8."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+
+def _default_file_mode() -> int:
+    """The mode of a file created by ``open()``, i.e., ``0o666`` without the bits of the umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+
+def write_file_atomic(filename, text) -> bool:
+    """Write ``text`` to ``filename`` atomically unless the file already contains it.
+
+    Args:
+        filename (str): The destination file.
+        text (str): The content.
+
+    Returns:
+        bool: ``True`` if the file was written, ``False`` if it was unchanged.
+    """
+    data = text.encode("utf-8")
+    try:
+        with open(filename, "rb") as ifp:
+            if hashlib.sha256(ifp.read()).digest() == hashlib.sha256(data).digest():
+                return False
+            mode = stat.S_IMODE(os.fstat(ifp.fileno()).st_mode)
+    except FileNotFoundError:
+        mode = _default_file_mode()
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_filename = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(filename))
+    try:
+        with os.fdopen(fd, "wb") as ofp:
+            ofp.write(data)
+        # ``mkstemp`` creates the file with mode 0600.
+        os.chmod(tmp_filename, mode)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.unlink(tmp_filename)
+        raise
+    return True
+
+
+
+def render_chunk(parser, sections, generators) -> list:
+    """Render the files of a chunk of sections.
+
+    Args:
+        parser (SetProgramOptions): The parser.
+        sections (list): The sections to render.
+        generators (list): The generators to render each section with.
+
+    Returns:
+        list: ``(section, generator, text, error)`` tuples. ``text`` is the content of
+        the file, or ``None`` if generating the option list raised an exception, in
+        which case ``error`` describes it.
+    """
+    output = []
+    for section in sections:
+        for generator in generators:
+            try:
+                text = join_option_list(
+                    parser.gen_option_list(section, generator=generator), generator
+                ) + "\n"
+                output.append((section, generator, text, None))
+            except Exception as exc:
+                output.append((section, generator, None, f"{type(exc).__name__}: {exc}"))
+    return output
+
+
+
+def _render_chunk_in_worker(parser_spec, sections, generators) -> list:
+    """Render a chunk of sections with a parser that is cached in the worker process."""
+    parser = _WORKER_PARSERS.get(parser_spec)
+    if parser is None:
+        module_name, class_name, inifiles, settings = parser_spec
+        parser_class = getattr(importlib.import_module(module_name), class_name)
+        parser = parser_class(list(inifiles))
+        for name, value in settings:
+            setattr(parser, name, value)
+        _WORKER_PARSERS[parser_spec] = parser
+    return render_chunk(parser, sections, generators)
+
+
+
+def _parser_spec(parser):
+    """A picklable description of ``parser`` that worker processes can recreate it from.
+
+    The settings are the values of all the public properties of the parser that can
+    be set and whose values are ``None``, ``bool``, ``int``, ``float``, ``str`` or
+    tuples of those. Typed properties that were never assigned have their defaults
+    in the workers, too, and are skipped.
+
+    Returns:
+        tuple: ``(module, class name, inifiles, settings)`` or ``None`` if a worker
+        can not produce the same output as ``parser``, i.e., if the parser does not read
+        its data from files, if it has a seeded CMake symbol table, if sections of
+        :py:attr:`~setprogramoptions.SetProgramOptions.options` have been assigned
+        (e.g., virtual sections) or deleted, if it has event hooks, if it collects
+        warnings or if it records statistics.
+    """
+    cls = type(parser)
+    inifiles = tuple(str(path) for path in parser.inifilepath)
+    if not inifiles or "." in cls.__qualname__ or "<" in cls.__qualname__:
+        return None
+    if getattr(parser, "_cmake_symbol_seed", None) is not None:
+        return None
+    options = parser.options
+    if not isinstance(options, LazyOptions) or options.modified:
+        return None
+    if parser._event_hooks is not None or parser.collect_warnings or parser._stats_enabled:
+        return None
+
+    settings = []
+    for name in sorted(dir(cls)):
+        attribute = getattr(cls, name, None)
+        if name.startswith("_") or not isinstance(attribute, property) or attribute.fset is None:
+            continue
+        try:
+            value = getattr(parser, name)
+        except Exception:
+            # e.g., properties that must be assigned before they are used.
+            continue
+        if getattr(parser, f"_{name}_is_set", True) is False:
+            continue
+        if _is_setting_value(value):
+            settings.append((name, value))
+    return (cls.__module__, cls.__qualname__, inifiles, tuple(settings))
+
+
+
+def _is_setting_value(value) -> bool:
+    """Check if ``value`` is a value of a setting that ``_parser_spec`` passes on to workers."""
+    if isinstance(value, tuple):
+        return all(_is_setting_value(item) for item in value)
+    return value is None or isinstance(value, (bool, int, float, str))
+
+
+
+def _chunks(items, count) -> list:
+    """Split ``items`` into at most ``count`` contiguous chunks of similar size."""
+    count = max(1, min(count, len(items)))
+    size, extra = divmod(len(items), count)
+    output = []
+    start = 0
+    for index in range(count):
+        stop = start + size + (1 if index < extra else 0)
+        output.append(items[start : stop])
+        start = stop
+    return output
+
+
+
+def read_manifest(out_dir) -> dict:
+    """Read the manifest of an export directory.
+
+    Returns:
+        dict: The manifest, or ``None`` if there is no (readable) manifest.
+    """
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILENAME), "r") as ifp:
+            manifest = json.load(ifp)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("schema_version") != MANIFEST_SCHEMA_VERSION:
+        return None
+    return manifest
+
+
+
+def export_sections(parser, out_dir, sections=None, generators=("bash", "cmake_fragment"), workers=None):
+    """Render sections with generators into files in ``out_dir``.
+
+    See :py:meth:`SetProgramOptionsCMake.export_sections()
+    <setprogramoptions.SetProgramOptionsCMake.export_sections>`.
+    """
+    if sections is None:
+        sections = parser.root_sections()
+    sections = list(sections)
+    generators = list(generators)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    parser_spec = _parser_spec(parser) if workers > 1 and len(sections) > 1 else None
+    if parser_spec is None:
+        rendered = render_chunk(parser, sections, generators)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        chunks = _chunks(sections, workers)
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            futures = [
+                executor.submit(_render_chunk_in_worker, parser_spec, chunk, generators) for chunk in chunks
+            ]
+            rendered = [item for future in futures for item in future.result()]
+
+    result = ExportResult()
+    previous = read_manifest(out_dir)
+    files = dict(previous["files"]) if previous is not None else {}
+
+    for section, generator, text, error in rendered:
+        try:
+            relpath = section_output_filename(section, generator)
+        except ValueError as exc:
+            result.errors[(section, generator)] = f"{type(exc).__name__}: {exc}"
+            continue
+        if error is not None:
+            result.errors[(section, generator)] = error
+            files.pop(relpath, None)
+            continue
+        filename = os.path.join(out_dir, relpath)
+        if write_file_atomic(filename, text):
+            result.written.append(filename)
+        else:
+            result.unchanged.append(filename)
+        files[relpath] = {
+            "section": section,
+            "generator": generator,
+            "sha256": file_digest(text),
+            "size": len(text.encode("utf-8")),
+        }
+
+    # Keep entries of earlier exports (i.e., of other sections) whose files still exist.
+    files = {
+        relpath: entry
+        for relpath, entry in files.items()
+        if os.path.exists(os.path.join(out_dir, relpath))
+    }
+
+    result.manifest = {
+        "schema_version": MANIFEST_SCHEMA_VERSION,
+        "inifiles": [str(path) for path in parser.inifilepath],
+        "files": files,
+    }
+    write_file_atomic(
+        os.path.join(out_dir, MANIFEST_FILENAME),
+        json.dumps(result.manifest, indent=2, sort_keys=True) + "\n"
+    )
+    return result
@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+Render server
+=============
+
+A persistent local server that keeps parsers warm and answers ``gen_option_list``
+requests over a Unix domain socket. Tools that make many small requests pay the
+interpreter startup and ``.ini`` parsing once instead of on every call.
+
+.. code-block:: bash
+
+    python3 -m setprogramoptions.server /tmp/spo.sock &
+    setprogramoptions config.ini -s SECTION_A -g bash --socket /tmp/spo.sock
+
+.. code-block:: python
+    :linenos:
+
+    from setprogramoptions.server import RenderClient
+
+    with RenderClient("/tmp/spo.sock") as client:
+        options = client.gen_option_list("config.ini", "SECTION_A", "bash")
+
+The server keeps one parser per ``.ini`` file and creates a new one when the
+modification time or size of the file changes. Requests for the same file are
+serialized; requests for different files run concurrently.
+
+:py:class:`RenderClient` falls back to rendering in-process (with its own cache
+of parsers) when the server is not running, so callers do not need to check.
+
+Protocol
+--------
+Requests and responses are JSON objects, one per line (UTF-8, ``\\n`` terminated).
+A connection may send any number of requests and receives one response for each,
+in order. Every request has an ``op`` key:
+
+- ``{"op": "gen_option_list", "inifile": PATH, "section": SECTION, "generator": GENERATOR}``
+  responds ``{"ok": true, "result": [OPTION, ...]}``.
+- ``{"op": "ping"}`` responds ``{"ok": true, "result": {"pid": PID, "version": VERSION}}``.
+- ``{"op": "reload", "inifile": PATH}`` drops the cached parser of ``PATH`` (or all
+  parsers if ``inifile`` is omitted).
+- ``{"op": "shutdown"}`` stops the server after responding.
+
+Failed requests respond ``{"ok": false, "error": MESSAGE, "error_type": NAME}``.
+``inifile`` paths are interpreted by the server, so clients should send absolute paths.
+"""
+from __future__ import print_function
+
+import argparse
+import builtins
+import errno
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+
+
+
+class ParserCache(object):
+    """
+    A thread-safe cache of parsers keyed by the ``.ini`` file path.
+
+    A cached parser is replaced by a new one when the modification time or
+    size of its ``.ini`` file changes.
+
+    Args:
+        parser_class (str): The name of the parser class, ``SetProgramOptionsCMake``
+            or ``SetProgramOptions``.
+        silent_warnings (bool): Sets ``exception_control_silent_warnings`` of the parsers.
+    """
+
+    def __init__(self, parser_class="SetProgramOptionsCMake", silent_warnings=True):
+        self.parser_class = parser_class
+        self.silent_warnings = silent_warnings
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, inifile):
+        """Get the parser for ``inifile`` and the lock that guards it.
+
+        Args:
+            inifile (str): The path to the ``.ini`` file.
+
+        Returns:
+            tuple: ``(parser, lock)``. Callers must hold ``lock`` while using the parser.
+
+        Raises:
+            FileNotFoundError: If ``inifile`` does not exist.
+        """
+        inifile = os.path.abspath(inifile)
+        stamp = self._file_stamp(inifile)
+        with self._lock:
+            entry = self._entries.get(inifile)
+            if entry is None or entry[0] != stamp:
+                entry = (stamp, self._create_parser(inifile), threading.Lock())
+                self._entries[inifile] = entry
+        return entry[1], entry[2]
+
+    def gen_option_list(self, inifile, section, generator="bash") -> list:
+        """Generate an option list with the cached parser of ``inifile``."""
+        parser, lock = self.get(inifile)
+        with lock:
+            return parser.gen_option_list(section, generator=generator)
+
+    def clear(self, inifile=None):
+        """Drop the cached parser of ``inifile``, or all parsers if ``inifile`` is ``None``."""
+        with self._lock:
+            if inifile is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(inifile), None)
+        return
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _create_parser(self, inifile):
+        import setprogramoptions
+        parser = getattr(setprogramoptions, self.parser_class)(inifile)
+        parser.exception_control_silent_warnings = self.silent_warnings
+        return parser
+
+    @staticmethod
+    def _file_stamp(inifile) -> tuple:
+        stat = os.stat(inifile)
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+
+class _RenderRequestHandler(socketserver.StreamRequestHandler):
+    """Answers newline-delimited JSON requests until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response, shutdown = self.server.render_server.dispatch(line)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if shutdown:
+                # ``shutdown()`` waits for ``serve_forever()`` to exit so it can't be
+                # called from the thread that is handling the request.
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                break
+        return
+
+
+
+def _remove_stale_socket(socket_path):
+    """Remove ``socket_path`` if it is a socket that no server is listening on.
+
+    Raises:
+        FileExistsError: If ``socket_path`` exists and is not a socket.
+        OSError: If a server is listening on ``socket_path`` (``EADDRINUSE``).
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(errno.EEXIST, "The path exists and is not a socket", socket_path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        # Nothing is listening, i.e., the socket was left behind by a server that stopped.
+        os.unlink(socket_path)
+        return
+    finally:
+        sock.close()
+    raise OSError(errno.EADDRINUSE, "A server is already listening on the socket", socket_path)
+
+
+
+class RenderServer(object):
+    """
+    A server that renders option lists for clients on a Unix domain socket.
+
+    Args:
+        socket_path (str): The path of the Unix domain socket. A stale socket
+            file at this path is removed.
+        parser_class (str): The name of the parser class, ``SetProgramOptionsCMake``
+            or ``SetProgramOptions``.
+        silent_warnings (bool): Sets ``exception_control_silent_warnings`` of the parsers.
+
+    Raises:
+        NotImplementedError: If the platform does not support Unix domain sockets.
+    """
+
+    def __init__(self, socket_path, parser_class="SetProgramOptionsCMake", silent_warnings=True):
+        if not hasattr(socket, "AF_UNIX"):
+            raise NotImplementedError("Unix domain sockets are not supported on this platform.")
+        self.socket_path = socket_path
+        self.parsers = ParserCache(parser_class, silent_warnings)
+        self._server = None
+        self._thread = None
+        # `(st_dev, st_ino)` of the socket file created by `bind`.
+        self._socket_id = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    # -------------------------------
+    #   P U B L I C   M E T H O D S
+    # -------------------------------
+
+    def bind(self):
+        """Create and bind the listening socket.
+
+        A socket file left behind by a server that is no longer running is replaced.
+        The socket is only accessible by the user running the server (mode ``0o600``).
+
+        Raises:
+            FileExistsError: If the socket path exists and is not a socket.
+            OSError: If another server is listening on the socket (``EADDRINUSE``).
+        """
+        if self._server is None:
+            _remove_stale_socket(self.socket_path)
+            server = socketserver.ThreadingUnixStreamServer(
+                self.socket_path, _RenderRequestHandler, bind_and_activate=False
+            )
+            try:
+                server.server_bind()
+                stat_result = os.lstat(self.socket_path)
+                self._socket_id = (stat_result.st_dev, stat_result.st_ino)
+                os.chmod(self.socket_path, 0o600)
+                server.server_activate()
+            except BaseException:
+                server.server_close()
+                self._unlink_socket()
+                raise
+            server.daemon_threads = True
+            server.render_server = self
+            self._server = server
+        return self._server
+
+    def serve_forever(self):
+        """Serve requests until a ``shutdown`` request is received."""
+        server = self.bind()
+        try:
+            server.serve_forever()
+        finally:
+            self.close()
+        return
+
+    def start(self):
+        """Serve requests in a background (daemon) thread.
+
+        Returns:
+            RenderServer: ``self``.
+        """
+        server = self.bind()
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Stop serving and remove the socket file if this server created it."""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        if self._thread is not None:
+            server.shutdown()
+            self._thread.join()
+            self._thread = None
+        server.server_close()
+        self._unlink_socket()
+        return
+
+    def dispatch(self, line) -> tuple:
+        """Process one encoded request.
+
+        Args:
+            line (bytes): A JSON encoded request.
+
+        Returns:
+            tuple: ``(response, shutdown)`` where ``response`` is a ``dict`` and ``shutdown``
+            is ``True`` if the server should stop.
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object.")
+            op = request.get("op")
+            if op == "gen_option_list":
+                result = self.parsers.gen_option_list(
+                    request["inifile"], request["section"], request.get("generator", "bash")
+                )
+            elif op == "ping":
+                from .version import __version__
+                result = {"pid": os.getpid(), "version": __version__}
+            elif op == "reload":
+                self.parsers.clear(request.get("inifile"))
+                result = None
+            elif op == "shutdown":
+                return {"ok": True, "result": None}, True
+            else:
+                raise ValueError(f"Unknown op `{op}`.")
+        except Exception as exc:
+            message = exc.args[0] if isinstance(exc, KeyError) and exc.args else str(exc)
+            return {"ok": False, "error": str(message), "error_type": type(exc).__name__}, False
+        return {"ok": True, "result": result}, False
+
+    # ---------------------------------
+    #   P R I V A T E   M E T H O D S
+    # ---------------------------------
+
+    def _unlink_socket(self):
+        """Remove the socket file if it is still the one created by :py:meth:`bind`.
+
+        The path is left alone if another server replaced the socket file in the meantime.
+        """
+        socket_id, self._socket_id = self._socket_id, None
+        if socket_id is None:
+            return
+        try:
+            stat_result = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if (stat_result.st_dev, stat_result.st_ino) == socket_id:
+            os.unlink(self.socket_path)
+        return
+
+
+
+class RenderClient(object):
+    """
+    A client of :py:class:`RenderServer`.
+
+    The connection is opened on the first request and reused for later requests.
+    If the server can not be reached (and ``fallback`` is ``True``) the requests are
+    rendered in-process using a :py:class:`ParserCache`.
+
+    Errors reported by the server are raised as the built-in exception type named
+    by the server when there is one, i.e., ``KeyError`` for an unknown section, and
+    as ``RuntimeError`` otherwise.
+
+    Args:
+        socket_path (str): The path of the server's Unix domain socket.
+        timeout (float): Socket timeout in seconds.
+        fallback (bool): Render in-process if the server is unavailable.
+        parser_class (str): The parser class used by the in-process fallback.
+        silent_warnings (bool): Silences warnings of the in-process fallback.
+    """
+
+    def __init__(
+        self,
+        socket_path,
+        timeout=30.0,
+        fallback=True,
+        parser_class="SetProgramOptionsCMake",
+        silent_warnings=True
+    ):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.fallback = fallback
+        self._local = ParserCache(parser_class, silent_warnings)
+        self._sock = None
+        self._rfile = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @property
+    def connected(self) -> bool:
+        """``True`` if a connection to the server is open."""
+        return self._sock is not None
+
+    # -------------------------------
+    #   P U B L I C   M E T H O D S
+    # -------------------------------
+
+    def gen_option_list(self, inifile, section, generator="bash") -> list:
+        """Generate the option list of ``section`` in ``inifile``.
+
+        Args:
+            inifile (str): The path to the ``.ini`` file.
+            section (str): The section to generate.
+            generator (str): The generator to use.
+
+        Returns:
+            list: The option list, as returned by ``gen_option_list``.
+        """
+        request = {
+            "op": "gen_option_list",
+            "inifile": os.path.abspath(inifile),
+            "section": section,
+            "generator": generator
+        }
+        if not self._connect():
+            return self._local.gen_option_list(inifile, section, generator)
+        return self._request(request)
+
+    def bind(self, inifile):
+        """Bind the client to an ``.ini`` file.
+
+        Args:
+            inifile (str): The path to the ``.ini`` file.
+
+        Returns:
+            An object with a ``gen_option_list(section, generator="bash")`` method, which
+            can be used in place of a parser.
+        """
+        return _BoundRenderClient(self, inifile)
+
+    def ping(self):
+        """Check that the server is running.
+
+        Returns:
+            dict: The server ``pid`` and ``version``, or ``None`` if the server is unavailable.
+        """
+        if not self._connect():
+            return None
+        return self._request({"op": "ping"})
+
+    def reload(self, inifile=None):
+        """Drop cached parsers on the server and in the in-process fallback."""
+        self._local.clear(inifile)
+        if self._connect():
+            self._request({"op": "reload", "inifile": None if inifile is None else os.path.abspath(inifile)})
+        return
+
+    def shutdown_server(self):
+        """Ask the server to stop and close the connection."""
+        if self._connect():
+            self._request({"op": "shutdown"})
+        self.close()
+        return
+
+    def close(self):
+        """Close the connection to the server."""
+        if self._sock is not None:
+            self._rfile.close()
+            self._sock.close()
+            self._sock = None
+            self._rfile = None
+        return
+
+    # ---------------------------------
+    #   P R I V A T E   M E T H O D S
+    # ---------------------------------
+
+    def _connect(self) -> bool:
+        """Connect to the server if not already connected.
+
+        Returns:
+            bool: ``True`` if connected, ``False`` if the server is unavailable
+            and ``fallback`` is enabled.
+        """
+        if self._sock is not None:
+            return True
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        except (AttributeError, OSError):
+            if not self.fallback:
+                raise
+            return False
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            if not self.fallback:
+                raise
+            return False
+        self._sock = sock
+        self._rfile = sock.makefile("rb")
+        return True
+
+    def _request(self, request):
+        try:
+            self._sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            line = self._rfile.readline()
+        except OSError:
+            self.close()
+            raise
+        if not line:
+            self.close()
+            raise ConnectionError("The render server closed the connection.")
+
+        response = json.loads(line)
+        if not response.get("ok", False):
+            error_type = getattr(builtins, response.get("error_type", ""), None)
+            if not (isinstance(error_type, type) and issubclass(error_type, Exception)):
+                error_type = RuntimeError
+            raise error_type(response.get("error"))
+        return response.get("result")
+
+
+
+class _BoundRenderClient(object):
+    """A :py:class:`RenderClient` bound to one ``.ini`` file, see :py:meth:`RenderClient.bind`."""
+
+    def __init__(self, client, inifile):
+        self.client = client
+        self.inifile = inifile
+
+    def gen_option_list(self, section, generator="bash") -> list:
+        return self.client.gen_option_list(self.inifile, section, generator)
+
+
+
+def main(argv=None) -> int:
+    """Run a :py:class:`RenderServer` until it receives a ``shutdown`` request.
+
+    Args:
+        argv (list): The command line arguments, ``sys.argv[1:]`` is used if ``None``.
+
+    Returns:
+        int: 0 when the server exits.
+    """
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m setprogramoptions.server",
+        description="Serve gen_option_list requests over a Unix domain socket."
+    )
+    argument_parser.add_argument("socket", help="The path of the Unix domain socket.")
+    argument_parser.add_argument(
+        "--class",
+        dest="parser_class",
+        default="SetProgramOptionsCMake",
+        choices=("SetProgramOptionsCMake", "SetProgramOptions"),
+        help="The parser class to use (default: SetProgramOptionsCMake)."
+    )
+    argument_parser.add_argument(
+        "--show-warnings", action="store_true", help="Print parser warnings on the server's stdout."
+    )
+    args = argument_parser.parse_args(argv)
+
+    server = RenderServer(args.socket, args.parser_class, silent_warnings=not args.show_warnings)
+    print(f"setprogramoptions render server listening on {args.socket} (pid {os.getpid()})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
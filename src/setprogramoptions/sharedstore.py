@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+Shared-memory option store
+==========================
+
+A :py:class:`SharedOptionStore` publishes the resolved ``options`` of a parser once
+into a :py:mod:`multiprocessing.shared_memory` block, using the layout of an option
+bundle (see :py:mod:`setprogramoptions.bundle`): a string table plus section, record
+and index arrays. Worker processes attach the block read-only by its name and
+generate option lists from it. Nothing is pickled apart from the name and nothing
+is parsed, so the memory and start-up cost of a worker does not depend on the
+size of the ``.ini`` file or the number of workers:
+
+.. code-block:: python
+    :linenos:
+
+    import multiprocessing
+    from setprogramoptions import SetProgramOptionsCMake
+    from setprogramoptions.sharedstore import store_gen_option_list
+
+    parser = SetProgramOptionsCMake("config.ini")
+    with parser.publish_options() as store:
+        requests = [(store.name, section, "bash") for section in store.sections]
+        with multiprocessing.Pool(8) as pool:
+            option_lists = pool.starmap(store_gen_option_list, requests)
+
+The workers do not import ``configparserenhanced``. Option lists are generated
+like :py:meth:`OptionBundle.gen_option_list
+<setprogramoptions.bundle.OptionBundle.gen_option_list>` does.
+
+Requires Python 3.8 or newer.
+"""
+from __future__ import print_function
+
+import os
+import sys
+import threading
+
+from .bundle import compile_bundle_bytes
+from .bundle import OptionBundle
+
+
+
+# The stores attached by this process, by name.
+_ATTACHED = {}
+_ATTACH_LOCK = threading.Lock()
+
+
+
+def _attach_shared_memory(name):
+    """Attach an existing shared memory block without tracking it.
+
+    The resource tracker of a process that only attaches a block would unlink the
+    block when the process exits (https://bugs.python.org/issue39959), so attached
+    blocks are not tracked.
+    """
+    from multiprocessing import shared_memory
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    # Python < 3.13 always registers the block. Processes started by `multiprocessing`
+    # share the resource tracker of their parent, which unregisters the block when
+    # the owner unlinks it, so the registration is left alone. Any other process
+    # starts a tracker of its own, so the block is unregistered from it. (A worker
+    # forked before the parent started its tracker, i.e., a ``fork`` pool created
+    # before the store, has a tracker of its own as well, so create such pools after
+    # the store.)
+    import multiprocessing
+    from multiprocessing import resource_tracker
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == "posix" and multiprocessing.parent_process() is None:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+
+class _SharedOptionBundle(OptionBundle):
+    """An :py:class:`OptionBundle` in an attached shared memory block.
+
+    The bundle reads the block through a read-only view, the block itself is
+    writable by every process that attaches it.
+    """
+
+    def __init__(self, name):
+        self._shm = _attach_shared_memory(name)
+        self.filename = name
+        self._mmap = None
+        try:
+            self._init_from_buffer(self._shm.buf.toreadonly())
+        except Exception:
+            self._shm.close()
+            raise
+
+    def close(self):
+        """Release the buffer and detach the shared memory block."""
+        super().close()
+        self._shm.close()
+        return
+
+
+
+class SharedOptionStore(object):
+    """
+    The resolved options of a parser, published in a shared memory block.
+
+    The process that creates the store owns the block: :py:meth:`close` (or leaving
+    the ``with`` block) unlinks it, after which no new process can attach it.
+
+    Args:
+        parser (SetProgramOptions): The parser.
+        sections (list): The sections to publish. If ``None`` all sections are
+            published, except sections that can not be parsed.
+
+    Attributes:
+        sections (list): The names of the published sections.
+        size (int): The size of the published data in bytes.
+    """
+
+    def __init__(self, parser, sections=None):
+        from multiprocessing import shared_memory
+        data, self.sections = compile_bundle_bytes(parser, sections)
+        self.size = len(data)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(self.size, 1))
+        self._shm.buf[: self.size] = data
+        self._bundle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory block, which workers pass to :py:func:`attach_store`."""
+        return self._shm.name
+
+    def gen_option_list(self, section, generator="bash", strict=True) -> list:
+        """Generate an option list in this process, see :py:meth:`OptionBundle.gen_option_list`."""
+        if self._bundle is None:
+            self._bundle = OptionBundle.from_buffer(self._shm.buf.toreadonly(), self.name)
+        return self._bundle.gen_option_list(section, generator, strict)
+
+    def close(self):
+        """Detach and unlink the shared memory block."""
+        if self._shm is None:
+            return
+        if self._bundle is not None:
+            self._bundle.close()
+            self._bundle = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+        return
+
+
+
+def attach_store(name) -> OptionBundle:
+    """Attach a :py:class:`SharedOptionStore` by name.
+
+    A process attaches each store once, later calls return the same object.
+
+    Args:
+        name (str): The :py:attr:`SharedOptionStore.name`.
+
+    Returns:
+        OptionBundle: A read-only view of the store.
+
+    Raises:
+        FileNotFoundError: If there is no shared memory block named ``name``.
+    """
+    with _ATTACH_LOCK:
+        bundle = _ATTACHED.get(name)
+        if bundle is None:
+            bundle = _SharedOptionBundle(name)
+            _ATTACHED[name] = bundle
+    return bundle
+
+
+
+def detach_store(name=None):
+    """Detach a store attached by :py:func:`attach_store`, or all stores if ``name`` is ``None``."""
+    with _ATTACH_LOCK:
+        names = list(_ATTACHED) if name is None else [name]
+        for store_name in names:
+            bundle = _ATTACHED.pop(store_name, None)
+            if bundle is not None:
+                bundle.close()
+    return
+
+
+
+def store_gen_option_list(name, section, generator="bash", strict=True) -> list:
+    """Generate an option list from an attached store, i.e., in ``Pool.starmap``.
+
+    Args:
+        name (str): The :py:attr:`SharedOptionStore.name`.
+        section (str): The section.
+        generator (str): ``bash``, ``cmake_fragment`` or ``cmake_initial_cache``.
+        strict (bool): See :py:meth:`OptionBundle.gen_option_list`.
+
+    Returns:
+        list: The option list.
+    """
+    return attach_store(name).gen_option_list(section, generator, strict)
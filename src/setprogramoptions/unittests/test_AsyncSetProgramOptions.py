@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import TestCase
+
+from setprogramoptions import *
+from setprogramoptions.AsyncSetProgramOptions import _get_running_loop
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class InstrumentedSetProgramOptionsCMake(SetProgramOptionsCMake):
+    """
+    Records the number of concurrent ``gen_option_list`` calls and can block them.
+    """
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    started = None
+    release = None
+    delay = 0.0
+
+    def gen_option_list(self, section, generator="bash") -> list:
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if cls.started is not None:
+                cls.started.set()
+            if cls.release is not None:
+                cls.release.wait(10)
+            time.sleep(cls.delay)
+            return super().gen_option_list(section, generator)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+
+
+class AsyncSetProgramOptionsTest(TestCase):
+    """
+    Tests for ``AsyncSetProgramOptions``.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        self._filename = find_config_ini(filename="config_test_setprogramoptions.ini")
+        self._settings = {"exception_control_silent_warnings": True}
+        self._loop = asyncio.new_event_loop()
+        InstrumentedSetProgramOptionsCMake.active = 0
+        InstrumentedSetProgramOptionsCMake.max_active = 0
+        InstrumentedSetProgramOptionsCMake.started = None
+        InstrumentedSetProgramOptionsCMake.release = None
+        InstrumentedSetProgramOptionsCMake.delay = 0.0
+        return
+
+    def tearDown(self):
+        self._loop.close()
+        return
+
+    def _run(self, coroutine):
+        return self._loop.run_until_complete(coroutine)
+
+    def test_AsyncSetProgramOptions_matches_parser(self):
+        """
+        The async methods return the same results as the parser.
+        """
+        section = "TRILINOS_CONFIGURATION_ALPHA"
+        parser = SetProgramOptionsCMake(self._filename)
+        parser.exception_control_silent_warnings = True
+
+        async def run():
+            async with AsyncSetProgramOptions(self._filename, settings=self._settings) as aparser:
+                await aparser.aload()
+                parsed = await aparser.aparse_section(section)
+                bash = await aparser.agen_option_list(section, "bash")
+                option_lists = await aparser.agen_option_lists(
+                    [(section, "cmake_fragment"), (section, "bash")]
+                )
+            return parsed, bash, option_lists
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parsed, bash, option_lists = self._run(run())
+        self.assertEqual(parser.parse_section(section), parsed)
+        self.assertEqual(parser.gen_option_list(section, "bash"), bash)
+        self.assertEqual(
+            [
+                parser.gen_option_list(section, "cmake_fragment"),
+                parser.gen_option_list(section, "bash"),
+            ],
+            option_lists
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_AsyncSetProgramOptions_errors(self):
+        """
+        Exceptions raised by the parser are raised by the async methods.
+        """
+
+        async def run():
+            async with AsyncSetProgramOptions(self._filename, settings=self._settings) as aparser:
+                with self.assertRaises(KeyError):
+                    await aparser.agen_option_list("NO_SUCH_SECTION")
+                requests = [("TEST_CMAKE_FAIL_ON_PARENT_SCOPE_AND_FORCE", "bash"), ("TEST_SECTION", "bash")]
+                return await aparser.agen_option_lists(requests, return_exceptions=True)
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        results = self._run(run())
+        self.assertIsInstance(results[0], ValueError)
+        self.assertEqual(["OPTS=\"FOO 'BAR BAZ'\""], results[1])
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with self.assertRaises(ValueError):
+            AsyncSetProgramOptions(self._filename, max_concurrency=0)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_AsyncSetProgramOptions_bounded_concurrency(self):
+        """
+        No more than ``max_concurrency`` requests run at the same time.
+        """
+        InstrumentedSetProgramOptionsCMake.delay = 0.01
+        sections = ["TRILINOS_CONFIGURATION_ALPHA", "TEST_SECTION", "TEST_CMAKE_CACHE_PARAM_ORDER"] * 4
+
+        async def run():
+            async with AsyncSetProgramOptions(
+                self._filename,
+                InstrumentedSetProgramOptionsCMake,
+                max_concurrency=2,
+                settings=self._settings
+            ) as aparser:
+                results = await aparser.agen_option_lists([(section, "bash") for section in sections])
+                return results, aparser.parser_count
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        results, parser_count = self._run(run())
+        self.assertEqual(len(sections), len(results))
+        self.assertEqual(2, InstrumentedSetProgramOptionsCMake.max_active)
+        self.assertEqual(2, parser_count)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_AsyncSetProgramOptions_cancellation(self):
+        """
+        A cancelled request keeps its parser until it finishes running.
+        """
+        section = "TEST_SECTION"
+        InstrumentedSetProgramOptionsCMake.started = threading.Event()
+        InstrumentedSetProgramOptionsCMake.release = threading.Event()
+
+        async def run():
+            async with AsyncSetProgramOptions(
+                self._filename,
+                InstrumentedSetProgramOptionsCMake,
+                max_concurrency=1,
+                settings=self._settings
+            ) as aparser:
+                loop = _get_running_loop()
+                task = loop.create_task(aparser.agen_option_list(section))
+                await loop.run_in_executor(None, InstrumentedSetProgramOptionsCMake.started.wait, 10)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+                # The cancelled request is still running, so the next one has to wait.
+                InstrumentedSetProgramOptionsCMake.started.clear()
+                second = loop.create_task(aparser.agen_option_list(section))
+                await asyncio.sleep(0.05)
+                self.assertFalse(second.done())
+                self.assertFalse(InstrumentedSetProgramOptionsCMake.started.is_set())
+
+                InstrumentedSetProgramOptionsCMake.release.set()
+                result = await second
+                return result, aparser.parser_count
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        result, parser_count = self._run(run())
+        self.assertEqual(["OPTS=\"FOO 'BAR BAZ'\""], result)
+        self.assertEqual(1, parser_count)
+        self.assertEqual(1, InstrumentedSetProgramOptionsCMake.max_active)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
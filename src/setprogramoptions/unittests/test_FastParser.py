@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import unittest
+from unittest import TestCase
+
+from configparserenhanced.ConfigParserEnhanced import AmbiguousHandlerError
+
+from setprogramoptions import *
+from setprogramoptions.bench import synth
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class FastParserTest(TestCase):
+    """
+    Tests for ``SetProgramOptions.fast_parse`` and the ``FastParser``.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        self._filenames = [
+            find_config_ini(filename="config_test_setprogramoptions.ini"),
+            find_config_ini(filename="config_test_fastparser.ini"),
+        ]
+        return
+
+    def _create_parser(self, parser_class, filename, fast_parse):
+        parser = parser_class(filename)
+        parser.exception_control_silent_warnings = True
+        parser.fast_parse = fast_parse
+        return parser
+
+    def _parse(self, parser, section):
+        """The entries of ``section`` and the events fired while parsing it, or the error."""
+        events = []
+        for event in ("entry_added", "entry_removed"):
+
+            def callback(parser, section, event=event, **data):
+                events.append((event, section, data["entry"]))
+
+            parser.add_event_hook(event, callback)
+        try:
+            result = parser.parse_section(section)
+        except Exception as exc:
+            return (type(exc).__name__, str(exc))
+        self.assertEqual(result, parser.parse_section_last_result)
+        return (parser.options[section], events)
+
+    def test_fast_parse_matches_parse_section(self):
+        """
+        ``fast_parse`` gives the same options, events and errors as the generic parser.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        for parser_class in (SetProgramOptions, SetProgramOptionsCMake):
+            for filename in self._filenames:
+                for compact_options in (False, True):
+                    parser = self._create_parser(parser_class, filename, False)
+                    fast_parser = self._create_parser(parser_class, filename, True)
+                    parser.compact_options = compact_options
+                    fast_parser.compact_options = compact_options
+                    for section in parser.configparserdata.sections():
+                        self.assertEqual(
+                            self._parse(parser, section),
+                            self._parse(fast_parser, section),
+                            f"{parser_class.__name__} {os.path.basename(filename)} {section}"
+                        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "synthetic.ini")
+            with open(filename, "w") as ofp:
+                ofp.write(synth.generate_ini(sections=12, roots=4, use_depth=3, options_per_section=8))
+            parser = self._create_parser(SetProgramOptionsCMake, filename, False)
+            fast_parser = self._create_parser(SetProgramOptionsCMake, filename, True)
+            for section in parser.configparserdata.sections():
+                self.assertEqual(self._parse(parser, section), self._parse(fast_parser, section), section)
+                self.assertIsNotNone(fast_parser._fast_parser.parse(section))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_fast_parse_fallback(self):
+        """
+        Sections with options the ``FastParser`` does not support are left to the generic parser.
+        """
+        filename = self._filenames[1]
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser = self._create_parser(SetProgramOptionsCMake, filename, True)
+        for section in parser.configparserdata.sections():
+            result = parser._fast_parser.parse(section)
+            if section.startswith("FAST_"):
+                self.assertIsNotNone(result, section)
+            else:
+                self.assertIsNone(result, section)
+
+        # `opt-set-cmake-var` is only supported by `SetProgramOptionsCMake`.
+        parser = self._create_parser(SetProgramOptions, filename, True)
+        self.assertIsNone(parser._fast_parser.parse("FAST_A"))
+        self.assertIsNotNone(parser._fast_parser.parse("FAST_SELF"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser = self._create_parser(SetProgramOptionsCMake, filename, True)
+        parser.debug_level = 1
+        self.assertIsNone(parser._fast_parser.parse("FAST_SELF"))
+        parser.debug_level = 0
+        parser.stats.enabled = True
+        self.assertIsNone(parser._fast_parser.parse("FAST_SELF"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Subclasses that override a handler are parsed by the generic parser
+        # unless they list the handler in their `_fast_parse_handlers`.
+        class OverriddenHandler(SetProgramOptionsCMake):
+
+            def _handler_opt_set(self, section_name, handler_parameters):
+                return super()._handler_opt_set(section_name, handler_parameters)
+
+        class ListedHandler(SetProgramOptionsCMake):
+            _fast_parse_handlers = {"_handler_opt_set": "add"}
+
+            def _handler_opt_set(self, section_name, handler_parameters):
+                return super()._handler_opt_set(section_name, handler_parameters)
+
+        class OverriddenHelper(SetProgramOptionsCMake):
+
+            def _option_handler_helper_add(self, section_name, handler_parameters):
+                return super()._option_handler_helper_add(section_name, handler_parameters)
+
+        for parser_class in (OverriddenHandler, OverriddenHelper):
+            parser = self._create_parser(parser_class, filename, True)
+            self.assertIsNone(parser._fast_parser.parse("FAST_SELF"), parser_class.__name__)
+            parser.parse_section("FAST_SELF")
+            self.assertEqual([['self']], [entry['params'] for entry in parser.options["FAST_SELF"]])
+
+        parser = self._create_parser(ListedHandler, filename, True)
+        self.assertIsNotNone(parser._fast_parser.parse("FAST_SELF"))
+
+        # A public and a private handler for the same operation are an error for the generic parser.
+        class PublicHandler(SetProgramOptionsCMake):
+
+            def handler_opt_set(self, section_name, handler_parameters):
+                return self._handler_opt_set(section_name, handler_parameters)
+
+        parser = self._create_parser(PublicHandler, filename, True)
+        self.assertIsNone(parser._fast_parser.parse("FAST_SELF"))
+        with self.assertRaises(AmbiguousHandlerError):
+            parser.parse_section("FAST_SELF")
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
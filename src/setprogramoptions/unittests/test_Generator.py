@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import importlib
+import tempfile
+import textwrap
+import unittest
+from unittest import TestCase
+
+from setprogramoptions import *
+from setprogramoptions.common import join_option_list
+
+from .common import *
+
+# ``setprogramoptions.Generator`` is the class, the package binds it in place of the module.
+generator_module = importlib.import_module("setprogramoptions.Generator")
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class GeneratorTest(TestCase):
+    """
+    Tests for the pluggable generators of ``setprogramoptions.Generator``.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        self._filename = find_config_ini(filename="config_test_setprogramoptions.ini")
+        return
+
+    def _create_parser(self, parser_class=SetProgramOptionsCMake):
+        parser = parser_class(self._filename)
+        parser.exception_control_silent_warnings = True
+        return parser
+
+    def _render(self, parser, section, generator):
+        try:
+            return parser.gen_option_list(section, generator)
+        except Exception as exc:
+            return type(exc).__name__
+
+    def test_generator_batch_matches_per_entry(self):
+        """
+        Rendering whole sections produces the same option lists (and errors) as rendering each entry.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser = self._create_parser()
+        for section in parser.configparserdata.sections():
+            for generator in ("bash", "cmake_fragment", "cmake_initial_cache"):
+                expected_parser = self._create_parser()
+                expected_parser.stats.enabled = True
+                expected = self._render(expected_parser, section, generator)
+                actual = self._render(self._create_parser(), section, generator)
+                self.assertEqual(expected, actual, f"{section} ({generator})")
+
+        self.assertIsInstance(parser._get_generator("bash"), generator_module.BashGenerator)
+        self.assertIs(parser._get_generator("bash"), parser._get_generator("bash"))
+        self.assertIs(get_generator("cmake_fragment"), generator_module.CMakeFragmentGenerator)
+        self.assertIn("bash", generator_module.available_generators())
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_generator_register_custom(self):
+        """
+        A registered generator receives the entries of a section in a single ``render`` call.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+
+        @register_generator("test_env")
+        class EnvGenerator(Generator):
+
+            def render(self, entries):
+                calls.append(len(entries))
+                return [
+                    "{}={}".format("".join(entry['params']), entry['value'])
+                    for entry in entries
+                    if entry['value'] is not None
+                ]
+
+            @classmethod
+            def join(cls, option_list):
+                return " ".join(option_list)
+
+        calls = []
+        try:
+            parser = self._create_parser(SetProgramOptions)
+            option_list = parser.gen_option_list("TEST_OPTION_REMOVAL_VARS_01", generator="test_env")
+            self.assertEqual(["-BParam4Param5Param6=VALUE_B", "-CArg1Arg2Arg3=VALUE_C"], option_list)
+            self.assertEqual([2], calls)
+            self.assertEqual(
+                "-BParam4Param5Param6=VALUE_B -CArg1Arg2Arg3=VALUE_C",
+                join_option_list(option_list, "test_env")
+            )
+
+            with self.assertRaises(ValueError):
+                register_generator("test_env", generator_module.BashGenerator)
+            with self.assertRaises(TypeError):
+                register_generator("test_other", object)
+        finally:
+            generator_module.unregister_generator("test_env")
+
+        self.assertIsNone(get_generator("test_env"))
+        self.assertEqual("a\nb", join_option_list(["a", "b"], "test_env"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_generator_entry_points(self):
+        """
+        Generators are found through the ``setprogramoptions.generators`` entry point group.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "spo_test_generator_plugin.py"), "w") as ofp:
+                ofp.write(
+                    textwrap.dedent(
+                        """\
+                        from setprogramoptions.Generator import Generator
+
+                        class UpperGenerator(Generator):
+                            def render(self, entries):
+                                return ["".join(entry['params']).upper() for entry in entries]
+                        """
+                    )
+                )
+            dist_info = os.path.join(tmpdir, "spo_test_generator_plugin-1.0.dist-info")
+            os.mkdir(dist_info)
+            with open(os.path.join(dist_info, "METADATA"), "w") as ofp:
+                ofp.write("Metadata-Version: 2.1\nName: spo-test-generator-plugin\nVersion: 1.0\n")
+            with open(os.path.join(dist_info, "entry_points.txt"), "w") as ofp:
+                ofp.write("[setprogramoptions.generators]\n")
+                ofp.write("test_upper = spo_test_generator_plugin:UpperGenerator\n")
+
+            sys.path.insert(0, tmpdir)
+            try:
+                generator_module.load_entry_points()
+                self.assertIn("test_upper", generator_module.available_generators())
+                parser = self._create_parser(SetProgramOptions)
+                self.assertEqual(
+                    ["CMAKE", "-G"], parser.gen_option_list("CMAKE_GENERATOR_NINJA", "test_upper")
+                )
+                self.assertEqual("UpperGenerator", get_generator("test_upper").__name__)
+            finally:
+                sys.path.remove(tmpdir)
+                sys.modules.pop("spo_test_generator_plugin", None)
+                generator_module.unregister_generator("test_upper")
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_generator_parser_handlers(self):
+        """
+        Program option handlers of parser subclasses are used for unregistered and built-in generators.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+
+        class CustomParser(SetProgramOptions):
+
+            def _program_option_handler_opt_set_make(self, params, value):
+                return "{} := {}".format("".join(params), value)
+
+            def _program_option_handler_opt_set_bash(self, params, value):
+                return "[" + super()._program_option_handler_opt_set_bash(params, value) + "]"
+
+        class CustomEntryParser(SetProgramOptions):
+
+            def _gen_option_entry(self, option_entry, generator="bash"):
+                return option_entry['params'][0]
+
+        parser = self._create_parser(CustomParser)
+        self.assertEqual(["OPTS := \"FOO 'BAR BAZ'\""], parser.gen_option_list("TEST_SECTION", "make"))
+        self.assertEqual(["[OPTS=\"FOO 'BAR BAZ'\"]"], parser.gen_option_list("TEST_SECTION", "bash"))
+        self.assertIs(type(parser._get_generator("make")), Generator)
+
+        parser = self._create_parser(CustomEntryParser)
+        self.assertEqual(["-A", "-B", "-C"], parser.gen_option_list("TEST_OPTION_REMOVAL_VARIABLES", "bash"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_generator_builtin_methods(self):
+        """
+        The ``bash`` and ``cmake_fragment`` generators render ``opt-set`` and ``opt-set-cmake-var``
+        entries with their own methods unless the parser overrides the handlers they implement.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser = self._create_parser()
+        bash = parser._get_generator("bash")
+        cmake_fragment = parser._get_generator("cmake_fragment")
+        self.assertEqual(bash.opt_set, bash._locate_handler(["opt_set"]))
+        self.assertEqual(bash.opt_set_cmake_var, bash._locate_handler(["opt_set_cmake_var"]))
+        self.assertEqual(
+            cmake_fragment.opt_set_cmake_var, cmake_fragment._locate_handler(["opt_set_cmake_var"])
+        )
+        self.assertEqual(
+            parser._program_option_handler_opt_set_cmake_initial_cache,
+            parser._get_generator("cmake_initial_cache")._locate_handler(["opt_set"])
+        )
+
+        # The handlers of the parser render the same lines.
+        self.assertEqual(
+            '-DFOO:STRING="a b"',
+            parser._program_option_handler_opt_set_cmake_var_bash(["FOO", "STRING"], "a b")
+        )
+        self.assertEqual(
+            'set(FOO BAR CACHE BOOL "from .ini configuration" FORCE)',
+            parser._program_option_handler_opt_set_cmake_var_cmake_fragment(["FOO", "BOOL", "FORCE"], "BAR")
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+
+        class CustomParser(SetProgramOptionsCMake):
+
+            def _generic_program_option_handler_bash(self, params, value):
+                return "[" + super()._generic_program_option_handler_bash(params, value) + "]"
+
+        parser = self._create_parser(CustomParser)
+        bash = parser._get_generator("bash")
+        self.assertEqual(parser._program_option_handler_opt_set_bash, bash._locate_handler(["opt_set"]))
+        self.assertEqual(bash.opt_set_cmake_var, bash._locate_handler(["opt_set_cmake_var"]))
+        self.assertEqual(
+            [
+                "[cmake]",
+                "[-G=Ninja]",
+                '[-DCMAKE_CXX_FLAGS:STRING="-O2"]',
+                '[-DCMAKE_BUILD_TYPE:STRING="Release"]'
+            ],
+            parser.gen_option_list("TEST_COMPACT_OPTIONS_COMMON", "bash")
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest import TestCase
+
+from setprogramoptions import *
+from setprogramoptions.RenderPlan import STEP_CALL
+from setprogramoptions.RenderPlan import STEP_LINE
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class RenderPlanTest(TestCase):
+    """
+    Tests for ``SetProgramOptions.compile_section()`` and ``RenderPlan``.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        self._filename = find_config_ini(filename="config_test_setprogramoptions.ini")
+        return
+
+    def _create_parser(self, parser_class=SetProgramOptionsCMake, ecl=None):
+        parser = parser_class(self._filename)
+        parser.exception_control_silent_warnings = True
+        if ecl is not None:
+            parser.exception_control_level = ecl
+        return parser
+
+    def _render(self, func, *args):
+        try:
+            return func(*args)
+        except Exception as exc:
+            return type(exc).__name__
+
+    def test_render_plan_matches_gen_option_list(self):
+        """
+        Executing a plan (twice) gives the same option lists and errors as ``gen_option_list``.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        for parser_class in (SetProgramOptions, SetProgramOptionsCMake):
+            for ecl in (2, 5):
+                parser = self._create_parser(parser_class, ecl)
+                plan_parser = self._create_parser(parser_class, ecl)
+                for section in parser.configparserdata.sections():
+                    for generator in ("bash", "cmake_fragment", "cmake_initial_cache"):
+                        expected = self._render(parser.gen_option_list, section, generator)
+                        plan = self._render(plan_parser.compile_section, section, generator)
+                        if isinstance(plan, str):
+                            self.assertEqual(expected, plan)
+                            continue
+                        for _ in range(2):
+                            self.assertEqual(
+                                expected,
+                                self._render(plan.execute),
+                                f"{parser_class.__name__} ecl={ecl} {section} ({generator})"
+                            )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_render_plan_steps(self):
+        """
+        Static entries are rendered when the plan is compiled and CMake variables are expanded on execution.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser = self._create_parser()
+        plan = parser.compile_section("TEST_SPACES_AND_EXPANSION", "bash")
+        self.assertEqual(
+            [(STEP_LINE, 'TEST_OPTIONS="-L${PATH} -ldl -fsanitize=address"', None, None)], plan.steps
+        )
+
+        # `opt-set` entries render no lines in CMake fragments.
+        plan = parser.compile_section("TRILINOS_CONFIGURATION_ALPHA", "cmake_fragment")
+        self.assertEqual(10, len(plan))
+        self.assertTrue(all(step[0] == STEP_CALL for step in plan.steps))
+
+        parser.exception_control_level = 3
+        plan = parser.compile_section("TEST_CMAKE_VAR_IN_BASH_GENERATOR", "bash")
+        self.assertEqual(['-DFOO_VAR:STRING="FOO"', '-DFOO_VAR:STRING="BAR "'], plan.execute())
+        parser.exception_control_level = 4
+        with self.assertRaises(ValueError):
+            plan.execute()
+        parser.seed_cmake_symbols(mapping={"FOO_VAE": "VAE"})
+        self.assertEqual(['-DFOO_VAR:STRING="FOO"', '-DFOO_VAR:STRING="BAR VAE"'], plan.execute())
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_render_plan_invalidation(self):
+        """
+        A plan is compiled again after the entries of its section are replaced or changed.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser = self._create_parser(SetProgramOptions)
+        plan = parser.compile_section("TEST_OPTION_REMOVAL_VARS_01", "bash")
+        self.assertEqual(["-BParam4Param5Param6=VALUE_B", "-CArg1Arg2Arg3=VALUE_C"], plan.execute())
+        self.assertTrue(plan.is_valid)
+
+        section_options = parser.options["TEST_OPTION_REMOVAL_VARS_01"] = []
+        section_options.append({'type': ['opt_set'], 'params': ['-X'], 'value': None})
+        self.assertFalse(plan.is_valid)
+        self.assertEqual(["-X"], plan.execute())
+
+        section_options.append({'type': ['opt_set'], 'params': ['-Y'], 'value': "Z"})
+        self.assertEqual(["-X", "-Y=Z"], plan.execute())
+
+        # Entries that are replaced or changed in place, i.e., the number of entries is the same.
+        section_options[1] = {'type': ['opt_set'], 'params': ['-V'], 'value': None}
+        self.assertFalse(plan.is_valid)
+        self.assertEqual(["-X", "-V"], plan.execute())
+
+        section_options[0]['params'] = ['-W']
+        self.assertFalse(plan.is_valid)
+        self.assertEqual(["-W", "-V"], plan.execute())
+
+        plan.invalidate()
+        self.assertFalse(plan.is_valid)
+        self.assertEqual(["-W", "-V"], plan.execute())
+
+        del parser.options["TEST_OPTION_REMOVAL_VARS_01"]
+        self.assertEqual(["-BParam4Param5Param6=VALUE_B", "-CArg1Arg2Arg3=VALUE_C"], plan.execute())
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_render_plan_fallback(self):
+        """
+        Statistics, event hooks and customized parsers are handled by ``gen_option_list``.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+
+        class CustomParser(SetProgramOptions):
+
+            def _gen_option_entry(self, option_entry, generator="bash"):
+                return option_entry['params'][0]
+
+        class CustomHandlerParser(SetProgramOptions):
+
+            def _program_option_handler_opt_set_bash(self, params, value):
+                return "[" + super()._program_option_handler_opt_set_bash(params, value) + "]"
+
+        parser = self._create_parser(CustomParser)
+        plan = parser.compile_section("TEST_OPTION_REMOVAL_VARIABLES", "bash")
+        self.assertTrue(plan.fallback)
+        self.assertEqual(["-A", "-B", "-C"], plan.execute())
+
+        parser = self._create_parser(CustomHandlerParser)
+        plan = parser.compile_section("TEST_GENERIC_OPTION_SET", "bash")
+        self.assertEqual([STEP_CALL], [step[0] for step in plan.steps])
+        self.assertEqual(["[-AParam1Param2Param3=VALUE]"], plan.execute())
+
+        parser = self._create_parser()
+        plan = parser.compile_section("TRILINOS_CONFIGURATION_ALPHA", "bash")
+        expected = plan.execute()
+        parser.stats.enabled = True
+        self.assertEqual(expected, plan.execute())
+        self.assertGreater(parser.stats.counters["options_cache:hit"], 0)
+
+        rendered = []
+        parser.add_event_hook("entry_rendered", lambda parser, section, **data: rendered.append(data["line"]))
+        self.assertEqual(expected, plan.execute())
+        self.assertEqual(expected, [line for line in rendered if line is not None])
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
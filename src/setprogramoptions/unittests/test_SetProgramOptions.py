@@ -43,6 +43,8 @@ import sys
 
 sys.dont_write_bytecode = True
 
+import contextlib
+import io
 import os
 
 
@@ -65,6 +67,8 @@ from mock import MagicMock
 from mock import patch
 
 import filecmp
+import json
+import re
 from textwrap import dedent
 
 try:
@@ -620,6 +624,449 @@ class SetProgramOptionsTest(TestCase):
         print("OK")
         return 0
 
+    def test_SetProgramOptions_stats(self):
+        """
+        Test the opt-in ``stats`` timings and counters.
+        """
+        print("\n")
+        print("Load file: {}".format(self._filename))
+        parser = SetProgramOptions(self._filename)
+        parser.debug_level = 5
+        parser.exception_control_level = 4
+        parser.exception_control_compact_warnings = False
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # The disabled paths do not create a `ParserStats`.
+        parser.fast_parse = True
+        parser.compact_options = True
+        parser.gen_option_list("TEST_OPTION_REMOVAL_VARS_02", generator="bash")
+        parser.gen_option_lists(
+            ["TEST_OPTION_REMOVAL_VARS_02", "TEST_SPACES_AND_EXPANSION"], generator="bash"
+        )
+        list(parser.iter_option_list("TEST_SPACES_AND_EXPANSION", generator="bash"))
+        parser.compile_section("TEST_OPTION_REMOVAL_VARS_02").execute()
+        self.assertFalse(parser._stats_enabled)
+        self.assertIsNone(parser._stats)
+        parser.fast_parse = False
+        parser.compact_options = False
+        parser.options = {}
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Nothing is collected while disabled.
+        self.assertIsInstance(parser.stats, ParserStats)
+        self.assertFalse(parser.stats.enabled)
+        parser.gen_option_list("TEST_OPTION_REMOVAL_VARS_02", generator="bash")
+        self.assertDictEqual({"enabled": False, "timings": {}, "counters": {}}, parser.stats.as_dict())
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser.stats.enabled = True
+        parser.options = {}
+        parser.gen_option_list("TEST_OPTION_REMOVAL_VARS_02", generator="bash")
+        parser.gen_option_list("TEST_OPTION_REMOVAL_VARS_02", generator="bash")
+        parser.gen_option_list("TEST_SPACES_AND_EXPANSION", generator="bash")
+
+        counters = parser.stats.counters
+        self.assertEqual(2, counters["entries_removed"])
+        self.assertEqual(2, counters["options_cache:miss"])
+        self.assertEqual(1, counters["options_cache:hit"])
+        self.assertEqual(1, counters["expand_field:ENV"])
+
+        timings = parser.stats.timings
+        self.assertEqual(2, timings["parse_section"]["count"])
+        self.assertEqual(3, timings["gen_option_list"]["count"])
+        self.assertEqual(4, timings["handler:_handler_opt_set"]["count"])
+        self.assertEqual(1, timings["handler:_handler_opt_remove"]["count"])
+        self.assertEqual(3, timings["program_option_handler:_program_option_handler_opt_set_bash"]["count"])
+        self.assertGreaterEqual(timings["gen_option_list"]["total"], 0.0)
+
+        data = json.loads(parser.stats.to_json())
+        self.assertEqual(counters, data["counters"])
+        self.assertTrue(data["enabled"])
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser.stats.reset()
+        self.assertDictEqual({}, parser.stats.counters)
+        self.assertDictEqual({}, parser.stats.timings)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptions_event_hooks(self):
+        """
+        Test the event hook and observer API.
+        """
+        print("\n")
+        print("Load file: {}".format(self._filename))
+        parser = SetProgramOptions(self._filename)
+        parser.debug_level = 5
+        parser.exception_control_level = 4
+        parser.exception_control_compact_warnings = False
+
+        class Observer(object):
+
+            def __init__(self):
+                self.events = []
+
+            def on_entry_added(self, parser, section_name, entry):
+                self.events.append(("entry_added", section_name, entry['params'][0]))
+
+            def on_entry_removed(self, parser, section_name, entry):
+                self.events.append(("entry_removed", section_name, entry['params'][0]))
+
+            def on_entry_rendered(self, parser, section_name, entry, generator, line):
+                self.events.append(("entry_rendered", section_name, generator, line))
+
+            def on_section_finalized(self, parser, section_name, options):
+                self.events.append(("section_finalized", section_name, len(options)))
+
+        section = "TEST_OPTION_REMOVAL_VARS_02"
+        print("Section  : {}".format(section))
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        self.assertIsNone(parser._event_hooks)
+        observer = Observer()
+        events = parser.register_observer(observer)
+        self.assertListEqual(list(SetProgramOptions.event_hook_names), events)
+
+        parser.gen_option_list(section, generator="bash")
+        events_expect = [
+            ("entry_added", "TEST_OPTION_REMOVAL_VARIABLES", "-A"),
+            ("entry_added", "TEST_OPTION_REMOVAL_VARIABLES", "-B"),
+            ("entry_added", "TEST_OPTION_REMOVAL_VARIABLES", "-C"),
+            ("entry_removed", section, "-A"),
+            ("entry_removed", section, "-B"),
+            ("section_finalized", section, 1),
+            ("entry_rendered", section, "bash", "-CArg1Arg2Arg3=VALUE_C"),
+        ]
+        self.assertListEqual(events_expect, observer.events)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Plain callbacks can be added and removed.
+        lines = []
+
+        def on_rendered(parser, section_name, entry, generator, line):
+            lines.append(line)
+
+        parser.add_event_hook("entry_rendered", on_rendered)
+        parser.gen_option_list(section, generator="bash")
+        self.assertListEqual(["-CArg1Arg2Arg3=VALUE_C"], lines)
+
+        parser.remove_event_hook("entry_rendered", on_rendered)
+        parser.unregister_observer(observer)
+        self.assertIsNone(parser._event_hooks)
+        parser.gen_option_list(section, generator="bash")
+        self.assertEqual(1, len(lines))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with self.assertRaises(ValueError):
+            parser.add_event_hook("no_such_event", on_rendered)
+        with self.assertRaises(TypeError):
+            parser.add_event_hook("entry_added", None)
+        with self.assertRaises(ValueError):
+            parser.remove_event_hook("entry_added", on_rendered)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptions_section_use_graph(self):
+        """
+        Test ``section_use_graph`` and ``root_sections``.
+        """
+        parser = SetProgramOptions(self._filename)
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        graph = parser.section_use_graph()
+        self.assertListEqual(parser.configparserdata.sections(), list(graph.keys()))
+        self.assertListEqual(["TEST_OPTION_REMOVAL_VARIABLES"], graph["TEST_OPTION_REMOVAL_VARS_01"])
+        uses_expected = [
+            "CMAKE_GENERATOR_NINJA",
+            "TRILINOS_COMMON",
+            "CMAKE_KOKKOS_DEFAULT",
+            "CMAKE_TPETRA_DEFAULT",
+            "CMAKE_MUELU_DEFAULT",
+            "CMAKE_SOURCE_DIR",
+        ]
+        self.assertListEqual(uses_expected, graph["TRILINOS_CONFIGURATION_ALPHA"])
+        self.assertListEqual([], graph["TEST_SECTION"])
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        root_sections = parser.root_sections()
+        self.assertEqual("TRILINOS_CONFIGURATION_ALPHA", root_sections[0])
+        self.assertIn("TEST_OPTION_REMOVAL_VARS_02", root_sections)
+        self.assertNotIn("TRILINOS_COMMON", root_sections)
+        self.assertNotIn("TEST_OPTION_REMOVAL_VARIABLES", root_sections)
+        self.assertNotIn("TEST_VAR_EXPANSION_UPDATE_01", root_sections)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptions_section_operations(self):
+        """
+        Test ``diff_sections`` and the virtual sections created by ``section_union``,
+        ``section_intersection`` and ``section_difference``.
+        """
+        parser = SetProgramOptions(self._filename)
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        diff = parser.diff_sections("TEST_OPTION_REMOVAL_VARIABLES", "TEST_OPTION_REMOVAL_VARS_02")
+        print(diff.as_text())
+        self.assertTrue(diff)
+        self.assertFalse(diff.identical)
+        self.assertEqual(
+            [["-A", "Param1", "Param2", "Param3"], ["-B", "Param4", "Param5", "Param6"]],
+            [entry['params'] for entry in diff.only_a]
+        )
+        self.assertEqual([], diff.only_b)
+        self.assertEqual(["VALUE_C"], [entry['value'] for entry in diff.common])
+        self.assertIn("- opt-set -A Param1 Param2 Param3 : VALUE_A", diff.as_text())
+
+        diff = parser.diff_sections(
+            "TEST_OPTION_REMOVAL_VARS_01", "TEST_OPTION_REMOVAL_VARS_01", generator="bash"
+        )
+        self.assertTrue(diff.identical)
+        self.assertEqual(["-BParam4Param5Param6=VALUE_B", "-CArg1Arg2Arg3=VALUE_C"], diff.common)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        union = parser.section_union("TEST_OPTION_REMOVAL_VARS_02", "TEST_OPTION_REMOVAL_VARS_01")
+        self.assertEqual("TEST_OPTION_REMOVAL_VARS_02 | TEST_OPTION_REMOVAL_VARS_01", union)
+        self.assertListEqual(
+            ["-CArg1Arg2Arg3=VALUE_C", "-BParam4Param5Param6=VALUE_B"], parser.gen_option_list(union)
+        )
+
+        intersection = parser.section_intersection(
+            "TEST_OPTION_REMOVAL_VARIABLES", "TEST_OPTION_REMOVAL_VARS_01"
+        )
+        self.assertListEqual(
+            ["-BParam4Param5Param6=VALUE_B", "-CArg1Arg2Arg3=VALUE_C"], parser.gen_option_list(intersection)
+        )
+
+        # Virtual sections can be used as operands.
+        difference = parser.section_difference("TEST_OPTION_REMOVAL_VARIABLES", intersection, name="ONLY_A")
+        self.assertEqual("ONLY_A", difference)
+        self.assertListEqual(["-AParam1Param2Param3=VALUE_A"], parser.gen_option_list(difference))
+
+        # The virtual section has copies of the entries.
+        parser.options[difference][0]['params'].append("Param4")
+        self.assertEqual(
+            ["-A", "Param1", "Param2", "Param3"],
+            parser.options["TEST_OPTION_REMOVAL_VARIABLES"][0]['params']
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptions_section_fingerprint(self):
+        """
+        Test that ``section_fingerprint`` depends on the resolved options only and is memoized.
+        """
+        parser = SetProgramOptions(self._filename)
+        section = "TEST_OPTION_REMOVAL_VARS_01"
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        fingerprint = parser.section_fingerprint(section)
+        fingerprint_bash = parser.section_fingerprint(section, generator="bash")
+        print(fingerprint, fingerprint_bash)
+        self.assertEqual(64, len(fingerprint))
+        self.assertNotEqual(fingerprint, fingerprint_bash)
+        self.assertNotEqual(fingerprint, parser.section_fingerprint("TEST_OPTION_REMOVAL_VARS_02"))
+
+        # Stable across parsers.
+        self.assertEqual(fingerprint, SetProgramOptions(self._filename).section_fingerprint(section))
+        self.assertEqual(
+            fingerprint_bash,
+            SetProgramOptions(self._filename).section_fingerprint(section, generator="bash")
+        )
+
+        # Sections with the same options have the same fingerprint, regardless of `use`.
+        self.assertEqual(
+            parser.section_fingerprint("CMAKE_GENERATOR_NINJA"),
+            parser.section_fingerprint("TEST_FINGERPRINT_FLAT")
+        )
+        virtual_section = parser.section_difference(
+            "TEST_OPTION_REMOVAL_VARIABLES", "TEST_OPTION_REMOVAL_VARS_02"
+        )
+        self.assertNotEqual(fingerprint, parser.section_fingerprint(virtual_section))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Memoized fingerprints do not parse the section again.
+        del parser.options[section]
+        self.assertEqual(fingerprint, parser.section_fingerprint(section))
+        self.assertEqual(fingerprint_bash, parser.section_fingerprint(section, generator="bash"))
+        self.assertNotIn(section, parser.options)
+
+        # The source digests of used sections are shared.
+        digests = parser._section_source_digest_cache[1]
+        self.assertIn("TEST_OPTION_REMOVAL_VARIABLES", digests)
+        self.assertNotEqual(digests["TEST_OPTION_REMOVAL_VARS_01"], digests["TEST_OPTION_REMOVAL_VARS_02"])
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptions_compact_options(self):
+        """
+        Test that ``compact_options`` keeps the entries that the bash generator renders.
+        """
+        section = "TEST_COMPACT_OPTIONS"
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser = SetProgramOptions(self._filename)
+        self.assertFalse(parser.compact_options)
+        self.assertListEqual(["cmake", "-G=Ninja", "cmake", "-G=Ninja"], parser.gen_option_list(section))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser = SetProgramOptions(self._filename)
+        parser.compact_options = True
+        parser.stats.enabled = True
+        self.assertListEqual(["cmake", "-G=Ninja", "cmake", "-G=Ninja"], parser.gen_option_list(section))
+        self.assertEqual(0, parser.stats.counters["entries_compacted"])
+
+        entries = [
+            {'type': ["opt_set"], 'params': ["-A"], 'value': "1"},
+            {'type': ["opt_set"], 'params': ["-A"], 'value': "1"},
+            {'type': ["opt_set"], 'params': ["-B"], 'value': "${HOME|ENV}"},
+        ]
+        self.assertListEqual(entries, parser._compact_option_entries(entries, "bash"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptions_entry_filter(self):
+        """
+        Test that ``gen_option_list`` and ``iter_option_list`` only render the entries
+        selected by an ``entry_filter``.
+        """
+        section = "TEST_OPTION_REMOVAL_VARIABLES"
+        parser = SetProgramOptions(self._filename)
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        option_list = parser.gen_option_list(section, entry_filter="-B*")
+        self.assertListEqual(["-BParam4Param5Param6=VALUE_B"], option_list)
+        self.assertListEqual(
+            ["-AParam1Param2Param3=VALUE_A", "-BParam4Param5Param6=VALUE_B"],
+            parser.gen_option_list(section, entry_filter=re.compile("Param[25]"))
+        )
+        self.assertListEqual(
+            ["-CArg1Arg2Arg3=VALUE_C"],
+            parser.gen_option_list(section, entry_filter=lambda entry: entry['value'] == "VALUE_C")
+        )
+        self.assertListEqual(
+            ["-AParam1Param2Param3=VALUE_A", "-CArg1Arg2Arg3=VALUE_C"],
+            parser.gen_option_list(section, entry_filter=OptionFilter(params="Param5", exclude=True))
+        )
+        option_list = parser.gen_option_list(section, entry_filter=OptionFilter(op="opt-set-cmake-var"))
+        self.assertListEqual([], option_list)
+        self.assertListEqual(
+            parser.gen_option_list(section),
+            parser.gen_option_list(section, entry_filter=OptionFilter(op="opt-*"))
+        )
+        with self.assertRaises(TypeError):
+            parser.gen_option_list(section, entry_filter=42)
+        with self.assertRaises(TypeError):
+            OptionFilter(predicate="-A*")
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        option_iter = parser.iter_option_list(section, entry_filter=OptionFilter(name="-[AC]*"))
+        self.assertEqual("-AParam1Param2Param3=VALUE_A", next(option_iter))
+        self.assertListEqual(["-CArg1Arg2Arg3=VALUE_C"], list(option_iter))
+
+        # Statistics and event hooks only see the selected entries.
+        parser.stats.enabled = True
+        rendered = []
+        parser.add_event_hook("entry_rendered", lambda parser, section, **data: rendered.append(data["line"]))
+        option_list = list(parser.iter_option_list(section, "bash", "-B*"))
+        self.assertListEqual(["-BParam4Param5Param6=VALUE_B"], option_list)
+        self.assertListEqual(["-BParam4Param5Param6=VALUE_B"], rendered)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptions_lazy_options(self):
+        """
+        Test that :py:attr:`options` has all the sections of the ``.ini`` file as keys
+        and only parses a section when its entries are looked up.
+        """
+        section = "TEST_OPTION_REMOVAL_VARS_01"
+        parser = SetProgramOptions(self._filename)
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        self.assertIsInstance(parser.options, LazyOptions)
+        self.assertEqual(parser.configparserdata.sections(), list(parser.options))
+        self.assertEqual(len(parser.configparserdata.sections()), len(parser.options))
+        self.assertIn(section, parser.options)
+        self.assertNotIn("NOT_A_SECTION", parser.options)
+        self.assertEqual([], parser.options.loaded)
+
+        entries = parser.options[section]
+        self.assertEqual([section], parser.options.loaded)
+        self.assertIs(entries, parser.options[section])
+        self.assertEqual(["-B", "-C"], [entry['params'][0] for entry in entries])
+        self.assertFalse(parser.options.modified)
+        with self.assertRaises(KeyError):
+            parser.options["NOT_A_SECTION"]
+
+        # The keys come from `configparserdata`, the section index is not built for them.
+        parser.gen_option_list(section)
+        self.assertIsNone(parser._section_index_cache)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Used sections are parsed with the section if prefetching is enabled.
+        parser.prefetch_used_sections = True
+        parser.options["TEST_OPTION_REMOVAL_VARS_02"]
+        self.assertEqual(
+            [section, "TEST_OPTION_REMOVAL_VARS_02", "TEST_OPTION_REMOVAL_VARIABLES"], parser.options.loaded
+        )
+
+        # Deleted sections are left out until they are parsed again.
+        del parser.options[section]
+        self.assertTrue(parser.options.modified)
+        self.assertNotIn(section, parser.options)
+        self.assertNotIn(section, list(parser.options))
+        with self.assertRaises(KeyError):
+            parser.options[section]
+        option_list = parser.gen_option_list(section)
+        self.assertEqual(["-BParam4Param5Param6=VALUE_B", "-CArg1Arg2Arg3=VALUE_C"], option_list)
+        self.assertIn(section, parser.options)
+        self.assertFalse(parser.options.modified)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Assigned sections are kept as they are, including sections that are not in the file.
+        parser.options["VIRTUAL_SECTION"] = [{'type': ['opt_set'], 'params': ['-X'], 'value': None}]
+        self.assertEqual("VIRTUAL_SECTION", list(parser.options)[-1])
+        self.assertEqual(["-X"], parser.gen_option_list("VIRTUAL_SECTION"))
+        self.assertTrue(parser.options.modified)
+        del parser.options["VIRTUAL_SECTION"]
+        self.assertFalse(parser.options.modified)
+
+        # A plain dict is used as-is.
+        parser.options = {}
+        self.assertEqual({}, parser.options)
+        option_list = parser.gen_option_list(section)
+        self.assertEqual(["-BParam4Param5Param6=VALUE_B", "-CArg1Arg2Arg3=VALUE_C"], option_list)
+        self.assertEqual([section], list(parser.options.keys()))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
 
 
 class SetProgramOptionsTestCommon(TestCase):
@@ -650,6 +1097,99 @@ class SetProgramOptionsTestCommon(TestCase):
         print("OK")
         return 0
 
+    def test_common_LazyMessage(self):
+        """
+        Test that ``LazyMessage`` is only formatted when converted to a string.
+        """
+        from setprogramoptions.common import LazyMessage
+
+        calls = []
+
+        def build():
+            calls.append(1)
+            return "built"
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        message = LazyMessage(build)
+        self.assertEqual(0, len(calls))
+        self.assertEqual("built", str(message))
+        self.assertEqual("built", str(message))
+        self.assertEqual(1, len(calls))
+        self.assertEqual("a `b` 3", str(LazyMessage("a `%s` %d", "b", 3)))
+        self.assertEqual("100%", str(LazyMessage("100%")))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_common_exception_control_event_enabled(self):
+        """
+        Test ``exception_control_event_enabled`` against the exception control settings.
+        """
+        from setprogramoptions.common import exception_control_event_enabled
+
+        parser = SetProgramOptions()
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser.exception_control_level = 5
+        self.assertTrue(exception_control_event_enabled(parser, "SILENT"))
+        self.assertTrue(exception_control_event_enabled(parser, "WARNING"))
+
+        parser.exception_control_level = 4
+        self.assertFalse(exception_control_event_enabled(parser, "SILENT"))
+        self.assertTrue(exception_control_event_enabled(parser, "WARNING"))
+        self.assertTrue(exception_control_event_enabled(parser, "MINOR"))
+
+        parser.exception_control_silent_warnings = True
+        self.assertFalse(exception_control_event_enabled(parser, "WARNING"))
+        self.assertTrue(exception_control_event_enabled(parser, "MINOR"))
+
+        parser.exception_control_silent_warnings = False
+        parser.exception_control_level = 0
+        self.assertFalse(exception_control_event_enabled(parser, "WARNING"))
+        self.assertTrue(exception_control_event_enabled(parser, "CATASTROPHIC"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_common_debug_message_lazy(self):
+        """
+        Test that ``_debug_message_lazy`` either prints or logs formatted messages
+        and does not format suppressed messages.
+        """
+        parser = SetProgramOptions()
+        calls = []
+
+        def build():
+            calls.append(1)
+            return "built"
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser.debug_level = 0
+        parser._debug_message_lazy(2, build)
+        self.assertEqual(0, len(calls))
+
+        parser.debug_level = 2
+        with io.StringIO() as m_stdout:
+            with contextlib.redirect_stdout(m_stdout):
+                with self.assertRaises(AssertionError):
+                    with self.assertLogs("setprogramoptions", level="DEBUG"):
+                        parser._debug_message_lazy(2, "remove `%s`", "KEY")
+            self.assertEqual(1, m_stdout.getvalue().count("remove `KEY`"))
+            self.assertIn("[D-2] remove `KEY`", m_stdout.getvalue())
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser.debug_level = 0
+        with self.assertLogs("setprogramoptions", level="DEBUG") as m_logs:
+            parser._debug_message_lazy(2, "remove `%s`", "KEY")
+        self.assertIn("remove `KEY`", m_logs.output[0])
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
 
 
 #
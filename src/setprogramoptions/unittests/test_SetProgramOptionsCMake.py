@@ -67,6 +67,11 @@ from mock import MagicMock
 from mock import patch
 
 import filecmp
+import hashlib
+import json
+import re
+import shlex
+import tempfile
 from textwrap import dedent
 
 try:
@@ -75,6 +80,7 @@ except ImportError:
     from io import StringIO
 
 from setprogramoptions import *
+from setprogramoptions.common import join_option_list
 
 from .common import *
 
@@ -742,6 +748,843 @@ class SetProgramOptionsTestCMake(TestCase):
         print("OK")
         return 0
 
+    def test_SetProgramOptionsCMake_gen_option_list_bash_spill_below_threshold(self):
+        """
+        Test that ``gen_option_list_bash_spill`` returns the regular ``bash``
+        option list and writes no script when the threshold is not exceeded.
+        """
+        parser = self._create_standard_parser()
+        section = "TRILINOS_CONFIGURATION_ALPHA"
+        print("Section  : {}".format(section))
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_script = os.path.join(tmpdir, "initial-cache.cmake")
+            option_list_actual = parser.gen_option_list_bash_spill(section, cache_script)
+            option_list_expect = parser.gen_option_list(section, generator="bash")
+            self.assertListEqual(option_list_expect, option_list_actual)
+            self.assertFalse(os.path.exists(cache_script))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_gen_option_list_bash_spill_above_threshold(self):
+        """
+        Test that ``gen_option_list_bash_spill`` moves the ``-D`` options into
+        an initial-cache script when the threshold is exceeded.
+        """
+        parser = self._create_standard_parser()
+        section = "TRILINOS_CONFIGURATION_ALPHA"
+        print("Section  : {}".format(section))
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_script = os.path.join(tmpdir, "initial-cache.cmake")
+            option_list_actual = parser.gen_option_list_bash_spill(section, cache_script, threshold=0)
+            option_list_expect = [
+                'cmake',
+                '-G=Ninja',
+                '-C ' + cache_script,
+                '/path/to/source/dir',
+            ]
+            self.assertListEqual(option_list_expect, option_list_actual)
+
+            with open(cache_script, "r") as ifp:
+                cache_lines = [x for x in ifp.read().splitlines() if not x.startswith("#")]
+
+            cache_lines_expect = [
+                'set(Trilinos_ENABLE_COMPLEX ON CACHE BOOL "from .ini configuration" FORCE)',
+                'set(Trilinos_ENABLE_THREAD_SAFE ON CACHE BOOL "from .ini configuration" FORCE)',
+                'set(Trilinos_ENABLE_Kokkos ON CACHE BOOL "from .ini configuration" FORCE)',
+                'set(Trilinos_ENABLE_KokkosCore ON CACHE BOOL "from .ini configuration" FORCE)',
+                'set(Trilinos_ENABLE_KokkosKernels ON CACHE BOOL "from .ini configuration" FORCE)',
+                'set(KokkosKernels_ENABLE_EXAMPLES ON CACHE BOOL "from .ini configuration" FORCE)',
+                'set(Trilinos_ENABLE_Tpetra ON CACHE BOOL "from .ini configuration" FORCE)',
+                'set(Tpetra_INST_DOUBLE ON CACHE BOOL "from .ini configuration" FORCE)',
+            ]
+            self.assertListEqual(cache_lines_expect, cache_lines)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # The `bash_spill_threshold` property is used when no threshold is given.
+        parser.bash_spill_threshold = 0
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_script = os.path.join(tmpdir, "initial-cache.cmake")
+            option_list_actual = parser.gen_option_list_bash_spill(section, cache_script)
+            self.assertIn('-C ' + cache_script, option_list_actual)
+            self.assertTrue(os.path.exists(cache_script))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_gen_option_list_bash_spill_cache_state(self):
+        """
+        Test that the ``-D`` options and the ``-C`` initial-cache script of
+        ``gen_option_list_bash_spill`` result in the same CMake cache for sections
+        with ``CACHE``, ``FORCE`` and non-cache entries, and that the warnings are
+        only reported once.
+        """
+        sections = ["TEST_COMPACT_OPTIONS", "TEST_CMAKE_CACHE_PARAM_ORDER", "TEST_STRING_DOUBLE_QUOTES"]
+
+        for section in sections:
+            print("Section  : {}".format(section))
+
+            print("-----[ TEST BEGIN ]----------------------------------------")
+            parser = self._create_standard_parser()
+            with io.StringIO() as m_stdout:
+                with contextlib.redirect_stdout(m_stdout):
+                    option_list_inline = parser.gen_option_list(section, generator="bash")
+                warnings_inline = m_stdout.getvalue().count("EXCEPTION SKIPPED")
+
+            parser = self._create_standard_parser()
+            with tempfile.TemporaryDirectory() as tmpdir:
+                cache_script = os.path.join(tmpdir, "initial-cache.cmake")
+                with io.StringIO() as m_stdout:
+                    with contextlib.redirect_stdout(m_stdout):
+                        option_list_spill = parser.gen_option_list_bash_spill(
+                            section, cache_script, threshold=0
+                        )
+                    warnings_spill = m_stdout.getvalue().count("EXCEPTION SKIPPED")
+                with open(cache_script, "r") as ifp:
+                    cache_text = ifp.read()
+            print(cache_text)
+
+            self.assertFalse(parser.exception_control_silent_warnings)
+            self.assertEqual(warnings_inline, warnings_spill)
+            self.assertListEqual(
+                [line for line in option_list_inline if not line.startswith("-D")],
+                [line for line in option_list_spill if not line.startswith("-C ")],
+            )
+            self.assertIn('-C ' + cache_script, option_list_spill)
+
+            cache_inline = self._cmake_cache_from_bash(option_list_inline)
+            cache_spill = self._cmake_cache_from_initial_cache_script(cache_text)
+            pprint(cache_inline)
+            self.assertNotEqual({}, cache_inline)
+            self.assertDictEqual(cache_inline, cache_spill)
+            print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_gen_option_list_cmake_initial_cache_skips_like_bash(self):
+        """
+        Test that the ``cmake_initial_cache`` generator skips the same entries
+        as the ``bash`` generator.
+        """
+        parser = self._create_standard_parser()
+        section = "TEST_CMAKE_CACHE_PARAM_ORDER"
+        print("Section  : {}".format(section))
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        option_list_actual = parser.gen_option_list(section, generator="cmake_initial_cache")
+        option_list_expect = [
+            'set(CMAKE_VAR_A ON CACHE STRING "from .ini configuration" FORCE)',
+            'set(CMAKE_VAR_C ON CACHE BOOL "from .ini configuration" FORCE)',
+            'set(CMAKE_VAR_D ON CACHE BOOL "from .ini configuration" FORCE)',
+            'set(CMAKE_VAR_E ON CACHE BOOL "from .ini configuration" FORCE)',
+        ]
+        self.assertListEqual(option_list_expect, option_list_actual)
+        self.assertEqual(len(parser.gen_option_list(section, generator="bash")), len(option_list_actual))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+
+    def test_SetProgramOptionsCMake_CMakeSymbolTable(self):
+        """
+        Test the CMake ``set()`` semantics of ``CMakeSymbolTable``.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # CACHE vars are only changed by FORCE
+        symbols = CMakeSymbolTable()
+        self.assertTrue(symbols.set("A", "1", cache=True))
+        self.assertFalse(symbols.set("A", "2", cache=True))
+        self.assertEqual("1", symbols["A"])
+        self.assertTrue(symbols.set("A", "3", cache=True, force=True))
+        self.assertEqual("3", symbols["A"])
+        self.assertTrue(symbols.has_cache_var("A"))
+        self.assertFalse(symbols.has_normal_var("A"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Normal vars shadow CACHE vars
+        symbols.set("A", "normal")
+        self.assertEqual("normal", symbols["A"])
+        self.assertEqual("normal", symbols.get("A"))
+        self.assertIsNone(symbols.get("B"))
+        with self.assertRaises(KeyError):
+            symbols["B"]
+        del symbols["A"]
+        self.assertNotIn("A", symbols)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # PARENT_SCOPE is ignored at the top-level scope and only sets the parent otherwise
+        self.assertFalse(symbols.set("P", "top", parent_scope=True))
+        self.assertNotIn("P", symbols)
+        symbols.push_scope()
+        self.assertTrue(symbols.set("P", "parent", parent_scope=True))
+        symbols.set("P", "child")
+        self.assertEqual("child", symbols["P"])
+        symbols.pop_scope()
+        self.assertEqual("parent", symbols["P"])
+        with self.assertRaises(IndexError):
+            symbols.pop_scope()
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Snapshot / restore
+        symbols = CMakeSymbolTable(cache={"A": "1"}, normal={"N": "n"})
+        snapshot = symbols.snapshot()
+        symbols["A"] = "2"
+        symbols.set("N", "m")
+        symbols.set("C", "c", cache=True)
+        self.assertEqual({"A": "2", "N": "m", "C": "c"}, dict(symbols))
+        symbols.restore(snapshot)
+        self.assertEqual({"A": "1", "N": "n"}, dict(symbols))
+        symbols["A"] = "3"
+        symbols.restore(snapshot)
+        self.assertEqual("1", symbols["A"])
+        self.assertEqual(2, len(symbols))
+        with self.assertRaises(TypeError):
+            symbols.restore({})
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_seed_cmake_symbols_from_sections(self):
+        """
+        Test that ``seed_cmake_symbols`` lets the bash generator resolve
+        CMake variables defined in other sections.
+        """
+        parser = self._create_standard_parser()
+        section = "TEST_CMAKE_VAR_IN_BASH_GENERATOR"
+        print("Section  : {}".format(section))
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        symbols = parser.seed_cmake_symbols(sections=["TEST_CMAKE_SYMBOL_SEED"])
+        self.assertEqual('VAE', symbols["FOO_VAE"])
+        self.assertTrue(symbols.has_cache_var("FOO_VAE"))
+        self.assertEqual('NORMAL', symbols["BAR_NORMAL"])
+        self.assertFalse(symbols.has_cache_var("BAR_NORMAL"))
+        self.assertNotIn("BAZ_PARENT", symbols)
+
+        option_list_expect = ['-DFOO_VAR:STRING="FOO"', '-DFOO_VAR:STRING="BAR VAE"']
+        option_list_actual = parser.gen_option_list(section, generator='bash')
+        self.assertListEqual(option_list_expect, option_list_actual)
+
+        # The seed is restored by every call to gen_option_list
+        option_list_actual = parser.gen_option_list(section, generator='bash')
+        self.assertListEqual(option_list_expect, option_list_actual)
+        self.assertNotIn("FOO_VAR", parser.seed_cmake_symbols(sections=["TEST_CMAKE_SYMBOL_SEED"]))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Clearing the seed restores the original behaviour
+        parser.seed_cmake_symbols()
+        with self.assertRaises(ValueError):
+            parser.gen_option_list(section, generator='bash')
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_seed_cmake_symbols_from_mapping(self):
+        """
+        Test that ``seed_cmake_symbols`` accepts an external mapping of
+        CMake cache variables.
+        """
+        parser = self._create_standard_parser()
+        section = "TEST_CMAKE_VAR_IN_BASH_GENERATOR"
+        print("Section  : {}".format(section))
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser.seed_cmake_symbols(mapping={"FOO_VAE": "VAE"})
+        option_list_expect = ['-DFOO_VAR:STRING="FOO"', '-DFOO_VAR:STRING="BAR VAE"']
+        option_list_actual = parser.gen_option_list(section, generator='bash')
+        self.assertListEqual(option_list_expect, option_list_actual)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Seeded variables are already in the CMake cache so a non-FORCE
+        # assignment does not change them (and generates no `-D` option).
+        section = "TEST_VAR_EXPANSION_UPDATE_02"
+        print("Section  : {}".format(section))
+        parser.seed_cmake_symbols(mapping={"CMAKE_F90_FLAGS": "-f90"})
+        option_list_expect = [
+            'cmake',
+            '-DCMAKE_CXX_FLAGS:STRING="${LDFLAGS} -foo"',
+        ]
+        option_list_actual = parser.gen_option_list(section, generator='bash')
+        self.assertListEqual(option_list_expect, option_list_actual)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_stats(self):
+        """
+        Test the ``stats`` counters that are specific to ``SetProgramOptionsCMake``.
+        """
+        parser = self._create_standard_parser()
+        parser.stats.enabled = True
+        section = "TEST_VAR_EXPANSION_UPDATE_03"
+        print("Section  : {}".format(section))
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser.gen_option_list(section, generator="bash")
+        counters = parser.stats.counters
+        timings = parser.stats.timings
+        self.assertEqual(3, timings["handler:_handler_opt_set_cmake_var"]["count"])
+        self.assertIn("program_option_handler:_program_option_handler_opt_set_cmake_var_bash", timings)
+        self.assertEqual(2, counters["var_cache:hit"])
+        self.assertNotIn("var_cache:miss", counters)
+        self.assertEqual(2, counters["expand_field:CMAKE"])
+        self.assertEqual(1, counters["expand_field:ENV"])
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_collect_warnings(self):
+        """
+        Test that ``collect_warnings`` replaces the per-event warnings of the
+        bash generator with a single summary.
+        """
+        parser = self._create_standard_parser()
+        section = "TEST_CMAKE_CACHE_PARAM_ORDER"
+        print("Section  : {}".format(section))
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        parser.collect_warnings = True
+        with io.StringIO() as m_stdout:
+            with contextlib.redirect_stdout(m_stdout):
+                option_list_actual = parser.gen_option_list(section, generator="bash")
+            output = m_stdout.getvalue()
+
+        self.assertEqual(4, len(option_list_actual))
+        self.assertNotIn("EXCEPTION SKIPPED", output)
+        self.assertEqual(1, output.count("warning(s)"))
+        self.assertIn("`TEST_CMAKE_CACHE_PARAM_ORDER` (bash)", output)
+
+        collected = [(w.category, w.varname) for w in parser.collected_warnings]
+        self.assertListEqual(
+            [
+                ("bash_skip_non_cache", "CMAKE_VAR_B"),
+                ("parent_scope_with_cache_type", "CMAKE_VAR_F"),
+                ("bash_skip_non_cache", "CMAKE_VAR_F"),
+                ("parent_scope_with_cache_type", "CMAKE_VAR_G"),
+                ("bash_skip_non_cache", "CMAKE_VAR_G"),
+            ],
+            collected
+        )
+        self.assertIn("CMAKE_VAR_B=ON", parser.collected_warnings[0].message)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Each call to gen_option_list starts a new collection.
+        parser.exception_control_silent_warnings = True
+        with io.StringIO() as m_stdout:
+            with contextlib.redirect_stdout(m_stdout):
+                parser.gen_option_list(section, generator="bash")
+            self.assertEqual("", m_stdout.getvalue())
+        self.assertEqual(5, len(parser.collected_warnings))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Warnings outside of a collection are not collected, the events are generated as usual.
+        parser.exception_control_silent_warnings = False
+        generator = get_generator("bash")(parser)
+        with io.StringIO() as m_stdout:
+            with contextlib.redirect_stdout(m_stdout):
+                for entry in parser.options[section]:
+                    generator.render_entry(entry)
+            output = m_stdout.getvalue()
+        self.assertIn("EXCEPTION SKIPPED", output)
+        self.assertNotIn("warning(s)", output)
+        self.assertEqual(5, len(parser.collected_warnings))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Warnings that are raised as exceptions are not collected.
+        parser.exception_control_level = 5
+        with self.assertRaises(ValueError):
+            parser.gen_option_list(section, generator="bash")
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_WarningCollector(self):
+        """
+        Test that ``WarningCollector`` deduplicates warnings by category and variable.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        collector = WarningCollector(max_names=2)
+        for varname in ["A", "B", "A", "C", "A"]:
+            collector.add("category_1", varname, f"message {varname}")
+        collector.add("category_2", "A", "other message")
+
+        self.assertEqual(4, len(collector))
+        records = collector.records
+        self.assertEqual(("category_1", "A", 3), (records[0].category, records[0].varname, records[0].count))
+        self.assertEqual("message A", records[0].message)
+        self.assertEqual("category_2", records[-1].as_dict()["category"])
+
+        summary = collector.summary("`SECTION` (bash)")
+        self.assertIn("6 warning(s) (4 unique) collected while generating `SECTION` (bash)", summary)
+        self.assertIn("category_1: 3 variable(s), 5 occurrence(s): `A`, `B`, ... (+1 more)", summary)
+
+        collector.clear()
+        self.assertEqual(0, len(collector))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_export_sections(self):
+        """
+        Test that ``export_sections`` writes files atomically, skips unchanged files
+        and records their digests in the manifest.
+        """
+        parser = self._create_standard_parser(debug_level=0)
+        parser.exception_control_silent_warnings = True
+        sections = [
+            "TRILINOS_CONFIGURATION_ALPHA",
+            "TEST_CMAKE_VAR_REMOVE",
+            "TEST_CMAKE_FAIL_ON_PARENT_SCOPE_AND_FORCE"
+        ]
+
+        with tempfile.TemporaryDirectory() as out_dir:
+            print("-----[ TEST BEGIN ]----------------------------------------")
+            result = parser.export_sections(out_dir, sections=sections, workers=1)
+            print(result)
+            self.assertEqual(4, len(result.written))
+            self.assertEqual([], result.unchanged)
+            errors_expected = [
+                ("TEST_CMAKE_FAIL_ON_PARENT_SCOPE_AND_FORCE", "bash"),
+                ("TEST_CMAKE_FAIL_ON_PARENT_SCOPE_AND_FORCE", "cmake_fragment"),
+            ]
+            self.assertEqual(errors_expected, sorted(result.errors))
+            files_expected = [
+                "TEST_CMAKE_VAR_REMOVE.cmake",
+                "TEST_CMAKE_VAR_REMOVE.sh",
+                "TRILINOS_CONFIGURATION_ALPHA.cmake",
+                "TRILINOS_CONFIGURATION_ALPHA.sh",
+                "manifest.json",
+            ]
+            self.assertEqual(files_expected, sorted(os.listdir(out_dir)))
+
+            with open(os.path.join(out_dir, "TRILINOS_CONFIGURATION_ALPHA.cmake"), "r") as ifp:
+                self.assertEqual(
+                    "\n".join(parser.gen_option_list("TRILINOS_CONFIGURATION_ALPHA", "cmake_fragment")) +
+                    "\n",
+                    ifp.read()
+                )
+
+            with open(os.path.join(out_dir, "manifest.json"), "r") as ifp:
+                manifest = json.load(ifp)
+            self.assertEqual(result.manifest, manifest)
+            entry = manifest["files"]["TEST_CMAKE_VAR_REMOVE.sh"]
+            self.assertEqual("TEST_CMAKE_VAR_REMOVE", entry["section"])
+            self.assertEqual("bash", entry["generator"])
+            with open(os.path.join(out_dir, "TEST_CMAKE_VAR_REMOVE.sh"), "rb") as ifp:
+                self.assertEqual(hashlib.sha256(ifp.read()).hexdigest(), entry["sha256"])
+
+            # New files get the default mode, not the mode of the temporary file.
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = os.stat(os.path.join(out_dir, "TEST_CMAKE_VAR_REMOVE.sh")).st_mode & 0o777
+            self.assertEqual(0o666 & ~umask, mode)
+            print("-----[ TEST END ]------------------------------------------")
+
+            print("-----[ TEST BEGIN ]----------------------------------------")
+            # Unchanged files are not rewritten by a parallel export.
+            filename = os.path.join(out_dir, "TRILINOS_CONFIGURATION_ALPHA.sh")
+            os.utime(filename, ns=(0, 0))
+            result = parser.export_sections(out_dir, sections=sections, workers=2)
+            print(result)
+            self.assertEqual([], result.written)
+            self.assertEqual(4, len(result.unchanged))
+            self.assertEqual(0, os.stat(filename).st_mtime_ns)
+            print("-----[ TEST END ]------------------------------------------")
+
+            print("-----[ TEST BEGIN ]----------------------------------------")
+            # Exporting a subset keeps the manifest entries of the other sections.
+            with open(filename, "w") as ofp:
+                ofp.write("modified\n")
+            os.chmod(filename, 0o640)
+            result = parser.export_sections(
+                out_dir, sections=["TRILINOS_CONFIGURATION_ALPHA"], generators=["bash"], workers=2
+            )
+            self.assertEqual([filename], result.written)
+            self.assertEqual(5, len(os.listdir(out_dir)))
+            self.assertIn("TEST_CMAKE_VAR_REMOVE.sh", result.manifest["files"])
+            self.assertIn("TRILINOS_CONFIGURATION_ALPHA.cmake", result.manifest["files"])
+            # Rewritten files keep their mode.
+            self.assertEqual(0o640, os.stat(filename).st_mode & 0o777)
+            print("-----[ TEST END ]------------------------------------------")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            print("-----[ TEST BEGIN ]----------------------------------------")
+            # Assigned sections are rendered by this parser, not by workers that don't have them,
+            # and section names that are not file names are reported as errors.
+            out_dir = os.path.join(tmp_dir, "out")
+            parser.options["VIRTUAL_SECTION"] = [{'type': ['opt_set'], 'params': ['-X'], 'value': None}]
+            parser.options["../ESCAPE"] = [{'type': ['opt_set'], 'params': ['-Y'], 'value': None}]
+            result = parser.export_sections(
+                out_dir,
+                sections=["VIRTUAL_SECTION", "../ESCAPE", "TEST_CMAKE_VAR_REMOVE"],
+                generators=["bash"],
+                workers=2
+            )
+            print(result)
+            self.assertEqual([("../ESCAPE", "bash")], list(result.errors))
+            self.assertIn("can not be used as a file name", result.errors[("../ESCAPE", "bash")])
+            self.assertEqual(["out"], os.listdir(tmp_dir))
+            self.assertEqual(
+                ["TEST_CMAKE_VAR_REMOVE.sh", "VIRTUAL_SECTION.sh", "manifest.json"],
+                sorted(os.listdir(out_dir))
+            )
+            with open(os.path.join(out_dir, "VIRTUAL_SECTION.sh"), "r") as ifp:
+                self.assertEqual("-X\n", ifp.read())
+            print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_diff_sections_generator(self):
+        """
+        Test that ``diff_sections`` compares the rendered lines when a generator is given.
+        """
+        parser = self._create_standard_parser(debug_level=0)
+        parser.exception_control_silent_warnings = True
+        section_a = "TEST_VAR_EXPANSION_UPDATE_01"
+        section_b = "TEST_VAR_EXPANSION_UPDATE_03"
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # The entries differ by the FORCE entry, which only renders a new line for bash.
+        diff = parser.diff_sections(section_a, section_b)
+        self.assertEqual([], diff.only_a)
+        self.assertEqual([["CMAKE_CXX_FLAGS", "STRING", "FORCE"]], [entry['params'] for entry in diff.only_b])
+
+        diff = parser.diff_sections(section_a, section_b, generator="bash")
+        print(diff.as_text())
+        self.assertEqual(['-DCMAKE_CXX_FLAGS:STRING="${LDFLAGS} -foo -bif"'], diff.only_b)
+        self.assertEqual(parser.gen_option_list(section_a, "bash"), diff.common)
+
+        # Entries that render no line are left out of virtual sections created with a generator.
+        name = parser.section_difference(section_b, section_a, generator="bash")
+        self.assertEqual(
+            [["CMAKE_CXX_FLAGS", "STRING", "FORCE"]], [entry['params'] for entry in parser.options[name]]
+        )
+        self.assertListEqual(
+            ['set(CMAKE_CXX_FLAGS "${CMAKE_CXX_FLAGS} -bif" CACHE STRING "from .ini configuration" FORCE)'],
+            parser.gen_option_list(name, "cmake_fragment")
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_section_index(self):
+        """
+        Test the ``section_index`` queries.
+        """
+        parser = self._create_standard_parser(debug_level=0)
+        parser.exception_control_silent_warnings = True
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        locations = parser.sections_setting("Trilinos_ENABLE_MueLu")
+        print(locations)
+        self.assertEqual(1, len(locations))
+        self.assertEqual("CMAKE_MUELU_DEFAULT", locations[0].section)
+        self.assertEqual("opt_set_cmake_var", locations[0].operation)
+        self.assertEqual(("Trilinos_ENABLE_MueLu", "BOOL"), locations[0].params)
+        self.assertEqual("ON", locations[0].value)
+        self.assertTrue(os.path.samefile(self._filename, locations[0].filename))
+        with open(self._filename, "r") as ifp:
+            line = ifp.readlines()[locations[0].lineno - 1]
+        self.assertIn("opt-set-cmake-var  Trilinos_ENABLE_MueLu", line)
+
+        removing = parser.sections_removing("MueLu_ENABLE_TESTS")
+        self.assertEqual(
+            [("TRILINOS_CONFIGURATION_ALPHA", ("MueLu", "SUBSTR"))],
+            [(location.section, location.params) for location in removing]
+        )
+        self.assertEqual(2, len(parser.sections_removing("Trilinos_ENABLE_MueLu")))
+
+        references = parser.sections_referencing("CMAKE_CXX_FLAGS", vartype="cmake")
+        self.assertIn(
+            "TEST_VAR_EXPANSION_UPDATE_03", [reference.location.section for reference in references]
+        )
+        self.assertEqual(["ENV"], [reference.vartype for reference in parser.sections_referencing("LDFLAGS")])
+
+        self.assertEqual(
+            ["TEST_VAR_EXPANSION_UPDATE_01", "TEST_VAR_EXPANSION_UPDATE_02", "TEST_VAR_EXPANSION_UPDATE_03"],
+            parser.sections_using("TEST_VAR_EXPANSION_COMMON")
+        )
+        self.assertEqual(
+            ["TEST_VAR_EXPANSION_UPDATE_01", "TEST_VAR_EXPANSION_UPDATE_02"],
+            parser.sections_using("TEST_VAR_EXPANSION_COMMON", transitive=False)
+        )
+        self.assertEqual([], parser.sections_setting("NOT_A_VARIABLE"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # TRILINOS_CONFIGURATION_ALPHA removes Trilinos_ENABLE_MueLu, it is the only section parsed.
+        self.assertEqual([], parser.options.loaded)
+        self.assertEqual(["CMAKE_MUELU_DEFAULT"], parser.configurations_setting("Trilinos_ENABLE_MueLu"))
+        self.assertEqual(
+            ["CMAKE_TPETRA_DEFAULT", "TRILINOS_CONFIGURATION_ALPHA"],
+            parser.configurations_setting("Trilinos_ENABLE_Tpetra")
+        )
+        self.assertEqual(["TRILINOS_CONFIGURATION_ALPHA"], parser.options.loaded)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_compact_options(self):
+        """
+        Test that ``compact_options`` skips the entries that do not change an option list.
+        """
+        section = "TEST_COMPACT_OPTIONS"
+        parser = self._create_standard_parser(debug_level=0)
+        parser.exception_control_silent_warnings = True
+        parser.compact_options = True
+        parser.stats.enabled = True
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # The ``opt-set`` entries generate nothing in a CMake fragment.
+        option_list_expect = [
+            'set(CMAKE_CXX_FLAGS -O2 CACHE STRING "from .ini configuration")',
+            'set(CMAKE_BUILD_TYPE Release CACHE STRING "from .ini configuration")',
+            'set(LOCAL_VAR A)',
+            'set(CMAKE_CXX_FLAGS -O3 CACHE STRING "from .ini configuration")',
+            'set(CMAKE_BUILD_TYPE Debug CACHE STRING "from .ini configuration" FORCE)',
+            'set(LOCAL_VAR B)',
+            'set(CMAKE_CXX_FLAGS "${CMAKE_CXX_FLAGS} -g" CACHE STRING "from .ini configuration" FORCE)',
+        ]
+        self.assertListEqual(option_list_expect, parser.gen_option_list(section, generator="cmake_fragment"))
+        self.assertEqual(4, parser.stats.counters["entries_compacted"])
+
+        # The non-cache entries that bash skips are removed while the warning is silent.
+        option_list_expect = [
+            'cmake',
+            '-G=Ninja',
+            '-DCMAKE_CXX_FLAGS:STRING="-O2"',
+            '-DCMAKE_BUILD_TYPE:STRING="Release"',
+            'cmake',
+            '-G=Ninja',
+            '-DCMAKE_BUILD_TYPE:STRING="Debug"',
+            '-DCMAKE_CXX_FLAGS:STRING="-O2 -g"',
+        ]
+        self.assertListEqual(option_list_expect, parser.gen_option_list(section, generator="bash"))
+        self.assertEqual(6, parser.stats.counters["entries_compacted"])
+
+        # The compacted entries are reused until the warning settings change.
+        parser.gen_option_list(section, generator="bash")
+        self.assertEqual(6, parser.stats.counters["entries_compacted"])
+        parser.exception_control_silent_warnings = False
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertListEqual(option_list_expect, parser.gen_option_list(section, generator="bash"))
+        self.assertEqual(6, parser.stats.counters["entries_compacted"])
+        parser.exception_control_silent_warnings = True
+        self.assertEqual(11, len(parser.options[section]))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Every section of the .ini files renders the same option lists, warnings and
+        # errors with and without ``compact_options``.
+        filenames = [
+            self._filename,
+            find_config_ini(filename="config_test_fastparser.ini"),
+            find_config_ini(filename="example-01.ini"),
+            find_config_ini(filename="example-02.ini"),
+            find_config_ini(filename="example-03.ini"),
+        ]
+
+        def render(parser_class, filename, compact_options, silent_warnings, section_name, generator):
+            parser = parser_class(filename)
+            parser.exception_control_level = 2
+            parser.exception_control_silent_warnings = silent_warnings
+            parser.compact_options = compact_options
+            with io.StringIO() as m_stdout:
+                with contextlib.redirect_stdout(m_stdout):
+                    try:
+                        output = parser.gen_option_list(section_name, generator=generator)
+                    except Exception as exc:
+                        output = (type(exc).__name__, str(exc))
+                messages = [line for line in m_stdout.getvalue().splitlines() if "Message" in line]
+            return output, messages
+
+        for filename in [filename for filename in filenames if filename is not None]:
+            cmake_generators = ["bash", "cmake_fragment", "cmake_initial_cache"]
+            parser_classes = ((SetProgramOptions, ["bash"]), (SetProgramOptionsCMake, cmake_generators))
+            for parser_class, generators in parser_classes:
+                sections = parser_class(filename).configparserdata.sections()
+                for section_name in sections:
+                    for generator in generators:
+                        for silent_warnings in (False, True):
+                            args = (section_name, generator)
+                            label = f"{parser_class.__name__} {os.path.basename(filename)} {args}"
+                            self.assertEqual(
+                                render(parser_class, filename, False, silent_warnings, *args),
+                                render(parser_class, filename, True, silent_warnings, *args),
+                                label
+                            )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Worker processes of ``export_sections`` compact the option lists, too.
+        sections = [section, "TRILINOS_CONFIGURATION_ALPHA"]
+        with tempfile.TemporaryDirectory() as out_dir:
+            parser.export_sections(out_dir, sections=sections, generators=["bash"], workers=2)
+            with open(os.path.join(out_dir, section + ".sh"), "r") as ifp:
+                self.assertEqual(
+                    join_option_list(parser.gen_option_list(section, generator="bash"), "bash") + "\n",
+                    ifp.read()
+                )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_gen_option_lists(self):
+        """
+        Test that ``gen_option_lists`` renders the entries that sections start with once
+        and produces the same option lists as ``gen_option_list``.
+        """
+        sections = [
+            "TEST_VAR_EXPANSION_UPDATE_01",
+            "TEST_VAR_EXPANSION_UPDATE_03",
+            "TEST_VAR_EXPANSION_COMMON",
+            "TEST_COMPACT_OPTIONS",
+            "TEST_COMPACT_OPTIONS_COMMON",
+            "TRILINOS_CONFIGURATION_ALPHA",
+            "CMAKE_GENERATOR_NINJA",
+            "TEST_FINGERPRINT_FLAT",
+        ]
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        for generator in ("bash", "cmake_fragment", "cmake_initial_cache"):
+            parser = self._create_standard_parser(debug_level=0)
+            parser.exception_control_silent_warnings = True
+            expected = {section: parser.gen_option_list(section, generator=generator) for section in sections}
+
+            parser = self._create_standard_parser(debug_level=0)
+            parser.exception_control_silent_warnings = True
+            actual = parser.gen_option_lists(sections + sections[: 2], generator=generator)
+            self.assertEqual(sections, list(actual.keys()))
+            self.assertDictEqual(expected, actual)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # The common entries of TEST_VAR_EXPANSION_UPDATE_01 and _03 are rendered once.
+        parser = self._create_standard_parser(debug_level=0)
+        generator_ref = parser._get_generator("bash")
+        rendered = []
+        render = generator_ref.render
+        generator_ref.render = lambda entries: rendered.append(len(entries)) or render(entries)
+        option_lists = parser.gen_option_lists(sections[: 2], generator="bash")
+        self.assertEqual([3, 1], rendered)
+        self.assertEqual(
+            option_lists["TEST_VAR_EXPANSION_UPDATE_03"],
+            [
+                'cmake',
+                '-DCMAKE_CXX_FLAGS:STRING="${LDFLAGS} -foo"',
+                '-DCMAKE_CXX_FLAGS:STRING="${LDFLAGS} -foo -bif"'
+            ]
+        )
+        self.assertEqual({}, parser.gen_option_lists([]))
+
+        # Entries with equal keys but different dicts (a tuple of params, an extra key)
+        # are a shared run and do not split the sections into the same group again.
+        parser.options["VIRTUAL_A"] = [{'type': ['opt_set'], 'params': ['cmake'], 'value': None}]
+        parser.options["VIRTUAL_B"] = [{'type': ['opt_set'], 'params': ('cmake', ), 'value': None}]
+        parser.options["VIRTUAL_C"] = [{'type': ['opt_set'], 'params': ['cmake'], 'value': None, 'extra': 1}]
+        self.assertEqual(
+            {"VIRTUAL_A": ["cmake"], "VIRTUAL_B": ["cmake"], "VIRTUAL_C": ["cmake"]},
+            parser.gen_option_lists(["VIRTUAL_A", "VIRTUAL_B", "VIRTUAL_C"])
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SetProgramOptionsCMake_entry_filter(self):
+        """
+        Test that ``entry_filter`` matches ``opt-set-cmake-var`` entries by variable name
+        and that the selected entries still resolve variables set by other entries.
+        """
+        parser = self._create_standard_parser(debug_level=0)
+        parser.exception_control_silent_warnings = True
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        section = "TRILINOS_CONFIGURATION_ALPHA"
+        option_list_expect = [
+            '-DTrilinos_ENABLE_COMPLEX:BOOL=ON',
+            '-DTrilinos_ENABLE_THREAD_SAFE:BOOL=ON',
+            '-DTrilinos_ENABLE_Kokkos:BOOL=ON',
+            '-DTrilinos_ENABLE_KokkosCore:BOOL=ON',
+            '-DTrilinos_ENABLE_KokkosKernels:BOOL=ON',
+            '-DTrilinos_ENABLE_Tpetra:BOOL=ON',
+        ]
+        self.assertListEqual(option_list_expect, parser.gen_option_list(section, "bash", "Trilinos_ENABLE_*"))
+        self.assertListEqual(
+            ["cmake", "-G=Ninja", "/path/to/source/dir"],
+            parser.gen_option_list(section, "bash", OptionFilter(op="opt-set"))
+        )
+        self.assertListEqual(
+            ['set(Trilinos_PARALLEL_COMPILE_JOBS_LIMIT 20)', 'set(Trilinos_PARALLEL_LINK_JOBS_LIMIT 4)'],
+            parser.gen_option_list(section, "cmake_fragment", "*_JOBS_LIMIT")
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # The selected entry uses the value of CMAKE_CXX_FLAGS set by the entries before it.
+        section = "TEST_VAR_EXPANSION_UPDATE_03"
+        option_list_expect = ['-DCMAKE_CXX_FLAGS:STRING="${LDFLAGS} -foo -bif"']
+        forced = OptionFilter(params="FORCE")
+        self.assertListEqual(option_list_expect, parser.gen_option_list(section, "bash", forced))
+        self.assertListEqual(option_list_expect, list(parser.iter_option_list(section, "bash", forced)))
+        self.assertListEqual(
+            ['set(CMAKE_CXX_FLAGS "${CMAKE_CXX_FLAGS} -bif" CACHE STRING "from .ini configuration" FORCE)'],
+            parser.gen_option_list(section, "cmake_initial_cache", forced)
+        )
+
+        # Entries that are filtered out generate no warnings, even if they would raise.
+        parser.exception_control_level = 5
+        parser.exception_control_silent_warnings = False
+        section = "TEST_CMAKE_VAR_IN_BASH_GENERATOR"
+        with self.assertRaises(ValueError):
+            parser.gen_option_list(section, "bash")
+        option_list = parser.gen_option_list(section, "bash", lambda entry: "FORCE" not in entry['params'])
+        self.assertListEqual(['-DFOO_VAR:STRING="FOO"'], option_list)
+
+        # The exception control settings of the parser and its formatter are not changed for this.
+        parser._program_option_state(parser.options[section][-1], "bash")
+        self.assertEqual(5, parser.exception_control_level)
+        self.assertFalse(parser.exception_control_silent_warnings)
+        self.assertEqual(5, parser._var_formatter.exception_control_level)
+        self.assertEqual(0, parser._warnings_suppressed)
+
+        # Only the entries that set variables the selected entries depend on are processed.
+        entries = parser.options["TRILINOS_CONFIGURATION_ALPHA"]
+        steps = parser._filter_option_entries(entries, OptionFilter(name="Trilinos_ENABLE_Tpetra"), "bash")
+        self.assertEqual(
+            [("Trilinos_ENABLE_Tpetra", True)], [(entry['params'][0], selected) for entry, selected in steps]
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
 
     def _create_standard_parser(
         self, filename=DEFAULT_VALUE(), debug_level=5, ece_level=4, ece_compact=False
@@ -764,6 +1607,32 @@ class SetProgramOptionsTestCMake(TestCase):
 
         return output
 
+    def _cmake_cache_from_bash(self, option_list):
+        """The CMake cache that the ``-D`` options of a ``bash`` option list create."""
+        symbols = CMakeSymbolTable()
+        for line in option_list:
+            if not line.startswith("-D"):
+                continue
+            name_type, value = line[2 :].split("=", 1)
+            varname, vartype = name_type.split(":", 1)
+            symbols.set(varname, (vartype, shlex.split(value)[0]), cache=True, force=True)
+        return {varname: symbols[varname] for varname in symbols if symbols.has_cache_var(varname)}
+
+    def _cmake_cache_from_initial_cache_script(self, text):
+        """The CMake cache that the ``set()`` commands of an initial-cache script create."""
+        symbols = CMakeSymbolTable()
+        set_re = re.compile(r'^set\((\S+) ("[^"]*"|\S+) CACHE (\S+) "[^"]*"( FORCE)?\)$')
+        var_re = re.compile(r"\$\{(\w+)\}")
+        for line in text.splitlines():
+            if line.startswith("#"):
+                continue
+            match = set_re.match(line)
+            self.assertIsNotNone(match, line)
+            varname, value, vartype, force = match.groups()
+            value = var_re.sub(lambda m: symbols.get(m.group(1), ("", ""))[1], value.strip('"'))
+            symbols.set(varname, (vartype, value), cache=True, force=force is not None)
+        return {varname: symbols[varname] for varname in symbols if symbols.has_cache_var(varname)}
+
     def _execute_parser(self, parser, section):
         output = None
 
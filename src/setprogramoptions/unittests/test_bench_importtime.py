@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import subprocess
+import unittest
+from unittest import TestCase
+
+import setprogramoptions
+from setprogramoptions.bench import importtime
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class BenchImportTimeTest(TestCase):
+    """
+    Tests for lazy package imports and the import time budget check.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        return
+
+    def _run_python(self, code) -> str:
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            env=importtime.package_env()
+        )
+        print(proc.stderr)
+        self.assertEqual(0, proc.returncode)
+        return proc.stdout.strip()
+
+    def test_bench_importtime_package_is_lazy(self):
+        """
+        ``import setprogramoptions`` does not import ``configparserenhanced``.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        check = "print('configparserenhanced' in modules, 'setprogramoptions.SetProgramOptions' in modules)"
+        code = "\n".join(
+            [
+                "import sys",
+                "modules = sys.modules",
+                "import setprogramoptions",
+                check,
+                "setprogramoptions.SetProgramOptionsCMake",
+                check,
+            ]
+        )
+        self.assertEqual("False False\nTrue True", self._run_python(code))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        code = "import sys\nimport setprogramoptions.cli\nprint('configparserenhanced' in sys.modules)"
+        self.assertEqual("False", self._run_python(code))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bench_importtime_package_exports(self):
+        """
+        The lazy exports resolve to the classes in the submodules.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        from setprogramoptions.SetProgramOptionsCMake import CMakeSymbolTable
+        from setprogramoptions.SetProgramOptionsCMake import SetProgramOptionsCMake
+        self.assertIs(SetProgramOptionsCMake, setprogramoptions.SetProgramOptionsCMake)
+        self.assertIs(CMakeSymbolTable, setprogramoptions.CMakeSymbolTable)
+        for name in setprogramoptions.__all__:
+            self.assertTrue(hasattr(setprogramoptions, name), name)
+            self.assertIn(name, dir(setprogramoptions))
+        self.assertIn("server", dir(setprogramoptions))
+        self.assertIs(importtime, setprogramoptions.bench.importtime)
+        with self.assertRaises(AttributeError):
+            setprogramoptions.NoSuchAttribute
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bench_importtime_parse_importtime(self):
+        """
+        ``parse_importtime`` returns the cumulative time of each module.
+        """
+        text = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       137 |        137 |   setprogramoptions.version",
+                "import time:      1461 |       2042 | setprogramoptions",
+                "unrelated line",
+            ]
+        )
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        self.assertEqual(
+            {
+                "setprogramoptions.version": 137, "setprogramoptions": 2042
+            }, importtime.parse_importtime(text)
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bench_importtime_budget(self):
+        """
+        ``measure_import_time`` measures a fresh interpreter and ``check_budget`` compares it.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        result = importtime.measure_import_time("setprogramoptions", repeat=2)
+        print(result["min_us"])
+        self.assertEqual(2, len(result["samples_us"]))
+        self.assertEqual(min(result["samples_us"]), result["min_us"])
+        self.assertIn("setprogramoptions.version", result["modules"])
+        self.assertNotIn("configparserenhanced", result["modules"])
+        self.assertTrue(importtime.check_budget(result, 10000.0))
+        self.assertFalse(importtime.check_budget(result, 0.0))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with self.assertRaises(RuntimeError):
+            importtime.measure_import_time("setprogramoptions.no_such_module", repeat=1)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bench_importtime_package_modules_budget(self):
+        """
+        The parsers do not import the modules of the optional features.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        result = importtime.measure_import_time("setprogramoptions.SetProgramOptions", repeat=1)
+        modules = importtime.package_modules(result)
+        print(modules)
+        self.assertEqual(
+            [
+                "setprogramoptions",
+                "setprogramoptions.SetProgramOptions",
+                "setprogramoptions.common",
+                "setprogramoptions.version",
+            ],
+            modules
+        )
+        self.assertTrue(importtime.check_budget(result, max_package_modules=4))
+        self.assertFalse(importtime.check_budget(result, max_package_modules=3))
+        self.assertEqual(
+            0,
+            importtime.main(
+                ["-m", "setprogramoptions.SetProgramOptions", "--repeat", "1", "--max-package-modules", "4"]
+            )
+        )
+        self.assertEqual(
+            1,
+            importtime.main(
+                ["-m", "setprogramoptions.SetProgramOptions", "--repeat", "1", "--max-package-modules", "3"]
+            )
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        result = importtime.measure_import_time("setprogramoptions.SetProgramOptionsCMake", repeat=1)
+        feature_modules = [
+            "FastParser",
+            "Generator",
+            "LazyOptions",
+            "OptionFilter",
+            "ParserStats",
+            "RenderPlan",
+            "SectionDiff",
+            "SectionIndex",
+            "WarningCollector",
+        ]
+        for name in feature_modules:
+            self.assertNotIn(f"setprogramoptions.{name}", result["modules"])
+        self.assertTrue(importtime.check_budget(result, max_package_modules=5))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import contextlib
+import io
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+import unittest
+from unittest import TestCase
+
+from setprogramoptions import *
+from setprogramoptions.bench import suite
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class BenchSuiteTest(TestCase):
+    """
+    Tests for the benchmark suite.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        return
+
+    def test_bench_suite_run_benchmarks(self):
+        """
+        Every registered benchmark runs and reports timing statistics.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        names = suite.benchmark_names()
+        for expected in [
+            "parse_section.deep_use",
+            "remove.many",
+            "expand.process.bash",
+            "gen_option_list.SetProgramOptions.bash",
+            "gen_option_list.SetProgramOptions.cmake_fragment",
+            "gen_option_list.SetProgramOptionsCMake.bash",
+            "gen_option_list.SetProgramOptionsCMake.cmake_fragment",
+        ]:
+            self.assertIn(expected, names)
+
+        results = suite.run_benchmarks(scale="tiny", repeat=2, number=1)
+        self.assertEqual(suite.SCHEMA_VERSION, results["schema_version"])
+        self.assertIn("python_version", results["metadata"])
+        self.assertEqual(set(names), set(results["results"].keys()))
+        for stats in results["results"].values():
+            self.assertEqual(2, len(stats["samples"]))
+            self.assertLessEqual(stats["min"], stats["median"])
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with self.assertRaises(KeyError):
+            suite.run_benchmarks(names=["does.not.exist"])
+        with self.assertRaises(ValueError):
+            suite.run_benchmarks(names=["remove.many"], scale="enormous")
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bench_suite_compare_results(self):
+        """
+        ``compare_results`` flags regressions, improvements, new and missing benchmarks.
+        """
+        baseline = {"results": {"a": {"min": 1.0}, "b": {"min": 1.0}, "c": {"min": 1.0}, "d": {"min": 1.0}}}
+        current = {"results": {"a": {"min": 1.05}, "b": {"min": 1.5}, "c": {"min": 0.5}, "e": {"min": 1.0}}}
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        rows = suite.compare_results(baseline, current, threshold=0.1)
+        status = {row["name"]: row["status"] for row in rows}
+        self.assertDictEqual(
+            {
+                "a": "ok", "b": "regression", "c": "improvement", "d": "missing", "e": "new"
+            }, status
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bench_suite_main(self):
+        """
+        The ``run`` command writes JSON results that ``compare`` can read and
+        ``compare`` returns a nonzero status for regressions.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            baseline = os.path.join(tmpdir, "baseline.json")
+            current = os.path.join(tmpdir, "current.json")
+            with io.StringIO() as m_stdout:
+                with contextlib.redirect_stdout(m_stdout):
+                    rval = suite.main(
+                        ["run", "-b", "remove.many", "--scale", "tiny", "--repeat", "1", "-o", baseline]
+                    )
+            self.assertEqual(0, rval)
+
+            with open(baseline, "r") as ifp:
+                results = json.load(ifp)
+            self.assertIn("remove.many", results["results"])
+
+            with io.StringIO() as m_stdout:
+                with contextlib.redirect_stdout(m_stdout):
+                    self.assertEqual(0, suite.main(["compare", baseline, baseline]))
+
+            results["results"]["remove.many"]["min"] *= 2.0
+            with open(current, "w") as ofp:
+                json.dump(results, ofp)
+
+            with io.StringIO() as m_stdout:
+                with contextlib.redirect_stdout(m_stdout):
+                    self.assertEqual(1, suite.main(["compare", baseline, current]))
+                self.assertIn("regression", m_stdout.getvalue())
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
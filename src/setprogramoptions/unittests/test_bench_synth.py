@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import contextlib
+import io
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import unittest
+from unittest import TestCase
+
+from setprogramoptions import *
+from setprogramoptions.bench import synth
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class BenchSynthTest(TestCase):
+    """
+    Tests for the synthetic ``.ini`` workload generator.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        return
+
+    def test_bench_synth_generate_ini_is_reproducible(self):
+        """
+        The same seed generates the same text and a different seed does not.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        text_a = synth.generate_ini(sections=20, roots=3, seed=1)
+        text_b = synth.generate_ini(sections=20, roots=3, seed=1)
+        text_c = synth.generate_ini(sections=20, roots=3, seed=2)
+        self.assertEqual(text_a, text_b)
+        self.assertNotEqual(text_a, text_c)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bench_synth_generate_ini_scales(self):
+        """
+        The number of lines grows with the number of sections and options.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        lines_small = len(synth.generate_ini(sections=10, options_per_section=10).splitlines())
+        lines_large = len(synth.generate_ini(sections=100, options_per_section=50).splitlines())
+        self.assertGreater(lines_large, 100 * 50)
+        self.assertGreater(lines_large, lines_small)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with self.assertRaises(ValueError):
+            synth.generate_ini(sections=-1)
+        with self.assertRaises(ValueError):
+            synth.generate_ini(remove_density=2.0)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bench_synth_generate_ini_parses(self):
+        """
+        The generated file can be parsed and every root section generates
+        ``bash`` and ``cmake_fragment`` option lists without unresolved
+        ``${VAR|CMAKE}`` fields.
+        """
+        text = synth.generate_ini(
+            sections=12, roots=2, use_depth=3, options_per_section=8, remove_density=0.5, cmake_density=0.5
+        )
+        self.assertIn("opt-remove", text)
+        self.assertIn("SUBSTR", text)
+        self.assertIn("|ENV}", text)
+        self.assertIn("|CMAKE}", text)
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "synth.ini")
+            with open(filename, "w") as ofp:
+                ofp.write(text)
+
+            parser = SetProgramOptionsCMake(filename)
+            parser.exception_control_level = 4
+            parser.exception_control_silent_warnings = True
+
+            for section in synth.root_section_names(2):
+                option_list = parser.gen_option_list(section, generator="bash")
+                self.assertEqual("cmake", option_list[0])
+                self.assertEqual("/path/to/source/dir", option_list[-1])
+                parser.gen_option_list(section, generator="cmake_fragment")
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bench_synth_main(self):
+        """
+        The command line interface writes the generated file.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "synth.ini")
+            rval = synth.main(["--sections", "5", "--roots", "1", "--seed", "3", "-o", filename])
+            self.assertEqual(0, rval)
+            with open(filename, "r") as ifp:
+                text = ifp.read()
+            self.assertEqual(synth.generate_ini(sections=5, roots=1, seed=3) + "\n", text)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with io.StringIO() as m_stdout:
+            with contextlib.redirect_stdout(m_stdout):
+                synth.main(["--sections", "2", "--roots", "1"])
+            self.assertIn("[SYN_ROOT_0000]", m_stdout.getvalue())
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contextlib
+import io
+import stat
+import subprocess
+import tempfile
+import unittest
+from unittest import TestCase
+
+from setprogramoptions import *
+from setprogramoptions import bundle
+from setprogramoptions.bench.importtime import package_env
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class OptionBundleTest(TestCase):
+    """
+    Tests for ``compile_bundle()`` and ``OptionBundle``.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        self._filename = find_config_ini(filename="config_test_setprogramoptions.ini")
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._bundle_filename = os.path.join(self._tmpdir.name, "config.spob")
+        return
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+        return
+
+    def _create_parser(self, parser_class=SetProgramOptionsCMake, filename=None):
+        parser = parser_class(self._filename if filename is None else filename)
+        parser.exception_control_silent_warnings = True
+        return parser
+
+    def _render(self, renderer, section, generator):
+        try:
+            return renderer.gen_option_list(section, generator)
+        except Exception as exc:
+            return (type(exc).__name__, str(exc))
+
+    def _handler_generators(self, parser_class) -> set:
+        """The generators that ``parser_class`` has ``opt-set`` or ``opt-set-cmake-var`` handlers for."""
+        cmake_var_prefix = "_program_option_handler_opt_set_cmake_var_"
+        opt_set_prefix = "_program_option_handler_opt_set_"
+        output = set()
+        for name in dir(parser_class):
+            if name.startswith(cmake_var_prefix):
+                output.add(name[len(cmake_var_prefix) :])
+            elif name.startswith(opt_set_prefix):
+                output.add(name[len(opt_set_prefix) :])
+        return output
+
+    def test_bundle_matches_gen_option_list(self):
+        """
+        Every section renders the same option lists (and errors) from the bundle as from the parser.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        sections = bundle.compile_bundle(self._create_parser(), self._bundle_filename)
+        self.assertIn("TRILINOS_CONFIGURATION_ALPHA", sections)
+
+        with bundle.OptionBundle(self._bundle_filename) as option_bundle:
+            self.assertEqual(sorted(sections), option_bundle.sections())
+            self.assertEqual(["TEST_OPT_REMOVE_NO_PARAMS_01"], option_bundle.metadata["skipped_sections"])
+            self.assertEqual("SetProgramOptionsCMake", option_bundle.metadata["parser_class"])
+            for section in sections:
+                self.assertIn(section, option_bundle)
+
+            self.assertNotIn("NONEXISTENT_SECTION", option_bundle)
+            with self.assertRaises(KeyError):
+                option_bundle.gen_option_list("NONEXISTENT_SECTION")
+            with self.assertRaises(ValueError):
+                option_bundle.gen_option_list("TEST_SECTION", "make")
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bundle_conformance(self):
+        """
+        Bundles of every parser class render the same option lists and errors as
+        ``gen_option_list`` for every section and every generator the parser class
+        has handlers for.
+        """
+        filenames = [
+            self._filename,
+            find_config_ini(filename="config_test_fastparser.ini"),
+        ]
+        for parser_class in (SetProgramOptionsCMake, SetProgramOptions):
+            generators = sorted(self._handler_generators(parser_class) | set(bundle.GENERATORS))
+            for filename in filenames:
+                print("-----[ TEST BEGIN ]----------------------------------------")
+                print(f"{parser_class.__name__}: {filename}")
+                data, sections = bundle.compile_bundle_bytes(self._create_parser(parser_class, filename))
+                option_bundle = bundle.OptionBundle.from_buffer(data)
+                for section in sections:
+                    for generator in generators:
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            expected = self._render(
+                                self._create_parser(parser_class, filename), section, generator
+                            )
+                        actual = self._render(option_bundle, section, generator)
+                        self.assertEqual(expected, actual, f"{parser_class.__name__} {section} ({generator})")
+                option_bundle.close()
+                print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bundle_entries_and_strict(self):
+        """
+        Entries are stored classified and unresolved CMake variables can be replaced by empty strings.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        bundle.compile_bundle(
+            self._create_parser(),
+            self._bundle_filename,
+            ["TEST_CMAKE_CACHE_PARAM_ORDER", "TEST_CMAKE_VAR_IN_BASH_GENERATOR"]
+        )
+        with bundle.OptionBundle(self._bundle_filename) as option_bundle:
+            entries = option_bundle.entries("TEST_CMAKE_CACHE_PARAM_ORDER")
+            self.assertEqual(7, len(entries))
+            self.assertEqual(
+                ("CMAKE_VAR_A", "STRING", True, False, True),
+                tuple(entries[0][key] for key in ("varname", "type", "force", "parent_scope", "cache"))
+            )
+            self.assertEqual(
+                ("CMAKE_VAR_B", None, False, True, False),
+                tuple(entries[1][key] for key in ("varname", "type", "force", "parent_scope", "cache"))
+            )
+
+            section = "TEST_CMAKE_VAR_IN_BASH_GENERATOR"
+            self.assertEqual('"BAR ${FOO_VAE|CMAKE}"', option_bundle.entries(section)[1]["value"])
+            with self.assertRaises(ValueError):
+                option_bundle.gen_option_list(section, "bash")
+            self.assertEqual(
+                ['-DFOO_VAR:STRING="FOO"', '-DFOO_VAR:STRING="BAR "'],
+                option_bundle.gen_option_list(section, "bash", strict=False)
+            )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bundle_file_is_read_only_and_validated(self):
+        """
+        Bundles are read-only, recompiling replaces them and other files are rejected.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        bundle.compile_bundle(self._create_parser(), self._bundle_filename, ["TEST_SECTION"])
+        self.assertEqual(
+            0, os.stat(self._bundle_filename).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+        )
+        bundle.compile_bundle(
+            self._create_parser(), self._bundle_filename, ["TEST_SECTION", "TEST_SPACES_IN_VALUE"]
+        )
+        self.assertTrue(bundle.is_bundle(self._bundle_filename))
+        self.assertFalse(bundle.is_bundle(self._filename))
+
+        with bundle.OptionBundle(self._bundle_filename) as option_bundle:
+            self.assertEqual(["OPTS=\"FOO 'BAR BAZ'\""], option_bundle.gen_option_list("TEST_SECTION"))
+            self.assertEqual(2, len(option_bundle))
+
+        with self.assertRaises(ValueError):
+            bundle.OptionBundle(self._filename)
+
+        with open(self._bundle_filename, "rb") as ifp:
+            data = bytearray(ifp.read())
+        data[len(bundle.BUNDLE_MAGIC)] = bundle.BUNDLE_VERSION + 1
+        with self.assertRaises(ValueError):
+            bundle.OptionBundle.from_buffer(bytes(data))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_bundle_does_not_import_the_parser(self):
+        """
+        Rendering from a bundle through the command line does not import ``configparserenhanced``.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        bundle.compile_bundle(self._create_parser(), self._bundle_filename)
+        code = (
+            "import sys\n"
+            "from setprogramoptions import cli\n"
+            f"argv = [{self._bundle_filename!r}, '-s', 'TRILINOS_CONFIGURATION_ALPHA', '-g', 'bash']\n"
+            "status = cli.main(argv)\n"
+            "assert status == 0\n"
+            "print(sorted(name for name in sys.modules if name.startswith('configparserenhanced')))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env=package_env(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True
+        ).stdout
+        print(output)
+        self.assertIn("-DTrilinos_ENABLE_COMPLEX:BOOL=ON", output)
+        self.assertTrue(output.rstrip().endswith("[]"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
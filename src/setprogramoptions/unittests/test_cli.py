@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import contextlib
+import io
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import unittest
+from unittest import TestCase
+
+from setprogramoptions import *
+from setprogramoptions import cli
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class CLITest(TestCase):
+    """
+    Tests for the ``setprogramoptions`` command line interface.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        self._filename = find_config_ini(filename="config_test_setprogramoptions.ini")
+        return
+
+    def _run_main(self, argv):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = cli.main(argv)
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_cli_stdout_matches_gen_option_list(self):
+        """
+        Rendering several sections and generators in one call matches ``gen_option_list``.
+        """
+        section = "TRILINOS_CONFIGURATION_ALPHA"
+        parser = SetProgramOptionsCMake(self._filename)
+        expected_bash = " \\\n   ".join(parser.gen_option_list(section, generator="bash"))
+        expected_cmake = "\n".join(parser.gen_option_list(section, generator="cmake_fragment"))
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        status, stdout, stderr = self._run_main([
+            self._filename, "-s", section, "-s", "TEST_CMAKE_CACHE_PARAM_ORDER", "-g", "bash", "-g",
+            "cmake_fragment"
+        ])
+        print(stdout)
+        self.assertEqual(0, status)
+        self.assertIn(f"# [{section}] (bash)\n{expected_bash}\n", stdout)
+        self.assertIn(f"# [{section}] (cmake_fragment)\n{expected_cmake}\n", stdout)
+        self.assertIn("# [TEST_CMAKE_CACHE_PARAM_ORDER] (cmake_fragment)", stdout)
+        self.assertEqual(4, stdout.count("# ["))
+
+        status, stdout, stderr = self._run_main([
+            self._filename, "-s", section, "-g", "bash", "-g", "cmake_fragment", "--fast-parse",
+            "--silent-warnings"
+        ])
+        self.assertEqual(0, status)
+        expected = f"# [{section}] (bash)\n{expected_bash}\n\n"
+        expected += f"# [{section}] (cmake_fragment)\n{expected_cmake}\n\n"
+        self.assertEqual(expected, stdout)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_cli_out_dir_and_manifest(self):
+        """
+        A manifest with per-section generators writes one file per section and generator.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = os.path.join(tmpdir, "manifest.txt")
+            with open(manifest, "w") as ofp:
+                ofp.write("# section  generators\n")
+                ofp.write("\n")
+                ofp.write("TRILINOS_CONFIGURATION_ALPHA  bash cmake_fragment\n")
+                ofp.write("TEST_CMAKE_VAR_REMOVE\n")
+            out_dir = os.path.join(tmpdir, "out")
+
+            status, stdout, stderr = self._run_main([
+                self._filename, "--manifest", manifest, "-g", "cmake_fragment", "--out-dir", out_dir,
+                "--silent-warnings"
+            ])
+            self.assertEqual(0, status)
+            self.assertEqual("", stdout)
+            self.assertEqual(
+                [
+                    "TEST_CMAKE_VAR_REMOVE.cmake",
+                    "TRILINOS_CONFIGURATION_ALPHA.cmake",
+                    "TRILINOS_CONFIGURATION_ALPHA.sh",
+                ],
+                sorted(os.listdir(out_dir))
+            )
+
+            with open(os.path.join(out_dir, "TEST_CMAKE_VAR_REMOVE.cmake"), "r") as ifp:
+                text = ifp.read()
+            print(text)
+            self.assertEqual(
+                'set(BAR_TEST BAR CACHE STRING "from .ini configuration")\n'
+                'set(BAZ_TEST BAZ CACHE STRING "from .ini configuration")\n',
+                text
+            )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Section names that are not file names are rejected before anything is written.
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out_dir = os.path.join(tmpdir, "out")
+            status, stdout, stderr = self._run_main([
+                self._filename, "-s", "TEST_CMAKE_VAR_REMOVE", "-s", "../ESCAPE", "--out-dir", out_dir,
+                "--silent-warnings"
+            ])
+            self.assertEqual(1, status)
+            self.assertIn("section `../ESCAPE` can not be used as a file name", stderr)
+            self.assertEqual([], os.listdir(tmpdir))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_cli_export(self):
+        """
+        ``--export`` exports the requested sections and reports unchanged files.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with tempfile.TemporaryDirectory() as out_dir:
+            argv = [
+                self._filename,
+                "--export",
+                "--out-dir",
+                out_dir,
+                "-s",
+                "TRILINOS_CONFIGURATION_ALPHA",
+                "-s",
+                "TEST_CMAKE_VAR_REMOVE",
+                "--silent-warnings"
+            ]
+            status, stdout, stderr = self._run_main(argv)
+            print(stdout)
+            self.assertEqual(0, status)
+            self.assertIn("4 written, 0 unchanged, 0 failed", stdout)
+            self.assertIn("manifest.json", os.listdir(out_dir))
+
+            failing_argv = argv + ["-s", "TEST_CMAKE_FAIL_ON_PARENT_SCOPE_AND_FORCE"]
+            status, stdout, stderr = self._run_main(failing_argv)
+            print(stdout)
+            self.assertEqual(1, status)
+            self.assertIn("0 written, 4 unchanged, 2 failed", stdout)
+            self.assertIn("[TEST_CMAKE_FAIL_ON_PARENT_SCOPE_AND_FORCE] (bash)", stderr)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        status, stdout, stderr = self._run_main([self._filename, "--export"])
+        self.assertEqual(2, status)
+        self.assertIn("--export requires --out-dir", stderr)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_cli_errors(self):
+        """
+        Missing sections are a usage error and generation errors return 1.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with self.assertRaises(SystemExit):
+            self._run_main([])
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        status, stdout, stderr = self._run_main([self._filename])
+        self.assertEqual(2, status)
+        self.assertIn("no sections given", stderr)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        status, stdout, stderr = self._run_main(
+            [self._filename, "-s", "TEST_CMAKE_FAIL_ON_PARENT_SCOPE_AND_FORCE"]
+        )
+        print(stderr)
+        self.assertEqual(1, status)
+        self.assertIn("setprogramoptions: error: ValueError:", stderr)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # The render server does not use the parser settings of the command line.
+        for option in (["--collect-warnings"], ["--exception-control-level", "2"]):
+            argv = [self._filename, "-s", "TEST_CMAKE_VAR_REMOVE", "--socket", "/nonexistent.sock"] + option
+            status, stdout, stderr = self._run_main(argv)
+            self.assertEqual(2, status)
+            self.assertIn("--socket can not be combined with", stderr)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import socket
+import stat
+import tempfile
+import time
+import unittest
+from unittest import TestCase
+
+from setprogramoptions import *
+from setprogramoptions.server import ParserCache
+from setprogramoptions.server import RenderClient
+from setprogramoptions.server import RenderServer
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets are not supported")
+class RenderServerTest(TestCase):
+    """
+    Tests for the render server and client.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        self._filename = os.path.abspath(find_config_ini(filename="config_test_setprogramoptions.ini"))
+        self._tmpdir = tempfile.mkdtemp(prefix="spo-")
+        self._socket_path = os.path.join(self._tmpdir, "render.sock")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+        return
+
+    def test_RenderServer_gen_option_list(self):
+        """
+        The server renders the same option lists as a parser and reports errors.
+        """
+        section = "TRILINOS_CONFIGURATION_ALPHA"
+        parser = SetProgramOptionsCMake(self._filename)
+        parser.exception_control_silent_warnings = True
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        server = RenderServer(self._socket_path)
+        with server, RenderClient(self._socket_path, fallback=False) as client:
+            self.assertEqual(os.getpid(), client.ping()["pid"])
+            self.assertTrue(client.connected)
+            for generator in ["bash", "cmake_fragment"]:
+                self.assertEqual(
+                    parser.gen_option_list(section, generator=generator),
+                    client.gen_option_list(self._filename, section, generator)
+                )
+            self.assertEqual(1, len(server.parsers))
+
+            bound = client.bind(self._filename)
+            self.assertEqual(
+                parser.gen_option_list(section, generator="bash"), bound.gen_option_list(section)
+            )
+
+            with self.assertRaises(KeyError):
+                client.gen_option_list(self._filename, "NO_SUCH_SECTION")
+            with self.assertRaises(ValueError):
+                client.gen_option_list(self._filename, "TEST_CMAKE_FAIL_ON_PARENT_SCOPE_AND_FORCE")
+            with self.assertRaises(FileNotFoundError):
+                client.gen_option_list(os.path.join(self._tmpdir, "missing.ini"), section)
+
+            # The connection is still usable after errors.
+            self.assertIsNotNone(client.ping())
+        self.assertFalse(os.path.exists(self._socket_path))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_RenderServer_reload_on_change(self):
+        """
+        A changed ``.ini`` file is reloaded by the next request.
+        """
+        filename = os.path.join(self._tmpdir, "config.ini")
+        with open(filename, "w") as ofp:
+            ofp.write("[SECTION]\nopt-set cmake\nopt-set -G : Ninja\n")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with RenderServer(self._socket_path), RenderClient(self._socket_path, fallback=False) as client:
+            self.assertEqual(["cmake", "-G=Ninja"], client.gen_option_list(filename, "SECTION"))
+
+            with open(filename, "w") as ofp:
+                ofp.write("[SECTION]\nopt-set cmake\nopt-set -G : Make\n")
+            # Make sure the modification time changes on coarse grained file systems.
+            stat = os.stat(filename)
+            os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+            self.assertEqual(["cmake", "-G=Make"], client.gen_option_list(filename, "SECTION"))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_RenderClient_fallback(self):
+        """
+        The client renders in-process if the server is not running.
+        """
+        section = "TRILINOS_CONFIGURATION_ALPHA"
+        parser = SetProgramOptionsCMake(self._filename)
+        parser.exception_control_silent_warnings = True
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with RenderClient(self._socket_path) as client:
+            self.assertIsNone(client.ping())
+            self.assertEqual(
+                parser.gen_option_list(section, generator="bash"),
+                client.gen_option_list(self._filename, section)
+            )
+            self.assertFalse(client.connected)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with RenderClient(self._socket_path, fallback=False) as client:
+            with self.assertRaises(OSError):
+                client.ping()
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_RenderServer_bind_existing_path(self):
+        """
+        ``bind`` only replaces a socket that no server listens on.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # A file that is not a socket is kept.
+        with open(self._socket_path, "w") as ofp:
+            ofp.write("data\n")
+        with self.assertRaises(FileExistsError):
+            RenderServer(self._socket_path).bind()
+        with open(self._socket_path, "r") as ifp:
+            self.assertEqual("data\n", ifp.read())
+        os.unlink(self._socket_path)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # A socket that is in use is kept, a stale socket is replaced.
+        with RenderServer(self._socket_path), RenderClient(self._socket_path, fallback=False) as client:
+            with self.assertRaises(OSError):
+                RenderServer(self._socket_path).bind()
+            self.assertIsNotNone(client.ping())
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self._socket_path)
+        sock.close()
+        self.assertTrue(os.path.exists(self._socket_path))
+        with RenderServer(self._socket_path), RenderClient(self._socket_path, fallback=False) as client:
+            self.assertIsNotNone(client.ping())
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_RenderServer_socket_ownership(self):
+        """
+        The socket is only accessible by the user and is only removed by the server that created it.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with RenderServer(self._socket_path):
+            self.assertEqual(0o600, stat.S_IMODE(os.lstat(self._socket_path).st_mode))
+        self.assertFalse(os.path.exists(self._socket_path))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        # Another server replaced the socket file, which is kept.
+        server = RenderServer(self._socket_path).start()
+        os.unlink(self._socket_path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self._socket_path)
+            server.close()
+            self.assertTrue(os.path.exists(self._socket_path))
+        finally:
+            sock.close()
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_RenderServer_shutdown_request(self):
+        """
+        A ``shutdown`` request stops the server.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        server = RenderServer(self._socket_path).start()
+        thread = server._thread
+        client = RenderClient(self._socket_path, fallback=False)
+        client.shutdown_server()
+        self.assertFalse(client.connected)
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        server.close()
+        self.assertFalse(os.path.exists(self._socket_path))
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_ParserCache(self):
+        """
+        ``ParserCache`` returns the same parser until it is cleared.
+        """
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        cache = ParserCache()
+        parser, lock = cache.get(self._filename)
+        self.assertIsInstance(parser, SetProgramOptionsCMake)
+        self.assertIs(parser, cache.get(self._filename)[0])
+        cache.clear(self._filename)
+        self.assertIsNot(parser, cache.get(self._filename)[0])
+        self.assertIsInstance(ParserCache("SetProgramOptions").get(self._filename)[0], SetProgramOptions)
+        self.assertNotIsInstance(
+            ParserCache("SetProgramOptions").get(self._filename)[0], SetProgramOptionsCMake
+        )
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- mode: python; py-indent-offset: 4; py-continuation-offset: 4 -*-
+#===============================================================================
+#
+# License (3-Clause BSD)
+# ----------------------
+# Copyright 2021 National Technology & Engineering Solutions of Sandia,
+# LLC (NTESS). Under the terms of Contract DE-NA0003525 with NTESS,
+# the U.S. Government retains certain rights in this software.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON
+# ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#===============================================================================
+"""
+"""
+from __future__ import print_function
+import sys
+
+
+sys.dont_write_bytecode = True
+
+import os
+
+
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multiprocessing
+import subprocess
+import unittest
+from unittest import TestCase
+
+from setprogramoptions import *
+from setprogramoptions import sharedstore
+from setprogramoptions.bench.importtime import package_env
+
+from .common import *
+
+# ===============================================================================
+#
+# Tests
+#
+# ===============================================================================
+
+
+
+class SharedOptionStoreTest(TestCase):
+    """
+    Tests for ``SharedOptionStore`` and the worker functions of ``setprogramoptions.sharedstore``.
+    """
+
+    def setUp(self):
+        print("")
+        self.maxDiff = None
+        self._filename = find_config_ini(filename="config_test_setprogramoptions.ini")
+        return
+
+    def _create_parser(self):
+        parser = SetProgramOptionsCMake(self._filename)
+        parser.exception_control_silent_warnings = True
+        return parser
+
+    def test_SharedOptionStore_workers(self):
+        """
+        Worker processes render the same option lists from the store as the parser.
+        """
+        sections = [
+            "TRILINOS_CONFIGURATION_ALPHA", "TEST_VAR_EXPANSION_UPDATE_03", "TEST_SPACES_AND_EXPANSION"
+        ]
+        requests = [(section, generator) for section in sections for generator in ("bash", "cmake_fragment")]
+        expected = [
+            self._create_parser().gen_option_list(section, generator) for section, generator in requests
+        ]
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with self._create_parser().publish_options(sections) as store:
+            self.assertEqual(sections, store.sections)
+            self.assertEqual(expected[0], store.gen_option_list(*requests[0]))
+
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(2) as pool:
+                actual = pool.starmap(
+                    sharedstore.store_gen_option_list, [(store.name, ) + request for request in requests]
+                )
+            self.assertEqual(expected, actual)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SharedOptionStore_attach_without_parser(self):
+        """
+        A process attaches the store by name without importing ``configparserenhanced``.
+        """
+        section = "TRILINOS_CONFIGURATION_ALPHA"
+        expected = self._create_parser().gen_option_list(section, "bash")
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        with SharedOptionStore(self._create_parser()) as store:
+            self.assertNotIn("TEST_OPT_REMOVE_NO_PARAMS_01", store.sections)
+            code = (
+                "import sys\n"
+                "from setprogramoptions import sharedstore\n"
+                f"print(sharedstore.store_gen_option_list({store.name!r}, {section!r}))\n"
+                "sharedstore.detach_store()\n"
+                "print(sorted(name for name in sys.modules if name.startswith('configparserenhanced')))\n"
+            )
+            output = subprocess.run(
+                [sys.executable, "-c", code],
+                env=package_env(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                check=True
+            )
+            print(output.stdout)
+            self.assertEqual([repr(expected), "[]"], output.stdout.splitlines())
+            self.assertEqual("", output.stderr)
+
+            # The exiting process did not unlink the block.
+            self.assertEqual(expected, sharedstore.store_gen_option_list(store.name, section))
+
+            # Readers get read-only views of the block.
+            self.assertTrue(sharedstore.attach_store(store.name)._buffer.readonly)
+            self.assertEqual(expected, store.gen_option_list(section))
+            self.assertTrue(store._bundle._buffer.readonly)
+            with self.assertRaises(TypeError):
+                sharedstore.attach_store(store.name)._buffer[0] = 0
+            sharedstore.detach_store(store.name)
+            name = store.name
+
+        with self.assertRaises(FileNotFoundError):
+            sharedstore.attach_store(name)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0
+
+    def test_SharedOptionStore_resource_tracker(self):
+        """
+        Workers that share the resource tracker of the owner leave its registration of
+        the block alone, so the owner unlinks the block without tracker errors.
+        """
+        section = "TRILINOS_CONFIGURATION_ALPHA"
+
+        print("-----[ TEST BEGIN ]----------------------------------------")
+        code = (
+            "import multiprocessing\n"
+            "from setprogramoptions import SetProgramOptionsCMake, sharedstore\n"
+            "if __name__ == '__main__':\n"
+            f"    parser = SetProgramOptionsCMake({self._filename!r})\n"
+            "    parser.exception_control_silent_warnings = True\n"
+            f"    with parser.publish_options([{section!r}]) as store:\n"
+            "        with multiprocessing.get_context('spawn').Pool(2) as pool:\n"
+            f"            pool.starmap(sharedstore.store_gen_option_list, [(store.name, {section!r})] * 4)\n"
+            "    print('done')\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env=package_env(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True
+        )
+        print(output.stderr)
+        self.assertEqual("done\n", output.stdout)
+        self.assertEqual("", output.stderr)
+        print("-----[ TEST END ]------------------------------------------")
+
+        print("OK")
+        return 0